@@ -159,8 +159,14 @@ def _evaluate(samples: Iterable[Sample], manager, *, top_k: int) -> tuple[dict[s
     allow_exec_checks = 0
     allow_exec_mismatches = 0
     detailed: list[dict[str, object]] = []
-    for sample in samples:
-        matches = manager.prepare_payload(sample.query)[:top_k]
+    samples = list(samples)
+    # One batched pass: a single embedder call and telemetry write for the whole dataset.
+    batches = manager.match_many([sample.query for sample in samples])
+    for sample, batch in zip(samples, batches):
+        matches = [
+            {"name": match.metadata.name, "allow_exec": match.metadata.allow_exec and manager.exec_enabled}
+            for match in batch[:top_k]
+        ]
         predicted = [entry["name"] for entry in matches]
         predicted_allow_exec = {entry["name"]: bool(entry.get("allow_exec")) for entry in matches}
         expected = sample.expected
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+"""Measure FlowRunner scheduling overhead on synthetic DAGs of no-op steps."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Sequence
+
+SHAPES = ("wide", "deep", "random")
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark FlowRunner.plan() and the step scheduler.")
+    parser.add_argument(
+        "--steps",
+        default="1000,10000,50000",
+        help="Comma-separated DAG sizes (default: 1000,10000,50000).",
+    )
+    parser.add_argument(
+        "--shapes",
+        default=",".join(SHAPES),
+        help="Comma-separated DAG shapes: wide (no edges), deep (one chain), random (default: all).",
+    )
+    parser.add_argument("--fan-in", type=int, default=3, help="Maximum dependencies per random step (default: 3).")
+    parser.add_argument("--seed", type=int, default=7, help="Seed for random DAGs (default: 7).")
+    parser.add_argument(
+        "--stagger-ms",
+        type=float,
+        default=0.0,
+        help="Let each no-op step sleep up to this long so completions trickle in while many steps run (default: 0).",
+    )
+    parser.add_argument(
+        "--root",
+        default=".",
+        help="Repository root containing src/flowrunner and src/mcprouter (default: current directory).",
+    )
+    parser.add_argument("--output", help="Optional path to write the JSON summary.")
+    return parser
+
+
+def _dependencies(shape: str, count: int, fan_in: int, rng: random.Random) -> list[list[str]]:
+    if shape == "wide":
+        return [[] for _ in range(count)]
+    if shape == "deep":
+        return [[f"s{index - 1}"] if index else [] for index in range(count)]
+    deps: list[list[str]] = []
+    for index in range(count):
+        # Parents come from a trailing window so the DAG is both wide and deep.
+        window = range(max(0, index - 64), index)
+        picks = rng.sample(window, min(len(window), rng.randint(0, fan_in)))
+        deps.append([f"s{parent}" for parent in picks])
+    return deps
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    root = Path(args.root).expanduser().resolve()
+    for rel_path in ("src/mcprouter/src", "src/flowrunner/src"):
+        candidate = root / rel_path
+        if candidate.exists():
+            sys.path.insert(0, str(candidate))
+
+    from flow_runner.models import FlowDefinition  # pylint: disable=import-error
+    from flow_runner.runner import FlowRunner, StepOutcome  # pylint: disable=import-error
+    from flow_runner.steps.base import BaseStep, ExecutionContext  # pylint: disable=import-error
+
+    delays: dict[str, float] = {}
+
+    class _NoopRunner(FlowRunner):
+        async def _run_step(self, step: BaseStep, context: ExecutionContext) -> StepOutcome:
+            delay = delays.get(step.id)
+            if delay:
+                await asyncio.sleep(delay)
+            return StepOutcome(step_id=step.id, success=True, latency_ms=0.0, error=None, extra={}, fatal=False)
+
+    sizes = [int(value) for value in args.steps.split(",") if value.strip()]
+    shapes = [value.strip() for value in args.shapes.split(",") if value.strip()]
+    unknown = sorted(set(shapes) - set(SHAPES))
+    if unknown:
+        parser.error(f"unknown shape(s): {', '.join(unknown)}")
+
+    results: list[dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        workspace = Path(tmp)
+        for shape in shapes:
+            for count in sizes:
+                rng = random.Random(args.seed)
+                deps = _dependencies(shape, count, args.fan_in, rng)
+                delays.clear()
+                if args.stagger_ms > 0:
+                    delays.update((f"s{index}", rng.uniform(0, args.stagger_ms) / 1000) for index in range(count))
+                flow = FlowDefinition.model_validate(
+                    {
+                        "version": 1,
+                        "run": {"output_dir": str(workspace / "run")},
+                        "steps": [
+                            {"id": f"s{index}", "uses": "shell", "run": "true", "depends_on": step_deps}
+                            for index, step_deps in enumerate(deps)
+                        ],
+                    }
+                )
+                runner = _NoopRunner(flow, flow_path=workspace / "flow.yaml", workspace_dir=workspace)
+                context = ExecutionContext(
+                    run_id=runner.run_id,
+                    run_dir=runner.run_dir,
+                    artifacts_dir=runner.artifacts_dir,
+                    workspace_dir=workspace,
+                    flow_dir=workspace,
+                    mcp_log_dir=runner.run_dir,
+                )
+
+                start = time.perf_counter()
+                order = runner.plan()
+                plan_elapsed = time.perf_counter() - start
+                start = time.perf_counter()
+                cpu_start = time.process_time()
+                result = asyncio.run(runner._execute(context))  # pylint: disable=protected-access
+                execute_cpu = time.process_time() - cpu_start
+                execute_elapsed = time.perf_counter() - start
+                if len(order) != count or len(result.completed_steps) != count:
+                    raise SystemExit(f"{shape}/{count}: scheduled {len(result.completed_steps)} of {count} steps")
+                results.append(
+                    {
+                        "shape": shape,
+                        "steps": count,
+                        "edges": sum(len(step_deps) for step_deps in deps),
+                        "plan_ms": round(plan_elapsed * 1000, 2),
+                        "plan_us_per_step": round(plan_elapsed * 1_000_000 / count, 3),
+                        "execute_ms": round(execute_elapsed * 1000, 2),
+                        # Includes creating and awaiting one asyncio task per step.
+                        "execute_us_per_step": round(execute_elapsed * 1_000_000 / count, 3),
+                        # CPU time excludes the staggered sleeps, leaving scheduler and event loop work.
+                        "execute_cpu_us_per_step": round(execute_cpu * 1_000_000 / count, 3),
+                    }
+                )
+                print(json.dumps(results[-1]))
+
+    summary = {
+        "python": sys.version.split()[0],
+        "fan_in": args.fan_in,
+        "stagger_ms": args.stagger_ms,
+        "results": results,
+    }
+    if args.output:
+        output_path = Path(args.output).expanduser()
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+"""Measure MCPRouter per-call overhead with a zero-latency provider."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Sequence
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark MCPRouter.generate overhead per call.")
+    parser.add_argument("--calls", type=int, default=5000, help="Number of timed generate() calls (default: 5000).")
+    parser.add_argument("--warmup", type=int, default=200, help="Untimed warm-up calls (default: 200).")
+    parser.add_argument(
+        "--root",
+        default=".",
+        help="Repository root containing src/mcprouter (default: current directory).",
+    )
+    parser.add_argument("--output", help="Optional path to write the JSON summary.")
+    return parser
+
+
+def _percentile(samples: Sequence[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round((pct / 100.0) * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    root = Path(args.root).expanduser().resolve()
+    mcprouter_src = root / "src/mcprouter/src"
+    if mcprouter_src.exists():
+        sys.path.insert(0, str(mcprouter_src))
+
+    from mcp_router.providers.base import BaseProvider  # pylint: disable=import-error
+    from mcp_router.router import MCPRouter  # pylint: disable=import-error
+    from mcp_router.schemas import ProviderRequest, ProviderResponse  # pylint: disable=import-error
+
+    class _InstantProvider(BaseProvider):
+        name = "instant"
+
+        async def agenerate(self, payload: ProviderRequest) -> ProviderResponse:
+            return ProviderResponse(
+                text="ok",
+                meta={"provider": self.name, "config": payload.config},
+                token_usage={"tokens": {"input": 0, "output": 0, "total": 0}},
+            )
+
+    kwargs = {
+        "prompt": "Summarize the repository governance model in two sentences.",
+        "model": "bench-model",
+        "prompt_limit": 8192,
+        "prompt_buffer": 512,
+        "sandbox": "read-only",
+        "approval_policy": "never",
+        "config": {"temperature": 0.0, "headers": {"Authorization": "Bearer bench"}},
+    }
+    samples: list[float] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        with MCPRouter(_InstantProvider(), max_sessions=1, log_dir=Path(tmp), log_flush_every=50) as router:
+            for _ in range(max(0, args.warmup)):
+                router.generate(**kwargs)
+            cpu_start = time.process_time()
+            for _ in range(max(1, args.calls)):
+                start = time.perf_counter()
+                router.generate(**kwargs)
+                samples.append((time.perf_counter() - start) * 1_000_000)
+            cpu_elapsed = time.process_time() - cpu_start
+
+    summary = {
+        "calls": len(samples),
+        # CPU time across caller, loop, and writer threads; less noisy than wall time.
+        "cpu_us_per_call": round(cpu_elapsed * 1_000_000 / len(samples), 2),
+        "mean_us": round(statistics.fmean(samples), 2),
+        "p50_us": round(_percentile(samples, 50), 2),
+        "p95_us": round(_percentile(samples, 95), 2),
+        "p99_us": round(_percentile(samples, 99), 2),
+    }
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        output_path = Path(args.output).expanduser()
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
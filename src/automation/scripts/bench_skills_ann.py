@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+"""Benchmark the IVF skill embedding index against exact search: build time, latency and recall@k."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Sequence
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Compare IVF and exact skill embedding search on synthetic catalogs.")
+    parser.add_argument(
+        "--sizes",
+        default="10000,100000",
+        help="Comma-separated catalog sizes (default: 10000,100000).",
+    )
+    parser.add_argument("--dim", type=int, default=384, help="Vector dimension (default: 384).")
+    parser.add_argument("--topics", type=int, default=0, help="Synthetic topic clusters (default: skills / 20).")
+    parser.add_argument(
+        "--spread",
+        type=float,
+        default=1.0,
+        help="Per-component noise around a topic (and around a skill for queries); higher is harder (default: 1.0).",
+    )
+    parser.add_argument("--queries", type=int, default=200, help="Timed queries per catalog (default: 200).")
+    parser.add_argument("--k", type=int, default=10, help="Recall@k cut-off (default: 10).")
+    parser.add_argument("--nprobe", default="1,4,8,16,32", help="Comma-separated nprobe values (default: 1,4,8,16,32).")
+    parser.add_argument("--nlist", type=int, default=0, help="IVF cells (default: 4 x sqrt(skills)).")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed (default: 7).")
+    parser.add_argument(
+        "--root",
+        default=".",
+        help="Repository root containing src/mcprouter (default: current directory).",
+    )
+    parser.add_argument("--output", help="Optional path to write the JSON summary.")
+    return parser
+
+
+def _catalog(np, rng, size: int, dim: int, topics: int, spread: float):
+    # Skills cluster around topics (agents of one domain describe similar work); queries paraphrase a skill.
+    centers = rng.standard_normal((max(1, topics), dim)).astype("float32")
+    labels = rng.integers(0, len(centers), size=size)
+    vectors = centers[labels] + spread * rng.standard_normal((size, dim)).astype("float32")
+    return vectors
+
+
+def _run(np, size: int, args: argparse.Namespace) -> dict[str, Any]:
+    from mcp_router.skills.ann import IVFIndex  # pylint: disable=import-error
+    from mcp_router.skills.vectors import EmbeddingMatrix  # pylint: disable=import-error
+
+    rng = np.random.default_rng(args.seed)
+    vectors = _catalog(np, rng, size, args.dim, args.topics or max(1, size // 20), args.spread)
+    matrix = EmbeddingMatrix({f"skill-{index}": vector for index, vector in enumerate(vectors)})
+    anchors = rng.integers(0, size, size=max(1, args.queries))
+    queries = vectors[anchors] + args.spread * rng.standard_normal((len(anchors), args.dim)).astype("float32")
+
+    start = time.perf_counter()
+    index = IVFIndex.build(matrix, nlist=args.nlist, seed=args.seed).bind(matrix)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    exact: list[set[str]] = []
+    samples: list[float] = []
+    for query in queries:
+        start = time.perf_counter()
+        scores = matrix.similarities(query)
+        picked = matrix.top_indices(scores, args.k)
+        samples.append((time.perf_counter() - start) * 1000)
+        exact.append({matrix.keys[position] for position in picked})
+    result: dict[str, Any] = {
+        "skills": size,
+        "nlist": index.nlist,
+        "build_ms": round(build_ms, 1),
+        "exact_p50_ms": round(statistics.median(samples), 3),
+        "ivf": [],
+    }
+    for nprobe in sorted({int(item) for item in args.nprobe.split(",") if item.strip()}):
+        samples = []
+        hits = 0
+        for query, reference in zip(queries, exact):
+            start = time.perf_counter()
+            found = index.search(matrix, query, args.k, nprobe=nprobe)
+            samples.append((time.perf_counter() - start) * 1000)
+            hits += len(reference & set(found))
+        result["ivf"].append(
+            {
+                "nprobe": nprobe,
+                "p50_ms": round(statistics.median(samples), 3),
+                f"recall@{args.k}": round(hits / (args.k * len(queries)), 4),
+            }
+        )
+    return result
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    root = Path(args.root).expanduser().resolve()
+    mcprouter_src = root / "src/mcprouter/src"
+    if mcprouter_src.exists():
+        sys.path.insert(0, str(mcprouter_src))
+    try:
+        import numpy as np
+    except ImportError as exc:  # pragma: no cover - dependency missing handled at runtime
+        raise SystemExit("numpy is required for bench_skills_ann.py (install the vectors extra)") from exc
+
+    sizes = [int(item) for item in args.sizes.split(",") if item.strip()]
+    summary = {
+        "dim": args.dim,
+        "queries": max(1, args.queries),
+        "k": args.k,
+        "results": [_run(np, size, args) for size in sizes],
+    }
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        output_path = Path(args.output).expanduser()
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
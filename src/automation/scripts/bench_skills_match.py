@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+"""Benchmark SkillManager.match on synthetic catalogs (keyword and embedding scoring)."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Sequence
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark SkillManager.match on synthetic skill catalogs.")
+    parser.add_argument(
+        "--sizes",
+        default="1000,10000,100000",
+        help="Comma-separated catalog sizes (default: 1000,10000,100000).",
+    )
+    parser.add_argument("--queries", type=int, default=200, help="Timed queries per catalog (default: 200).")
+    parser.add_argument("--vocabulary", type=int, default=20000, help="Synthetic vocabulary size (default: 20000).")
+    parser.add_argument(
+        "--embedding-dim",
+        type=int,
+        default=0,
+        help="Attach random embeddings of this dimension and a stub embedder (default: 0, keyword only).",
+    )
+    parser.add_argument("--seed", type=int, default=7, help="Random seed (default: 7).")
+    parser.add_argument(
+        "--root",
+        default=".",
+        help="Repository root containing src/mcprouter (default: current directory).",
+    )
+    parser.add_argument("--output", help="Optional path to write the JSON summary.")
+    return parser
+
+
+def _percentile(samples: Sequence[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round((pct / 100.0) * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _zipf_words(rng: random.Random, vocabulary: Sequence[str], count: int) -> list[str]:
+    # Log-uniform ranks: a few common words with long postings lists and a long tail.
+    size = len(vocabulary)
+    return [vocabulary[int(size ** rng.random()) - 1] for _ in range(count)]
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    root = Path(args.root).expanduser().resolve()
+    mcprouter_src = root / "src/mcprouter/src"
+    if mcprouter_src.exists():
+        sys.path.insert(0, str(mcprouter_src))
+
+    from mcp_router.skills import SkillManager, SkillMetadata  # pylint: disable=import-error
+
+    rng = random.Random(args.seed)
+    vocabulary = [f"term{index}" for index in range(max(10, args.vocabulary))]
+    sizes = [int(item) for item in args.sizes.split(",") if item.strip()]
+    results: list[dict[str, float | int]] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        for size in sizes:
+            dim = max(0, args.embedding_dim)
+            embedder = None
+            if dim:
+
+                def embedder(texts: Sequence[str]) -> list[list[float]]:
+                    return [[rng.gauss(0.0, 1.0) for _ in range(dim)] for _ in texts]
+
+            manager = SkillManager(
+                root=tmp_path,
+                telemetry_dir=tmp_path / "telemetry",
+                cache_dir=tmp_path / "cache",
+                embedder=embedder,
+                threshold=0.1,
+            )
+            catalog = {}
+            for index in range(size):
+                rel_path = f"skills/synthetic/{index}/SKILL.md"
+                catalog[rel_path] = SkillMetadata(
+                    name=f"synthetic-{index}",
+                    description=" ".join(_zipf_words(rng, vocabulary, rng.randint(12, 40))),
+                    path=tmp_path / rel_path,
+                    rel_path=rel_path,
+                    frontmatter_hash="",
+                    mtime=0.0,
+                    enabled=index % 10 != 0,
+                    allow_exec=False,
+                )
+            # Drive the internals directly: discovery would dominate at 100k files.
+            # pylint: disable=protected-access
+            manager._enabled = True
+            if dim:
+                manager._vectors = replace(
+                    manager._vectors, floats={path: [rng.gauss(0.0, 1.0) for _ in range(dim)] for path in catalog}
+                )
+            build_start = time.perf_counter()
+            manager._publish_snapshot(catalog)
+            build_ms = (time.perf_counter() - build_start) * 1000
+            manager._emit_event = lambda *_args, **_kwargs: None  # isolate scoring from telemetry I/O
+            manager._emit_events = lambda *_args, **_kwargs: None
+            # pylint: enable=protected-access
+            queries = [" ".join(_zipf_words(rng, vocabulary, 8)) for _ in range(max(1, args.queries))]
+            for query in queries[:10]:
+                manager.match(query)
+            samples: list[float] = []
+            for query in queries:
+                start = time.perf_counter()
+                manager.match(query)
+                samples.append((time.perf_counter() - start) * 1000)
+            results.append(
+                {
+                    "skills": size,
+                    "build_ms": round(build_ms, 2),
+                    "mean_ms": round(statistics.fmean(samples), 3),
+                    "p50_ms": round(_percentile(samples, 50), 3),
+                    "p95_ms": round(_percentile(samples, 95), 3),
+                }
+            )
+
+    summary = {"queries": max(1, args.queries), "embedding_dim": max(0, args.embedding_dim), "results": results}
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        output_path = Path(args.output).expanduser()
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
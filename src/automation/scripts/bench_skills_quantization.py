@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+"""Compare float32 and int8 skill embedding indexes: memory footprint and recall@k."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Mapping, Sequence
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Report memory and recall@k for quantized skill embeddings.")
+    parser.add_argument(
+        "--root",
+        default=".",
+        help="Repository root containing src/mcprouter and skills/ (default: current directory).",
+    )
+    parser.add_argument(
+        "--embeddings",
+        default=".mcp/cache/skills_embeddings.json",
+        help="Embedding cache written by embed_skills.py (default: .mcp/cache/skills_embeddings.json).",
+    )
+    parser.add_argument(
+        "--datasets",
+        default="skills/pilot/phase1/dataset.jsonl,skills/pilot/phase2/dataset.jsonl",
+        help="Comma-separated pilot datasets with query/expected_skills (used with --embeddings).",
+    )
+    parser.add_argument("--k", default="1,3", help="Comma-separated k values for recall@k (default: 1,3).")
+    parser.add_argument(
+        "--synthetic",
+        type=int,
+        default=0,
+        help="Use this many random skill vectors instead of the cache (measures agreement with float32 top-k).",
+    )
+    parser.add_argument("--dim", type=int, default=1024, help="Synthetic vector dimension (default: 1024).")
+    parser.add_argument("--queries", type=int, default=200, help="Synthetic query count (default: 200).")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed (default: 7).")
+    parser.add_argument("--output", help="Optional path to write the JSON summary.")
+    return parser
+
+
+def _list_bytes(vectors: Mapping[str, Sequence[float]]) -> int:
+    """Approximate heap cost of the historical representation: one list of Python floats per skill."""
+
+    return sum(sys.getsizeof(list(vector)) + sys.getsizeof(1.0) * len(vector) for vector in vectors.values())
+
+
+def _ranked(matrix, query: Sequence[float], k: int) -> list[str]:
+    scores = matrix.similarities(query)
+    return [matrix.keys[index] for index in matrix.top_indices(scores, k)]
+
+
+def _reranked(quantized, exact, query: Sequence[float], k: int, depth: int) -> list[str]:
+    candidates = _ranked(quantized, query, max(k, depth))
+    scores = exact.similarities(query)
+    candidates.sort(key=lambda key: -float(scores[exact.index[key]]))
+    return candidates[:k]
+
+
+def _timed_ms(func, queries: Sequence[Sequence[float]]) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        func(query)
+    return round((time.perf_counter() - start) * 1000 / max(1, len(queries)), 3)
+
+
+def _evaluate(
+    vectors: Mapping[str, Sequence[float]],
+    queries: Sequence[Sequence[float]],
+    expected: Sequence[set[str]] | None,
+    ks: Sequence[int],
+) -> dict[str, Any]:
+    from mcp_router.skills.vectors import EmbeddingMatrix, QuantizedEmbeddingMatrix  # pylint: disable=import-error
+
+    exact = EmbeddingMatrix(vectors)
+    quantized = QuantizedEmbeddingMatrix.quantize(vectors)
+    depth = 4 * max(ks)
+    summary: dict[str, Any] = {
+        "skills": len(exact),
+        "dim": exact.dim,
+        "queries": len(queries),
+        "memory_bytes": {
+            "python_lists": _list_bytes(vectors),
+            "float32": exact.nbytes,
+            "int8": quantized.nbytes,
+        },
+        "score_ms": {
+            "float32": _timed_ms(exact.similarities, queries),
+            "int8": _timed_ms(quantized.similarities, queries),
+        },
+    }
+    recall: dict[str, dict[str, float]] = {}
+    for k in ks:
+        rows = {"float32": 0.0, "int8": 0.0, "int8_rerank": 0.0}
+        for position, query in enumerate(queries):
+            reference = set(_ranked(exact, query, k)) if expected is None else expected[position]
+            if not reference:
+                continue
+            picks = {
+                "float32": _ranked(exact, query, k),
+                "int8": _ranked(quantized, query, k),
+                "int8_rerank": _reranked(quantized, exact, query, k, depth),
+            }
+            for label, ranked in picks.items():
+                rows[label] += len(reference & set(ranked)) / min(k, len(reference))
+        recall[f"@{k}"] = {label: round(total / max(1, len(queries)), 4) for label, total in rows.items()}
+    summary["recall"] = recall
+    summary["recall_reference"] = "float32 top-k" if expected is None else "pilot expected_skills"
+    return summary
+
+
+def _pilot_inputs(root: Path, args: argparse.Namespace) -> tuple[dict[str, list[float]], list[list[float]], list[set[str]]]:
+    cache_path = Path(args.embeddings).expanduser()
+    if not cache_path.is_absolute():
+        cache_path = root / cache_path
+    if not cache_path.exists():
+        raise SystemExit(f"embedding cache not found: {cache_path} (run embed_skills.py or pass --synthetic)")
+    payload = json.loads(cache_path.read_text(encoding="utf-8"))
+    vectors = payload.get("embeddings")
+    if not isinstance(vectors, dict) or not vectors:
+        raise SystemExit("embedding cache has no float vectors; regenerate with --quantize none or --keep-float")
+    try:
+        from sentence_transformers import SentenceTransformer  # type: ignore[import]
+    except ImportError as exc:  # pragma: no cover - dependency missing handled at runtime
+        raise SystemExit("sentence-transformers package is required to embed pilot queries") from exc
+
+    from mcp_router.skills import SkillManager  # pylint: disable=import-error
+
+    manager = SkillManager(root=root, feature_flags={"skills_v1": True})
+    path_by_name = {meta.name: meta.rel_path for meta in manager.list_all()}
+    texts: list[str] = []
+    expected: list[set[str]] = []
+    for dataset in (item.strip() for item in args.datasets.split(",") if item.strip()):
+        for line in (root / dataset).read_text(encoding="utf-8").splitlines():
+            if not line.strip():
+                continue
+            sample = json.loads(line)
+            texts.append(str(sample.get("query") or ""))
+            expected.append({path_by_name[name] for name in sample.get("expected_skills", []) if name in path_by_name})
+    transformer = SentenceTransformer(str(payload.get("model") or "BAAI/bge-large-en"))
+    queries = [list(map(float, vector)) for vector in transformer.encode(texts, normalize_embeddings=True)]
+    return vectors, queries, expected
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    root = Path(args.root).expanduser().resolve()
+    mcprouter_src = root / "src/mcprouter/src"
+    if mcprouter_src.exists():
+        sys.path.insert(0, str(mcprouter_src))
+
+    ks = sorted({int(item) for item in args.k.split(",") if item.strip()})
+    if args.synthetic > 0:
+        rng = random.Random(args.seed)
+        vectors = {f"skill-{index}": [rng.gauss(0.0, 1.0) for _ in range(args.dim)] for index in range(args.synthetic)}
+        keys = list(vectors)
+        # Queries sit near a random skill, as a paraphrase of its description would.
+        queries = []
+        for _ in range(max(1, args.queries)):
+            anchor = vectors[rng.choice(keys)]
+            queries.append([value + rng.gauss(0.0, 1.5) for value in anchor])
+        summary = _evaluate(vectors, queries, None, ks)
+    else:
+        vectors, queries, expected = _pilot_inputs(root, args)
+        summary = _evaluate(vectors, queries, expected, ks)
+
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        output_path = Path(args.output).expanduser()
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+"""Compact skills telemetry into daily partitions, refresh the rollup report, and query the archive."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Sequence
+
+DEFAULT_EVENTS = "telemetry/skills/events.jsonl"
+DEFAULT_ARCHIVE = "telemetry/skills/archive"
+DEFAULT_REPORT = "telemetry/reports/skills_telemetry_rollup.json"
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Manage the skills telemetry archive.")
+    parser.add_argument(
+        "--root",
+        default=".",
+        help="Repository root containing src/mcprouter and telemetry/ (default: current directory).",
+    )
+    parser.add_argument("--events", default=DEFAULT_EVENTS, help=f"Live event log (default: {DEFAULT_EVENTS}).")
+    parser.add_argument("--archive", default=DEFAULT_ARCHIVE, help=f"Partition directory (default: {DEFAULT_ARCHIVE}).")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    compact = commands.add_parser("compact", help="Rotate the live log into daily gzip partitions, then roll up.")
+    compact.add_argument("--report", default=DEFAULT_REPORT, help=f"Rollup report path (default: {DEFAULT_REPORT}).")
+    compact.add_argument("--no-rollup", action="store_true", help="Only compact; leave the rollup for later.")
+
+    rollup = commands.add_parser("rollup", help="Fold partitions added since the last rollup into the report.")
+    rollup.add_argument("--report", default=DEFAULT_REPORT, help=f"Rollup report path (default: {DEFAULT_REPORT}).")
+
+    query = commands.add_parser("query", help="Print archived events as JSONL, skipping partitions that cannot match.")
+    query.add_argument("--since", help="Inclusive ISO-8601 start (UTC if no offset), e.g. 2025-10-19 or 2025-10-19T05:00Z.")
+    query.add_argument("--until", help="Exclusive ISO-8601 end.")
+    query.add_argument("--event", action="append", help="Event type to keep; repeat for several (default: all).")
+    query.add_argument("--live", action="store_true", help="Also scan the live, not yet compacted log.")
+    query.add_argument("--limit", type=int, default=0, help="Stop after this many events (default: no limit).")
+    query.add_argument("--count", action="store_true", help="Print counts per event type instead of events.")
+    return parser
+
+
+def _write_report(path: Path, state: dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    report = {
+        "updated_at": state.get("updated_at"),
+        "segments": len(state["segments"]),
+        "totals": state["totals"],
+    }
+    path.write_text(json.dumps(report, indent=2, sort_keys=True), encoding="utf-8")
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    root = Path(args.root).expanduser().resolve()
+    mcprouter_src = root / "src/mcprouter/src"
+    if mcprouter_src.exists():
+        sys.path.insert(0, str(mcprouter_src))
+    from mcp_router import telemetry_archive as archive  # pylint: disable=import-error
+
+    events_path = root / args.events
+    archive_dir = root / args.archive
+
+    if args.command in {"compact", "rollup"}:
+        if args.command == "compact":
+            created = archive.compact(events_path, archive_dir)
+            lines = sum(entry["lines"] for entry in created)
+            print(f"compacted {lines} events into {len(created)} partition segment(s) under {archive_dir}")
+            if args.no_rollup:
+                return 0
+        state = archive.rollup(archive_dir)
+        print(f"rolled up {len(state['processed'])} new segment(s); {len(state['segments'])} in total")
+        _write_report(root / args.report, state)
+        return 0
+
+    bounds = {}
+    for name in ("since", "until"):
+        value = getattr(args, name)
+        if value:
+            bounds[name] = archive.parse_timestamp(value)
+            if bounds[name] is None:
+                parser.error(f"--{name} is not an ISO-8601 timestamp: {value}")
+    records = archive.query(
+        archive_dir,
+        events=args.event,
+        live_path=events_path if args.live else None,
+        **bounds,
+    )
+    counts: dict[str, int] = {}
+    for seen, record in enumerate(records, start=1):
+        if args.count:
+            event = str(record.get("event"))
+            counts[event] = counts.get(event, 0) + 1
+        else:
+            print(json.dumps(record, ensure_ascii=False))
+        if args.limit and seen >= args.limit:
+            break
+    if args.count:
+        print(json.dumps(dict(sorted(counts.items())), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
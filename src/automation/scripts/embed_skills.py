@@ -1,9 +1,10 @@
 #!/usr/bin/env python
-"""Generate offline embeddings for Skills metadata."""
+"""Generate offline embeddings for Skills metadata and compile the skills pack."""
 
 from __future__ import annotations
 
 import argparse
+import base64
 import json
 import sys
 from datetime import UTC, datetime
@@ -26,6 +27,29 @@ def _build_parser() -> argparse.ArgumentParser:
         default=".",
         help="Repository root containing skills/ and agents/ directories (default: current directory).",
     )
+    parser.add_argument(
+        "--quantize",
+        choices=("none", "int8"),
+        default="none",
+        help="Store int8 vectors with a per-vector scale (about 4x smaller) instead of float lists.",
+    )
+    parser.add_argument(
+        "--keep-float",
+        action="store_true",
+        help="With --quantize int8, also keep float vectors so matches can be re-ranked at full precision.",
+    )
+    parser.add_argument(
+        "--ann",
+        action="store_true",
+        help="Also build the IVF index (.mcp/cache/skills_ann.npz) used for large catalogs; requires numpy.",
+    )
+    parser.add_argument("--ann-lists", type=int, default=0, help="IVF cells (default: 4 x sqrt(skills)).")
+    parser.add_argument("--ann-iterations", type=int, default=10, help="k-means iterations (default: 10).")
+    parser.add_argument(
+        "--no-pack",
+        action="store_true",
+        help="Skip compiling .mcp/cache/skills.pack (metadata, BM25 postings, embedding matrix).",
+    )
     return parser
 
 
@@ -57,6 +81,7 @@ def main(argv: Sequence[str] | None = None) -> int:
         sys.path.insert(0, str(mcprouter_src))
 
     from mcp_router.skills import SkillManager  # pylint: disable=import-error
+    from mcp_router.skills.vectors import quantize_int8  # pylint: disable=import-error
 
     transformer = _load_transformer(args.model)
 
@@ -77,20 +102,36 @@ def main(argv: Sequence[str] | None = None) -> int:
     inputs = [f"{skill.name}\n{skill.description}" for skill in skills]
     vectors = _encode(transformer, inputs)
 
-    payload = {
+    by_path = {skill.rel_path: vector for skill, vector in zip(skills, vectors, strict=True)}
+    payload: dict[str, object] = {
         "model": args.model,
         "generated_at": datetime.now(UTC).isoformat().replace("+00:00", "Z"),
-        "embeddings": {
-            skill.rel_path: vector for skill, vector in zip(skills, vectors, strict=True)
-        },
+        "quantization": args.quantize,
         "frontmatter_hashes": {
             skill.rel_path: skill.frontmatter_hash for skill in skills
         },
     }
+    if args.quantize == "none" or args.keep_float:
+        payload["embeddings"] = by_path
+    if args.quantize == "int8":
+        quantized = {}
+        for rel_path, vector in by_path.items():
+            scale, codes = quantize_int8(vector)
+            quantized[rel_path] = {"scale": scale, "codes": base64.b64encode(codes).decode("ascii")}
+        payload["embeddings_int8"] = quantized
     cache_path = root / ".mcp/cache/skills_embeddings.json"
     cache_path.parent.mkdir(parents=True, exist_ok=True)
     cache_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
     print(f"Wrote embeddings for {len(skills)} skills to {cache_path}")
+    if not args.no_pack:
+        pack_path = manager.build_pack(embeddings=by_path, model=args.model)
+        print(f"Wrote skills pack to {pack_path}")
+    if args.ann:
+        try:
+            ann_path = manager.build_ann(nlist=args.ann_lists, iterations=args.ann_iterations, model=args.model)
+        except (RuntimeError, ValueError) as exc:
+            raise SystemExit(f"failed to build ANN index: {exc}") from exc
+        print(f"Wrote ANN index to {ann_path}")
     return 0
 
 
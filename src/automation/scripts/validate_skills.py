@@ -2,7 +2,7 @@
 
 Validates shared `/skills/` and agent-specific `skills/` directories:
 - Frontmatter must contain only `name` and `description` with length limits.
-- Body token budget must stay within the 5k guideline.
+- Body token budget must stay within the 5k guideline (estimated, exact near the limit).
 - Flags dangerous shell command patterns in instructions.
 - Ensures registry and allowlist scaffolding are structurally sound.
 """
@@ -16,10 +16,17 @@ from pathlib import Path
 from typing import Dict, Iterable, List, Tuple
 
 ROOT = Path(__file__).resolve().parents[3]
+MCPROUTER_SRC = ROOT / "src/mcprouter/src"
+if MCPROUTER_SRC.exists() and str(MCPROUTER_SRC) not in sys.path:
+    sys.path.insert(0, str(MCPROUTER_SRC))
+
+from mcp_router.tokens import default_token_service  # noqa: E402  # pylint: disable=import-error
+
 SKILLS_DIR = ROOT / "skills"
 AGENTS_DIR = ROOT / "agents"
 REGISTRY_PATH = SKILLS_DIR / "registry.json"
 ALLOWLIST_PATH = SKILLS_DIR / "ALLOWLIST.txt"
+BODY_TOKEN_LIMIT = 5000
 
 DANGEROUS_PATTERNS = [
     r"\brm\s+-rf\b",
@@ -168,9 +175,9 @@ def check_frontmatter(path: Path, metadata: Dict[str, str]) -> List[str]:
 
 def check_body(path: Path, body: str) -> List[str]:
     errors: List[str] = []
-    tokens = body.split()
-    if len(tokens) > 5000:
-        errors.append(f"{path}: body contains {len(tokens)} tokens (>5000 guideline).")
+    tokens = default_token_service().check(body, BODY_TOKEN_LIMIT)
+    if tokens.tokens > BODY_TOKEN_LIMIT:
+        errors.append(f"{path}: body contains {tokens.tokens} tokens (>{BODY_TOKEN_LIMIT} guideline).")
     text_lower = body.lower()
     for pattern in DANGEROUS_PATTERNS:
         if re.search(pattern, text_lower):
@@ -15,8 +15,9 @@ from typing import Any, Optional
 from mcp.client.session import ClientSession
 from mcp.client.stdio import StdioServerParameters, stdio_client
 
-from agents.shared.tooling.token_utils import TokenUsage, ensure_within_limit
+from agents.shared.tooling.token_utils import TokenUsage
 from automation.workflows.lib import default_gateway_args, resolve_gateway_spec
+from mcp_router.tokens import default_token_service
 
 _LOG = logging.getLogger(__name__)
 
@@ -251,12 +252,10 @@ class CodexMCPManager:
         target_model = model or os.environ.get("MAG_CODEX_MODEL", "gpt-5-codex-medium")
         token_usage: TokenUsage | None = None
         if token_limit is not None:
-            token_usage = ensure_within_limit(
-                prompt,
-                model=target_model,
-                limit=token_limit,
-                buffer=max(token_buffer, 0),
-            )
+            buffer = max(token_buffer, 0)
+            # Prompts whose UTF-8 length fits skip tiktoken; anything that might not fit is counted exactly.
+            measured = default_token_service().check(prompt, max(token_limit - buffer, 0), model=target_model)
+            token_usage = TokenUsage(tokens=measured.tokens, limit=token_limit, buffer=buffer)
             if token_usage.exceeded:
                 raise ValueError(
                     "Codex prompt exceeds token budget: "
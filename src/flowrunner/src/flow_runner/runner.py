@@ -183,6 +183,8 @@ class FlowRunner:
             for step in raw_steps
             if step.id in allowed_ids and step.id not in self._precompleted
         ]
+        self._indegree, self._dependents = self._dependency_graph()
+        self._step_index = {step.id: index for index, step in enumerate(self._steps)}
         self._stats: Dict[str, StepAccumulator] = {
             step.id: StepAccumulator() for step in self._steps
         }
@@ -238,6 +240,8 @@ class FlowRunner:
                 if self._log_writer is not None:
                     self._log_writer.close()
                     self._log_writer = None
+                if self._skill_guard is not None:
+                    self._skill_guard.flush_telemetry()
                 self._pop_agent_paths()
                 self._pop_run_env()
         finished_at = datetime.now(UTC)
@@ -251,26 +255,46 @@ class FlowRunner:
 
     # ------------------------------------------------------------------
     def plan(self) -> List[str]:
-        """Return the step execution order without running anything."""
+        """Return the step execution order without running anything.
 
-        pending: Dict[str, BaseStep] = {step.id: step for step in self._steps}
-        completed: set[str] = set(self._precompleted)
+        Kahn's algorithm over the precomputed dependency counts, one layer at
+        a time; each layer keeps the steps' declaration order.
+        """
+
+        indegree = dict(self._indegree)
+        frontier = [step_id for step_id, count in indegree.items() if count == 0]
         plan: List[str] = []
-        while pending:
-            ready = [
-                step
-                for step in pending.values()
-                if set(step.dependencies).issubset(completed)
-            ]
-            if not ready:
-                missing = ", ".join(sorted(pending.keys()))
-                raise StepExecutionError(f"cyclic or missing dependencies detected: {missing}")
-            for step in ready:
-                plan.append(step.id)
-                completed.add(step.id)
-                pending.pop(step.id, None)
+        while frontier:
+            plan.extend(frontier)
+            next_frontier: List[str] = []
+            for step_id in frontier:
+                for dependent_id in self._dependents.get(step_id, ()):
+                    indegree[dependent_id] -= 1
+                    if indegree[dependent_id] == 0:
+                        next_frontier.append(dependent_id)
+            next_frontier.sort(key=self._step_index.__getitem__)
+            frontier = next_frontier
+        if len(plan) < len(indegree):
+            missing = ", ".join(sorted(step_id for step_id, count in indegree.items() if count))
+            raise StepExecutionError(f"cyclic or missing dependencies detected: {missing}")
         return plan
 
+    def _dependency_graph(self) -> tuple[Dict[str, int], Dict[str, List[str]]]:
+        """Unmet dependency count per step and the dependents of each dependency id.
+
+        Precompleted steps count as met; dependencies outside the selected
+        steps never are, so their dependents surface as missing.
+        """
+
+        indegree: Dict[str, int] = {}
+        dependents: Dict[str, List[str]] = {}
+        for step in self._steps:
+            unmet = [dep for dep in step.dependencies if dep not in self._precompleted]
+            indegree[step.id] = len(unmet)
+            for dependency in unmet:
+                dependents.setdefault(dependency, []).append(step.id)
+        return indegree, dependents
+
     # ------------------------------------------------------------------
     def run_skill_script(
         self,
@@ -299,40 +323,67 @@ class FlowRunner:
                 f"skill script execution blocked ({exc.reason})"
             ) from exc
 
+    async def arun_skill_script(
+        self,
+        *,
+        skill_name: str,
+        script_path: str | Path,
+        args: Sequence[str] | None = None,
+        allow_exec: bool,
+        env: Optional[Mapping[str, str]] = None,
+        timeout_sec: Optional[float] = None,
+        max_output_bytes: Optional[int] = None,
+    ) -> Dict[str, object]:
+        """Async variant of :meth:`run_skill_script`; output is streamed under ``artifacts/skills``."""
+
+        if self._skill_guard is None:
+            raise StepExecutionError("skill guard is not initialized")
+        try:
+            return await self._skill_guard.aexecute(
+                skill_name=skill_name,
+                script_path=script_path,
+                args=args,
+                allow_exec=allow_exec,
+                workspace_dir=self.workspace_dir,
+                env=env,
+                output_dir=self.artifacts_dir / "skills",
+                timeout_sec=timeout_sec,
+                max_output_bytes=max_output_bytes,
+            )
+        except SkillExecutionError as exc:
+            raise StepExecutionError(
+                f"skill script execution {exc.status} ({exc.reason})"
+            ) from exc
+
     # ------------------------------------------------------------------
     async def _execute(self, context: ExecutionContext) -> ExecutionResult:
+        """Run ready steps concurrently as their dependencies complete.
+
+        Each task reports its outcome through a done-callback onto a completion
+        queue, so handling a finished step costs O(1 + its dependents)
+        regardless of how many steps are still running.
+        """
+
         pending_steps: Dict[str, BaseStep] = {step.id: step for step in self._steps}
         completed: Set[str] = set(self._precompleted)
         failed_fatal = False
         failed_outcomes: List[StepOutcome] = []
 
-        dependents: Dict[str, List[str]] = {step_id: [] for step_id in self._steps_by_id}
-        for step in self._steps_by_id.values():
-            for dependency in step.dependencies:
-                dependents.setdefault(dependency, []).append(step.id)
-
-        remaining_deps: Dict[str, int] = {}
-        for step in self._steps:
-            remaining = sum(1 for dep in step.dependencies if dep not in completed)
-            remaining_deps[step.id] = remaining
-
+        remaining_deps = dict(self._indegree)
         ready: deque[BaseStep] = deque()
-
-        for step_id, step in list(pending_steps.items()):
-            if remaining_deps.get(step_id, 0) == 0:
-                ready.append(step)
-                pending_steps.pop(step_id, None)
+        for step_id, count in remaining_deps.items():
+            if count == 0:
+                ready.append(pending_steps.pop(step_id))
 
         if not ready and pending_steps:
             missing = ", ".join(sorted(pending_steps.keys()))
             raise StepExecutionError(f"cyclic or missing dependencies detected: {missing}")
 
         running: Dict[asyncio.Task[StepOutcome], BaseStep] = {}
+        completions: asyncio.Queue[asyncio.Task[StepOutcome]] = asyncio.Queue()
 
         def mark_completed(step_id: str) -> None:
-            for dependent_id in dependents.get(step_id, []):
-                if dependent_id not in remaining_deps:
-                    continue
+            for dependent_id in self._dependents.get(step_id, ()):
                 remaining_deps[dependent_id] -= 1
                 if remaining_deps[dependent_id] == 0:
                     dependent = pending_steps.pop(dependent_id, None)
@@ -343,43 +394,37 @@ class FlowRunner:
             while ready and not failed_fatal:
                 step = ready.popleft()
                 task = asyncio.create_task(self._run_step(step, context))
+                task.add_done_callback(completions.put_nowait)
                 running[task] = step
 
             if not running:
                 missing = ", ".join(sorted(pending_steps.keys()))
                 raise StepExecutionError(f"cyclic or missing dependencies detected: {missing}")
 
-            done, _ = await asyncio.wait(
-                running.keys(),
-                return_when=asyncio.FIRST_COMPLETED,
-            )
-
-            for task in done:
-                step = running.pop(task)
-                try:
-                    outcome = task.result()
-                except Exception as exc:  # pragma: no cover - defensive
-                    outcome = StepOutcome(
-                        step_id=step.id,
-                        success=False,
-                        latency_ms=None,
-                        error=exc,
-                        extra={},
-                        fatal=not step.continue_on_error,
-                    )
-                if outcome.success:
+            task = await completions.get()
+            step = running.pop(task)
+            try:
+                outcome = task.result()
+            except Exception as exc:  # pragma: no cover - defensive
+                outcome = StepOutcome(
+                    step_id=step.id,
+                    success=False,
+                    latency_ms=None,
+                    error=exc,
+                    extra={},
+                    fatal=not step.continue_on_error,
+                )
+            if outcome.success:
+                completed.add(step.id)
+                mark_completed(step.id)
+            else:
+                failed_outcomes.append(outcome)
+                self._stats[step.id].fail += 1
+                if step.continue_on_error:
                     completed.add(step.id)
                     mark_completed(step.id)
                 else:
-                    failed_outcomes.append(outcome)
-                    self._stats[step.id].fail += 1
-                    if step.continue_on_error:
-                        completed.add(step.id)
-                        mark_completed(step.id)
-                    else:
-                        failed_fatal = True
-                if failed_fatal:
-                    break
+                    failed_fatal = True
 
             if failed_fatal:
                 remaining_tasks = list(running.keys())
@@ -869,12 +914,29 @@ class FlowRunner:
         sandbox_mode = os.getenv("MCP_SKILLS_SANDBOX", "read-only")
         allowlist = (self.workspace_dir / "skills/ALLOWLIST.txt").resolve()
         telemetry_path = (self.workspace_dir / "telemetry/skills/events.jsonl").resolve()
+        verified_copies = self._resolve_bool(os.getenv("MCP_SKILLS_EXEC_VERIFIED_COPY"), default=False)
+        limits: Dict[str, Any] = {}
+        for env_name, key, cast in (
+            ("MCP_SKILLS_EXEC_CONCURRENCY", "max_concurrency", int),
+            ("MCP_SKILLS_EXEC_TIMEOUT_SEC", "timeout_sec", float),
+            ("MCP_SKILLS_EXEC_MAX_OUTPUT_BYTES", "max_output_bytes", int),
+        ):
+            raw = os.getenv(env_name)
+            if raw:
+                try:
+                    parsed = cast(raw)
+                except ValueError:
+                    continue
+                if parsed >= 1:
+                    limits[key] = parsed
         return SkillExecutionGuard(
             root=self.workspace_dir,
             exec_enabled=exec_flag,
             sandbox_mode=sandbox_mode,
             allowlist_path=allowlist,
             telemetry_path=telemetry_path,
+            verified_copy_dir=(self.workspace_dir / ".mcp/cache/skills_exec") if verified_copies else None,
+            **limits,
         )
 
     @staticmethod
@@ -1,22 +1,47 @@
-"""Skill execution guardrails for Flow Runner."""
+"""Skill execution guardrails for Flow Runner.
+
+Script hashes are cached per (device, inode, size, mtime_ns), so an unchanged
+script is not re-read on every call, and ``ALLOWLIST.txt`` is re-parsed (with
+its argument patterns precompiled) whenever it changes on disk. With
+``verified_copy_dir`` the guard executes a read-only, content-addressed copy
+of the bytes it verified rather than the workspace file, closing the window
+between hashing and exec. Copies live in ``<dir>/<sha256>/<script name>``, so
+scripts that locate siblings through their own path should not use it.
+
+:meth:`SkillExecutionGuard.aexecute` runs scripts as asyncio subprocesses
+under a per-loop concurrency cap, streams their output to log files and kills
+the process group on timeout; :meth:`SkillExecutionGuard.execute` remains the
+blocking path.
+"""
 
 from __future__ import annotations
 
-import json
+import asyncio
+import hashlib
 import os
 import re
+import signal
 import subprocess
 import threading
-from dataclasses import dataclass
-from datetime import UTC, datetime
+import time
+import uuid
+import weakref
+from dataclasses import dataclass, field
 from hashlib import sha256
 from pathlib import Path
 from typing import Dict, Iterable, List, Mapping, Optional, Sequence
 
-from mcp_router.redaction import mask_sensitive
+from mcp_router.telemetry import TelemetryPolicy, TelemetrySink
 
 DEFAULT_ALLOWLIST_PATH = Path("skills/ALLOWLIST.txt")
 DEFAULT_TELEMETRY_PATH = Path("telemetry/skills/events.jsonl")
+DEFAULT_OUTPUT_DIR = Path(".mcp/cache/skills_output")
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_TIMEOUT_SEC = 300.0
+DEFAULT_MAX_OUTPUT_BYTES = 16 * 1024 * 1024
+# Bytes of each stream kept in memory for return values and telemetry previews.
+INLINE_OUTPUT_BYTES = 64 * 1024
+_READ_CHUNK = 64 * 1024
 
 
 @dataclass(frozen=True)
@@ -25,6 +50,38 @@ class AllowlistEntry:
 
     sha256: str
     args_pattern: str
+    # ``None`` with a non-empty ``args_pattern`` means the pattern does not compile: nothing matches.
+    compiled: Optional[re.Pattern[str]] = field(default=None, compare=False, repr=False)
+
+    def allows(self, joined_args: str) -> bool:
+        if not self.args_pattern:
+            return True
+        return self.compiled is not None and self.compiled.fullmatch(joined_args) is not None
+
+
+class _OutputStream:
+    """Log file for one output stream plus its in-memory head."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.size = 0
+        self._handle = path.open("wb")
+        self._head = bytearray()
+
+    def write(self, chunk: bytes) -> None:
+        if not chunk:
+            return
+        self._handle.write(chunk)
+        self.size += len(chunk)
+        if len(self._head) < INLINE_OUTPUT_BYTES:
+            self._head += chunk[: INLINE_OUTPUT_BYTES - len(self._head)]
+
+    def close(self) -> None:
+        if not self._handle.closed:
+            self._handle.close()
+
+    def text(self) -> str:
+        return self._head.decode("utf-8", errors="replace")
 
 
 class SkillExecutionError(RuntimeError):
@@ -47,18 +104,63 @@ class SkillExecutionGuard:
         sandbox_mode: str = "read-only",
         allowlist_path: Optional[Path] = None,
         telemetry_path: Optional[Path] = None,
+        telemetry_policy: Optional[TelemetryPolicy] = None,
+        verified_copy_dir: Optional[Path] = None,
+        output_dir: Optional[Path] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        timeout_sec: Optional[float] = DEFAULT_TIMEOUT_SEC,
+        max_output_bytes: int = DEFAULT_MAX_OUTPUT_BYTES,
     ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
         self._root = root
         self._exec_enabled = exec_enabled
         self._sandbox_mode = sandbox_mode
         self._allowlist_path = (allowlist_path or (root / DEFAULT_ALLOWLIST_PATH)).resolve()
         self._telemetry_path = (telemetry_path or (root / DEFAULT_TELEMETRY_PATH)).resolve()
+        self._verified_copy_dir = verified_copy_dir.resolve() if verified_copy_dir is not None else None
+        self._allowlist_lock = threading.Lock()
+        self._allowlist_stamp = self._allowlist_file_stamp()
         self._allowlist = self._load_allowlist()
+        # absolute script path -> ((st_dev, st_ino, st_size, st_mtime_ns), sha256)
+        self._verified: Dict[str, tuple[tuple[int, int, int, int], str]] = {}
+        self._verify_lock = threading.Lock()
+        self._verify_stats = {"hash_cache_hits": 0, "hash_cache_misses": 0, "allowlist_reloads": 0}
+        self._output_dir = output_dir or (root / DEFAULT_OUTPUT_DIR)
+        self._max_concurrency = max_concurrency
+        self._timeout_sec = timeout_sec
+        self._max_output_bytes = max_output_bytes
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._semaphore_lock = threading.Lock()
+        self._telemetry_policy = telemetry_policy
+        self._telemetry: Optional[TelemetrySink] = None
         self._telemetry_lock = threading.Lock()
 
     # ------------------------------------------------------------------ #
     # Public API
     # ------------------------------------------------------------------ #
+    def flush_telemetry(self, timeout: float = 5.0) -> bool:
+        """Wait until queued telemetry events are written; ``False`` on timeout."""
+
+        sink = self._telemetry
+        return sink.flush(timeout) if sink is not None else True
+
+    def verification_stats(self) -> Dict[str, int]:
+        """Hash cache hits and misses, and how often the allowlist was reloaded."""
+
+        with self._verify_lock:
+            return dict(self._verify_stats)
+
+    def close(self) -> None:
+        """Release the shared telemetry sink (queued events are written first)."""
+
+        with self._telemetry_lock:
+            sink, self._telemetry = self._telemetry, None
+        if sink is not None:
+            sink.release()
+
     def execute(
         self,
         *,
@@ -73,6 +175,227 @@ class SkillExecutionGuard:
 
         args = list(args or [])
         workspace = (workspace_dir or self._root).resolve()
+        script_rel, exec_path, actual_hash, verification = self._authorize(skill_name, script_path, args, allow_exec)
+
+        started = time.perf_counter()
+        try:
+            result = subprocess.run(
+                [str(exec_path), *args],
+                cwd=workspace,
+                env=self._build_env(env),
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+        except subprocess.CalledProcessError as exc:
+            self._emit_result(
+                script_rel,
+                status="failed",
+                stdout=exc.stdout or "",
+                stderr=exc.stderr or "",
+                exit_code=exc.returncode,
+                sha=actual_hash,
+                skill=skill_name,
+                duration_ms=(time.perf_counter() - started) * 1000,
+                verification=verification,
+            )
+            raise SkillExecutionError(
+                f"skill script failed with exit code {exc.returncode}",
+                status="failed",
+                reason="non_zero_exit",
+            ) from exc
+        except FileNotFoundError as exc:
+            self._emit_blocked(script_rel, "script_not_found", skill=skill_name)
+            raise SkillExecutionError(
+                "script executable not found or lacks execute permissions",
+                status="blocked",
+                reason="script_not_found",
+            ) from exc
+        except PermissionError as exc:
+            self._emit_blocked(script_rel, "permission_denied", skill=skill_name)
+            raise SkillExecutionError(
+                "skill script is not executable or permission was denied",
+                status="blocked",
+                reason="permission_denied",
+            ) from exc
+
+        self._emit_result(
+            script_rel,
+            status="succeeded",
+            stdout=result.stdout,
+            stderr=result.stderr,
+            exit_code=0,
+            sha=actual_hash,
+            skill=skill_name,
+            duration_ms=(time.perf_counter() - started) * 1000,
+            verification=verification,
+        )
+        return {
+            "stdout": result.stdout,
+            "stderr": result.stderr,
+            "returncode": result.returncode,
+            "path": script_rel,
+        }
+
+    async def aexecute(
+        self,
+        *,
+        skill_name: str,
+        script_path: str | Path,
+        args: Sequence[str] | None = None,
+        allow_exec: bool,
+        workspace_dir: Optional[Path] = None,
+        env: Optional[Mapping[str, str]] = None,
+        output_dir: Optional[Path] = None,
+        timeout_sec: Optional[float] = None,
+        max_output_bytes: Optional[int] = None,
+    ) -> Dict[str, object]:
+        """Asynchronous :meth:`execute` with a concurrency cap, wall-clock and output limits.
+
+        Stdout and stderr are streamed to ``<output_dir>/<run>.stdout.log`` and
+        ``.stderr.log`` as they arrive; only the first
+        ``INLINE_OUTPUT_BYTES`` of each stream are kept in memory for the
+        returned ``stdout`` / ``stderr`` and the telemetry previews. The script
+        runs in its own session, so a timeout, an exceeded output limit or
+        cancellation kills its whole process group. At most ``max_concurrency``
+        scripts run at once per event loop; the timeout starts once a slot is
+        acquired.
+        """
+
+        args = list(args or [])
+        workspace = (workspace_dir or self._root).resolve()
+        script_rel, exec_path, actual_hash, verification = self._authorize(skill_name, script_path, args, allow_exec)
+        timeout = self._timeout_sec if timeout_sec is None else timeout_sec
+        output_limit = self._max_output_bytes if max_output_bytes is None else max_output_bytes
+        directory = (output_dir or self._output_dir).resolve()
+
+        async with self._concurrency_slot():
+            # Log files are only opened once a slot is held, so queued calls hold no descriptors.
+            directory.mkdir(parents=True, exist_ok=True)
+            stem = f"{time.strftime('%Y%m%dT%H%M%S')}-{Path(script_rel).name}-{uuid.uuid4().hex[:8]}"
+            streams = {
+                "stdout": _OutputStream(directory / f"{stem}.stdout.log"),
+                "stderr": _OutputStream(directory / f"{stem}.stderr.log"),
+            }
+            started = time.perf_counter()
+            try:
+                try:
+                    process = await asyncio.create_subprocess_exec(
+                        str(exec_path),
+                        *args,
+                        cwd=workspace,
+                        env=self._build_env(env),
+                        stdin=asyncio.subprocess.DEVNULL,
+                        stdout=asyncio.subprocess.PIPE,
+                        stderr=asyncio.subprocess.PIPE,
+                        start_new_session=True,
+                    )
+                except FileNotFoundError as exc:
+                    self._discard_streams(streams)
+                    self._emit_blocked(script_rel, "script_not_found", skill=skill_name)
+                    raise SkillExecutionError(
+                        "script executable not found or lacks execute permissions",
+                        status="blocked",
+                        reason="script_not_found",
+                    ) from exc
+                except PermissionError as exc:
+                    self._discard_streams(streams)
+                    self._emit_blocked(script_rel, "permission_denied", skill=skill_name)
+                    raise SkillExecutionError(
+                        "skill script is not executable or permission was denied",
+                        status="blocked",
+                        reason="permission_denied",
+                    ) from exc
+
+                over_limit = asyncio.Event()
+                readers = [
+                    asyncio.ensure_future(self._pump(pipe, streams[name], streams, output_limit, over_limit))
+                    for name, pipe in (("stdout", process.stdout), ("stderr", process.stderr))
+                ]
+                limit_hit = asyncio.ensure_future(over_limit.wait())
+                finished = asyncio.ensure_future(asyncio.gather(process.wait(), *readers))
+                reason: Optional[str] = None
+                try:
+                    done, _ = await asyncio.wait(
+                        {finished, limit_hit},
+                        timeout=timeout if timeout and timeout > 0 else None,
+                        return_when=asyncio.FIRST_COMPLETED,
+                    )
+                    if finished not in done:
+                        reason = "output_limit" if limit_hit in done else "timeout"
+                        self._kill_group(process)
+                    await finished
+                except asyncio.CancelledError:
+                    self._kill_group(process)
+                    finished.cancel()
+                    await asyncio.gather(finished, return_exceptions=True)
+                    raise
+                finally:
+                    limit_hit.cancel()
+                # The process can exit in the same loop turn as the overrun; the event is authoritative.
+                if reason is None and over_limit.is_set():
+                    reason = "output_limit"
+            finally:
+                for stream in streams.values():
+                    stream.close()
+            duration_ms = (time.perf_counter() - started) * 1000
+
+        result = {
+            "stdout": streams["stdout"].text(),
+            "stderr": streams["stderr"].text(),
+            "returncode": process.returncode,
+            "path": script_rel,
+            "stdout_path": str(streams["stdout"].path),
+            "stderr_path": str(streams["stderr"].path),
+            "output_bytes": sum(stream.size for stream in streams.values()),
+        }
+        if reason is None and process.returncode != 0:
+            reason = "non_zero_exit"
+        self._emit_result(
+            script_rel,
+            status="failed" if reason else "succeeded",
+            stdout=result["stdout"],
+            stderr=result["stderr"],
+            exit_code=process.returncode,
+            sha=actual_hash,
+            reason=reason,
+            skill=skill_name,
+            duration_ms=duration_ms,
+            verification=verification,
+            artifacts={
+                "stdout_artifact": result["stdout_path"],
+                "stderr_artifact": result["stderr_path"],
+                "output_bytes": result["output_bytes"],
+            },
+        )
+        if reason == "timeout":
+            raise SkillExecutionError(
+                f"skill script exceeded its {timeout:g}s timeout", status="failed", reason="timeout"
+            )
+        if reason == "output_limit":
+            raise SkillExecutionError(
+                f"skill script exceeded its {output_limit} byte output limit", status="failed", reason="output_limit"
+            )
+        if reason:
+            raise SkillExecutionError(
+                f"skill script failed with exit code {process.returncode}",
+                status="failed",
+                reason="non_zero_exit",
+            )
+        return result
+
+    # ------------------------------------------------------------------ #
+    # Authorization
+    # ------------------------------------------------------------------ #
+    def _authorize(
+        self, skill_name: str, script_path: str | Path, args: Sequence[str], allow_exec: bool
+    ) -> tuple[str, Path, str, str]:
+        """Run every guard check; returns ``(script_rel, exec_path, sha256, verification)``.
+
+        Emits the attempt event and, on refusal, the blocked result before
+        raising :class:`SkillExecutionError`.
+        """
+
         resolved_script = self._resolve_script(script_path)
         script_rel = resolved_script.relative_to(self._root).as_posix()
         self._emit_event(
@@ -103,7 +426,7 @@ class SkillExecutionGuard:
                 reason="skill_not_allow_exec",
             )
 
-        entry = self._allowlist.get(script_rel)
+        entry = self._current_allowlist().get(script_rel)
         if entry is None:
             self._emit_blocked(script_rel, "missing_allowlist_entry", skill=skill_name)
             raise SkillExecutionError(
@@ -113,7 +436,7 @@ class SkillExecutionGuard:
             )
 
         try:
-            actual_hash = self._hash_file(resolved_script)
+            actual_hash, exec_path, verification = self._verify_script(resolved_script, entry.sha256)
         except FileNotFoundError as exc:
             self._emit_blocked(script_rel, "script_not_found", skill=skill_name)
             raise SkillExecutionError(
@@ -130,74 +453,93 @@ class SkillExecutionGuard:
                 reason="hash_mismatch",
             )
 
-        if entry.args_pattern:
-            joined_args = " ".join(args)
-            if not re.fullmatch(entry.args_pattern, joined_args):
-                self._emit_blocked(script_rel, "args_not_allowed", skill=skill_name)
-                raise SkillExecutionError(
-                    "script arguments rejected by allowlist pattern",
-                    status="blocked",
-                    reason="args_not_allowed",
-                )
-
-        try:
-            result = subprocess.run(
-                [str(resolved_script), *args],
-                cwd=workspace,
-                env=self._build_env(env),
-                check=True,
-                capture_output=True,
-                text=True,
-            )
-        except subprocess.CalledProcessError as exc:
-            self._emit_result(
-                script_rel,
-                status="failed",
-                stdout=exc.stdout or "",
-                stderr=exc.stderr or "",
-                exit_code=exc.returncode,
-                sha=actual_hash,
-                skill=skill_name,
-            )
+        if not entry.allows(" ".join(args)):
+            self._emit_blocked(script_rel, "args_not_allowed", skill=skill_name)
             raise SkillExecutionError(
-                f"skill script failed with exit code {exc.returncode}",
-                status="failed",
-                reason="non_zero_exit",
-            ) from exc
-        except FileNotFoundError as exc:
-            self._emit_blocked(script_rel, "script_not_found", skill=skill_name)
-            raise SkillExecutionError(
-                "script executable not found or lacks execute permissions",
+                "script arguments rejected by allowlist pattern",
                 status="blocked",
-                reason="script_not_found",
-            ) from exc
-        except PermissionError as exc:
-            self._emit_blocked(script_rel, "permission_denied", skill=skill_name)
-            raise SkillExecutionError(
-                "skill script is not executable or permission was denied",
-                status="blocked",
-                reason="permission_denied",
-            ) from exc
+                reason="args_not_allowed",
+            )
+        return script_rel, exec_path, actual_hash, verification
 
-        self._emit_result(
-            script_rel,
-            status="succeeded",
-            stdout=result.stdout,
-            stderr=result.stderr,
-            exit_code=0,
-            sha=actual_hash,
-            skill=skill_name,
-        )
-        return {
-            "stdout": result.stdout,
-            "stderr": result.stderr,
-            "returncode": result.returncode,
-            "path": script_rel,
-        }
+    # ------------------------------------------------------------------ #
+    # Async subprocess helpers
+    # ------------------------------------------------------------------ #
+    def _concurrency_slot(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._semaphore_lock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                semaphore = self._semaphores[loop] = asyncio.Semaphore(self._max_concurrency)
+        return semaphore
+
+    @staticmethod
+    async def _pump(
+        reader: Optional[asyncio.StreamReader],
+        stream: "_OutputStream",
+        streams: Mapping[str, "_OutputStream"],
+        limit: int,
+        over_limit: asyncio.Event,
+    ) -> None:
+        if reader is None:
+            return
+        while chunk := await reader.read(_READ_CHUNK):
+            if limit > 0:
+                room = limit - sum(item.size for item in streams.values())
+                if len(chunk) > room:
+                    stream.write(chunk[: max(room, 0)])
+                    over_limit.set()
+                    # Keep draining so the child never blocks on a full pipe before it is killed.
+                    continue
+            stream.write(chunk)
+
+    @staticmethod
+    def _discard_streams(streams: Mapping[str, "_OutputStream"]) -> None:
+        """Close and remove the (empty) logs of a script that never started."""
+
+        for stream in streams.values():
+            stream.close()
+            stream.path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _kill_group(process: asyncio.subprocess.Process) -> None:
+        # Kill the session even after its leader exited: a backgrounded child can still hold the pipes open.
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            if process.returncode is None:
+                try:
+                    process.kill()
+                except ProcessLookupError:
+                    pass
 
     # ------------------------------------------------------------------ #
     # Allowlist helpers
     # ------------------------------------------------------------------ #
+    def _allowlist_file_stamp(self) -> Optional[tuple[int, int, int]]:
+        try:
+            stat = os.stat(self._allowlist_path)
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def _current_allowlist(self) -> Dict[str, AllowlistEntry]:
+        """The parsed allowlist, re-read when the file changed since the last parse.
+
+        A reload builds a new mapping and swaps the reference, so concurrent
+        callers see either the old or the new allowlist, never a mix.
+        """
+
+        stamp = self._allowlist_file_stamp()
+        if stamp != self._allowlist_stamp:
+            with self._allowlist_lock:
+                if stamp != self._allowlist_stamp:
+                    self._allowlist = self._load_allowlist()
+                    self._allowlist_stamp = stamp
+                    with self._verify_lock:
+                        self._verify_stats["allowlist_reloads"] += 1
+        return self._allowlist
+
     def _load_allowlist(self) -> Dict[str, AllowlistEntry]:
         entries: Dict[str, AllowlistEntry] = {}
         if not self._allowlist_path.exists():
@@ -208,7 +550,11 @@ class SkillExecutionGuard:
                 continue
             rel_path, sha, args_pattern = parts[0], parts[1], " ".join(parts[2:])
             key = Path(rel_path).as_posix()
-            entries[key] = AllowlistEntry(sha256=sha, args_pattern=args_pattern)
+            try:
+                compiled: Optional[re.Pattern[str]] = re.compile(args_pattern)
+            except re.error:
+                compiled = None
+            entries[key] = AllowlistEntry(sha256=sha, args_pattern=args_pattern, compiled=compiled)
         return entries
 
     def _iter_allowlist_lines(self) -> Iterable[str]:
@@ -237,11 +583,56 @@ class SkillExecutionGuard:
 
     @staticmethod
     def _hash_file(path: Path) -> str:
-        digest = sha256()
         with path.open("rb") as handle:
-            for chunk in iter(lambda: handle.read(8192), b""):
-                digest.update(chunk)
-        return digest.hexdigest()
+            return hashlib.file_digest(handle, "sha256").hexdigest()
+
+    def _verify_script(self, path: Path, expected: str) -> tuple[str, Path, str]:
+        """Return ``(sha256, path to execute, "cached" | "hashed")`` for ``path``.
+
+        The digest is reused while the file's (device, inode, size, mtime_ns)
+        is unchanged. With a copy directory, a matching script runs from its
+        content-addressed copy, written from the very bytes that were hashed.
+        """
+
+        stat = os.stat(path)
+        key = (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        with self._verify_lock:
+            cached = self._verified.get(str(path))
+        if cached is not None and cached[0] == key:
+            digest = cached[1]
+            copy = self._copy_path(digest, path)
+            if copy is None or digest != expected or copy.exists():
+                with self._verify_lock:
+                    self._verify_stats["hash_cache_hits"] += 1
+                return digest, copy if copy is not None and digest == expected else path, "cached"
+        if self._verified_copy_dir is None:
+            digest = self._hash_file(path)
+        else:
+            data = path.read_bytes()
+            digest = sha256(data).hexdigest()
+            if digest == expected:
+                self._write_copy(digest, path, data, executable=bool(stat.st_mode & 0o111))
+        with self._verify_lock:
+            self._verified[str(path)] = (key, digest)
+            self._verify_stats["hash_cache_misses"] += 1
+        copy = self._copy_path(digest, path)
+        return digest, copy if copy is not None and digest == expected else path, "hashed"
+
+    def _copy_path(self, digest: str, path: Path) -> Optional[Path]:
+        if self._verified_copy_dir is None:
+            return None
+        return self._verified_copy_dir / digest / path.name
+
+    def _write_copy(self, digest: str, path: Path, data: bytes, *, executable: bool) -> None:
+        target = self._copy_path(digest, path)
+        if target is None or target.exists():
+            return
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(f".{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        # Read-only, and executable only if the original was, so permission errors still surface.
+        os.chmod(tmp_path, 0o500 if executable else 0o400)
+        os.replace(tmp_path, target)
 
     def _build_env(self, extra: Optional[Mapping[str, str]]) -> Dict[str, str]:
         env = {
@@ -279,6 +670,9 @@ class SkillExecutionGuard:
         sha: Optional[str],
         reason: Optional[str] = None,
         skill: Optional[str] = None,
+        duration_ms: Optional[float] = None,
+        verification: Optional[str] = None,
+        artifacts: Optional[Mapping[str, object]] = None,
     ) -> None:
         payload = {
             "path": path,
@@ -293,21 +687,21 @@ class SkillExecutionGuard:
             payload["reason"] = reason
         if skill:
             payload["skill"] = skill
+        if duration_ms is not None:
+            payload["duration_ms"] = round(duration_ms, 3)
+        if verification:
+            payload["verification"] = verification
+        if artifacts:
+            payload.update(artifacts)
         self._emit_event("skill_exec_result", payload)
 
     def _emit_event(self, event: str, data: Mapping[str, object]) -> None:
-        serializable = mask_sensitive(dict(data))
-        body = {
-            "ts": datetime.now(UTC).isoformat().replace("+00:00", "Z"),
-            "event": event,
-            "data": serializable,
-        }
-        self._telemetry_path.parent.mkdir(parents=True, exist_ok=True)
-        line = json.dumps(body, ensure_ascii=False)
-        with self._telemetry_lock:
-            with self._telemetry_path.open("a", encoding="utf-8") as handle:
-                handle.write(line)
-                handle.write("\n")
-
+        sink = self._telemetry
+        if sink is None:
+            with self._telemetry_lock:
+                if self._telemetry is None:
+                    self._telemetry = TelemetrySink.acquire(self._telemetry_path, policy=self._telemetry_policy)
+                sink = self._telemetry
+        sink.emit(event, data)
 
 __all__ = ["AllowlistEntry", "SkillExecutionError", "SkillExecutionGuard"]
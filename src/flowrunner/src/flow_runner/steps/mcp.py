@@ -68,6 +68,7 @@ class McpStep(BaseStep):
                 "approval_policy": "never",
                 "config": provider_config,
                 "timeout_sec": spec.timeout_sec,
+                "artifacts_dir": context.artifacts_dir,
             }
             if isinstance(router_retries, int) and router_retries >= 0:
                 kwargs["retries"] = router_retries
@@ -82,6 +83,9 @@ class McpStep(BaseStep):
             target.parent.mkdir(parents=True, exist_ok=True)
             target.write_text(result.text, encoding="utf-8")
             save_meta["saved_text"] = str(target)
+        body_path = result.meta.get("body_path")
+        if body_path:
+            save_meta["body_path"] = body_path
         return {
             "provider": result.meta.get("provider"),
             "token_usage": result.meta.get("token_usage"),
@@ -219,6 +219,27 @@ def test_workflow_mag_flow_parallelization_graph() -> None:
     assert dependencies["qa"] == {"docs", "context"}
 
 
+def test_flow_runner_plan_orders_layers_and_reports_cycles(tmp_path: Path) -> None:
+    flow_path = tmp_path / "dag.yaml"
+    steps = [
+        {"id": "report", "uses": "shell", "run": "true", "depends_on": ["lint", "test"]},
+        {"id": "test", "uses": "shell", "run": "true", "depends_on": ["build"]},
+        {"id": "fetch", "uses": "shell", "run": "true"},
+        {"id": "lint", "uses": "shell", "run": "true", "depends_on": ["fetch"]},
+        {"id": "build", "uses": "shell", "run": "true", "depends_on": ["fetch"]},
+        {"id": "docs", "uses": "shell", "run": "true"},
+    ]
+    _write_flow(flow_path, {"version": 1, "steps": steps})
+    runner = FlowRunner(load_flow_from_path(flow_path), flow_path=flow_path, workspace_dir=tmp_path)
+    assert runner.plan() == ["fetch", "docs", "lint", "build", "test", "report"]
+
+    steps[2]["depends_on"] = ["report"]
+    _write_flow(flow_path, {"version": 1, "steps": steps})
+    runner = FlowRunner(load_flow_from_path(flow_path), flow_path=flow_path, workspace_dir=tmp_path)
+    with pytest.raises(StepExecutionError, match="build, fetch, lint, report, test"):
+        runner.plan()
+
+
 def test_flow_runner_emits_events(tmp_path: Path) -> None:
     flow_path = tmp_path / "events.yaml"
     _write_flow(
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import asyncio
 import stat
 import json
+import os
+import time
 from pathlib import Path
 
 import pytest
@@ -55,6 +58,7 @@ def test_execute_blocked_when_feature_flag_disabled(tmp_path: Path) -> None:
         )
     assert exc_info.value.status == "blocked"
     assert exc_info.value.reason == "skills_exec_disabled"
+    assert guard.flush_telemetry()
     assert telemetry.exists()
     events = telemetry.read_text(encoding="utf-8").strip().splitlines()
     decoded = [json.loads(event) for event in events if event.strip()]
@@ -85,6 +89,7 @@ def test_execute_succeeds_with_allowlist(tmp_path: Path) -> None:
     )
     assert result["returncode"] == 0
     assert "success" in result["stdout"]
+    assert guard.flush_telemetry()
     events = telemetry.read_text(encoding="utf-8").strip().splitlines()
     names = [json.loads(event)["event"] for event in events if event.strip()]
     assert names.count("skill_exec_attempt") == 1
@@ -137,6 +142,7 @@ def test_execute_blocks_when_script_missing(tmp_path: Path) -> None:
         )
     assert exc_info.value.status == "blocked"
     assert exc_info.value.reason == "script_not_found"
+    assert guard.flush_telemetry()
     events = telemetry.read_text(encoding="utf-8").strip().splitlines()
     decoded = [json.loads(event) for event in events if event.strip()]
     assert decoded[-1]["event"] == "skill_exec_result"
@@ -169,7 +175,182 @@ def test_execute_blocks_when_permission_denied(tmp_path: Path) -> None:
         )
     assert exc_info.value.status == "blocked"
     assert exc_info.value.reason == "permission_denied"
+    assert guard.flush_telemetry()
     events = telemetry.read_text(encoding="utf-8").strip().splitlines()
     decoded = [json.loads(event) for event in events if event.strip()]
     assert decoded[-1]["event"] == "skill_exec_result"
     assert decoded[-1]["data"]["reason"] == "permission_denied"
+
+
+def test_execute_caches_hashes_reloads_allowlist_and_runs_verified_copy(tmp_path: Path) -> None:
+    script = _make_script(tmp_path, "skills/demo/scripts/run.sh", "#!/usr/bin/env bash\necho \"cached $1\"")
+    sha = _hash_file(script)
+    allowlist = _write_allowlist(tmp_path, [f"skills/demo/scripts/run.sh {sha} ^one$"])
+    telemetry = tmp_path / "telemetry/skills/events.jsonl"
+    guard = SkillExecutionGuard(
+        root=tmp_path,
+        exec_enabled=True,
+        allowlist_path=allowlist,
+        telemetry_path=telemetry,
+        verified_copy_dir=tmp_path / ".mcp/cache/skills_exec",
+    )
+    kwargs = dict(skill_name="demo", script_path="skills/demo/scripts/run.sh", allow_exec=True, workspace_dir=tmp_path)
+    assert guard.execute(args=["one"], **kwargs)["stdout"].strip() == "cached one"
+    assert guard.execute(args=["one"], **kwargs)["returncode"] == 0
+    assert guard.verification_stats() == {"hash_cache_hits": 1, "hash_cache_misses": 1, "allowlist_reloads": 0}
+    copy = tmp_path / ".mcp/cache/skills_exec" / sha / "run.sh"
+    assert copy.read_text(encoding="utf-8") == script.read_text(encoding="utf-8")
+    assert not copy.stat().st_mode & stat.S_IWUSR
+
+    with pytest.raises(SkillExecutionError) as exc_info:
+        guard.execute(args=["two"], **kwargs)
+    assert exc_info.value.reason == "args_not_allowed"
+    allowlist.write_text(f"skills/demo/scripts/run.sh {sha} ^(one|two)$\n", encoding="utf-8")
+    assert guard.execute(args=["two"], **kwargs)["stdout"].strip() == "cached two"
+    assert guard.verification_stats()["allowlist_reloads"] == 1
+
+    script.write_text("#!/usr/bin/env bash\necho changed", encoding="utf-8")
+    with pytest.raises(SkillExecutionError) as exc_info:
+        guard.execute(args=["one"], **kwargs)
+    assert exc_info.value.reason == "hash_mismatch"
+    assert guard.flush_telemetry()
+    results = [
+        json.loads(line)["data"]
+        for line in telemetry.read_text(encoding="utf-8").splitlines()
+        if json.loads(line)["event"] == "skill_exec_result"
+    ]
+    assert [result.get("verification") for result in results if result["status"] == "succeeded"] == [
+        "hashed",
+        "cached",
+        "cached",
+    ]
+    guard.close()
+
+
+def _wait_for_exit(pid: int, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_aexecute_streams_output_caps_concurrency_and_kills_on_timeout(tmp_path: Path) -> None:
+    scripts = {
+        "echo": "#!/usr/bin/env bash\nfor i in $(seq 1 2000); do echo \"line $i\"; done\necho oops >&2",
+        "slow": "#!/usr/bin/env bash\nsleep 0.3\necho done",
+        "hang": "#!/usr/bin/env bash\nsleep 30 &\necho $! > \"$1\"\nwait",
+        "daemon": "#!/usr/bin/env bash\n(sleep 30) &\necho $! > \"$1\"\necho started",
+        "flood": "#!/usr/bin/env bash\nyes flood",
+    }
+    lines = []
+    for name, body in scripts.items():
+        script = _make_script(tmp_path, f"skills/demo/scripts/{name}.sh", body)
+        lines.append(f"skills/demo/scripts/{name}.sh {_hash_file(script)} .*")
+    _write_allowlist(tmp_path, lines)
+    telemetry = tmp_path / "telemetry/skills/events.jsonl"
+    guard = SkillExecutionGuard(
+        root=tmp_path,
+        exec_enabled=True,
+        allowlist_path=tmp_path / "skills/ALLOWLIST.txt",
+        telemetry_path=telemetry,
+        output_dir=tmp_path / "out",
+        max_concurrency=2,
+        max_output_bytes=64 * 1024,
+    )
+
+    def run(name: str, *args: str, **limits):
+        return guard.aexecute(
+            skill_name="demo",
+            script_path=f"skills/demo/scripts/{name}.sh",
+            args=list(args),
+            allow_exec=True,
+            workspace_dir=tmp_path,
+            **limits,
+        )
+
+    result = asyncio.run(run("echo"))
+    assert result["stdout"].splitlines()[-1] == "line 2000" and result["stderr"] == "oops\n"
+    assert Path(result["stdout_path"]).read_text(encoding="utf-8") == result["stdout"]
+
+    async def slow_batch() -> float:
+        started = time.perf_counter()
+        await asyncio.gather(*(run("slow") for _ in range(4)))
+        return time.perf_counter() - started
+
+    assert 0.6 <= asyncio.run(slow_batch()) < 3
+
+    child_pid = tmp_path / "child.pid"
+    started = time.perf_counter()
+    with pytest.raises(SkillExecutionError) as exc_info:
+        asyncio.run(run("hang", str(child_pid), timeout_sec=0.3))
+    assert exc_info.value.reason == "timeout" and time.perf_counter() - started < 5
+    assert _wait_for_exit(int(child_pid.read_text(encoding="utf-8")))
+    # The leader exits at once, but its backgrounded child keeps stdout open until the group is killed.
+    started = time.perf_counter()
+    with pytest.raises(SkillExecutionError) as exc_info:
+        asyncio.run(run("daemon", str(child_pid), timeout_sec=0.3))
+    assert exc_info.value.reason == "timeout" and time.perf_counter() - started < 5
+    assert _wait_for_exit(int(child_pid.read_text(encoding="utf-8")))
+    with pytest.raises(SkillExecutionError) as exc_info:
+        asyncio.run(run("flood"))
+    assert exc_info.value.reason == "output_limit"
+
+    assert guard.flush_telemetry()
+    results = [
+        json.loads(line)["data"]
+        for line in telemetry.read_text(encoding="utf-8").splitlines()
+        if json.loads(line)["event"] == "skill_exec_result"
+    ]
+    assert [result["reason"] for result in results[-3:]] == ["timeout", "timeout", "output_limit"]
+    assert results[-1]["output_bytes"] == 64 * 1024 and len(results[-1]["stdout_preview"]) == 160
+    assert Path(results[-1]["stdout_artifact"]).stat().st_size == 64 * 1024
+    guard.close()
+
+
+def test_aexecute_queued_and_cancelled_calls_leave_no_logs_or_descriptors(tmp_path: Path) -> None:
+    script = _make_script(tmp_path, "skills/demo/scripts/hang.sh", "#!/usr/bin/env bash\nsleep 30")
+    _write_allowlist(tmp_path, [f"skills/demo/scripts/hang.sh {_hash_file(script)} .*"])
+    output_dir = tmp_path / "out"
+    guard = SkillExecutionGuard(
+        root=tmp_path,
+        exec_enabled=True,
+        allowlist_path=tmp_path / "skills/ALLOWLIST.txt",
+        telemetry_path=tmp_path / "telemetry/skills/events.jsonl",
+        output_dir=output_dir,
+        max_concurrency=1,
+    )
+    open_fds = len(os.listdir("/proc/self/fd")) if os.path.isdir("/proc/self/fd") else None
+
+    async def scenario() -> None:
+        loop = asyncio.get_running_loop()
+        errors: list[dict] = []
+        loop.set_exception_handler(lambda _, context: errors.append(context))
+        tasks = [
+            asyncio.ensure_future(
+                guard.aexecute(
+                    skill_name="demo",
+                    script_path="skills/demo/scripts/hang.sh",
+                    allow_exec=True,
+                    workspace_dir=tmp_path,
+                )
+            )
+            for _ in range(10)
+        ]
+        await asyncio.sleep(0.3)
+        for task in tasks:
+            task.cancel()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        assert all(isinstance(result, asyncio.CancelledError) for result in results)
+        await asyncio.sleep(0.05)
+        assert errors == []
+
+    asyncio.run(scenario())
+    # Only the call that held the slot ever opened its logs.
+    assert len(list(output_dir.iterdir())) == 2
+    guard.close()
+    if open_fds is not None:
+        assert len(os.listdir("/proc/self/fd")) <= open_fds
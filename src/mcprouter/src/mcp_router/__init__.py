@@ -1,6 +1,6 @@
 """Public interface for the MCP Router package."""
 
-from .router import MCPRouter
+from .router import AdaptiveTimeoutConfig, MCPRouter, ShadowConfig
 from .schemas import Result
 
-__all__ = ["MCPRouter", "Result"]
+__all__ = ["AdaptiveTimeoutConfig", "MCPRouter", "Result", "ShadowConfig"]
@@ -3,9 +3,10 @@
 from __future__ import annotations
 
 import abc
-from typing import Dict
+from typing import Dict, Optional
 
 from ..schemas import ProviderRequest, ProviderResponse
+from ..tokens import estimate_tokens
 
 
 class BaseProvider(abc.ABC):
@@ -21,16 +22,23 @@ class BaseProvider(abc.ABC):
     def approx_token_usage(prompt: str) -> Dict[str, int]:
         """Estimate token usage with a conservative heuristic."""
 
-        ascii_chars = sum(1 for ch in prompt if ord(ch) < 128)
-        other_chars = len(prompt) - ascii_chars
-        approx_tokens = (ascii_chars + 3) // 4 + ((other_chars * 2) + 3) // 4
-        approx_tokens = max(1, approx_tokens)
-        return {"tokens": approx_tokens}
+        return {"tokens": max(1, estimate_tokens(prompt))}
 
 
 class ProviderError(RuntimeError):
-    """Error raised when a provider cannot fulfill a request."""
-
-    def __init__(self, message: str, *, retriable: bool = False) -> None:
+    """Error raised when a provider cannot fulfill a request.
+
+    ``retry_after`` carries a server-requested delay in seconds; the router
+    waits that long instead of its exponential backoff before retrying.
+    """
+
+    def __init__(
+        self,
+        message: str,
+        *,
+        retriable: bool = False,
+        retry_after: Optional[float] = None,
+    ) -> None:
         super().__init__(message)
         self.retriable = retriable
+        self.retry_after = retry_after
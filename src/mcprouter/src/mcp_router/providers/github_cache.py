@@ -0,0 +1,296 @@
+"""Conditional-request (ETag / Last-Modified) cache for the GitHub provider."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from hashlib import sha256
+from pathlib import Path
+from typing import Optional
+
+from ..schemas import ResponseBody
+
+_DEFAULT_MAX_ENTRIES = 256
+_DEFAULT_MEMORY_ENTRY_LIMIT = 1 << 20
+
+
+@dataclass(slots=True)
+class CachedResponse:
+    """Validators and body stored for a previously fetched resource."""
+
+    etag: Optional[str]
+    last_modified: Optional[str]
+    status_code: int
+    content_type: str
+    encoding: str
+    size: int
+    data: Optional[bytes] = None
+    body_path: Optional[Path] = None
+    link: Optional[str] = None
+
+    def to_body(self) -> ResponseBody:
+        if self.data is not None:
+            return ResponseBody(self.data, size=self.size, encoding=self.encoding)
+        return ResponseBody(path=self.body_path, size=self.size, encoding=self.encoding)
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ConditionalRequestCache:
+    """LRU of cached GET responses, optionally persisted under ``cache_dir``.
+
+    Bodies larger than ``memory_entry_limit`` stay on disk only and are read
+    lazily on a hit. ``max_entries`` bounds both the in-memory LRU and the
+    entries kept under ``cache_dir``; disk I/O runs in a worker thread. Every
+    304 served from the cache saves one GitHub rate-limit unit.
+    """
+
+    def __init__(
+        self,
+        *,
+        cache_dir: Path | None = None,
+        max_entries: int = _DEFAULT_MAX_ENTRIES,
+        memory_entry_limit: int = _DEFAULT_MEMORY_ENTRY_LIMIT,
+    ) -> None:
+        self._cache_dir = cache_dir
+        self._max_entries = max(1, max_entries)
+        self._memory_entry_limit = max(0, memory_entry_limit)
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        # Keys persisted under ``cache_dir`` in LRU order; indexed on first disk access.
+        self._disk_keys: OrderedDict[str, None] | None = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def rate_limit_units_saved(self) -> int:
+        return self.hits
+
+    @staticmethod
+    def make_key(url: str, *, accept: str, credential: str) -> str:
+        """Key on URL, representation, and a digest of the credential in use."""
+
+        material = "\n".join((url, accept, sha256(credential.encode("utf-8")).hexdigest()))
+        return sha256(material.encode("utf-8")).hexdigest()
+
+    async def lookup(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                if entry.body_path is not None and self._disk_keys is not None and key in self._disk_keys:
+                    self._disk_keys.move_to_end(key)
+                return entry
+        if self._cache_dir is None:
+            return None
+        return await asyncio.to_thread(self._lookup_on_disk, key)
+
+    def record_hit(self) -> None:
+        with self._lock:
+            self.hits += 1
+
+    def record_miss(self) -> None:
+        with self._lock:
+            self.misses += 1
+
+    async def store(
+        self,
+        key: str,
+        *,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        status_code: int,
+        content_type: str,
+        body: ResponseBody,
+        link: Optional[str] = None,
+    ) -> None:
+        args = (key, etag, last_modified, status_code, content_type, body, link)
+        if self._cache_dir is None:
+            self._store(*args)
+        else:
+            await asyncio.to_thread(self._store, *args)
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            if self._disk_keys is not None:
+                self._disk_keys.pop(key, None)
+        if self._cache_dir is not None:
+            self._unlink(key)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "rate_limit_units_saved": self.hits,
+            }
+
+    # ------------------------------------------------------------------ #
+    # Internal helpers
+    # ------------------------------------------------------------------ #
+    def _store(
+        self,
+        key: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        status_code: int,
+        content_type: str,
+        body: ResponseBody,
+        link: Optional[str],
+    ) -> None:
+        if not etag and not last_modified:
+            self.discard(key)
+            return
+        body_path: Optional[Path] = None
+        if self._cache_dir is not None:
+            body_path = self._persist(key, body, etag, last_modified, status_code, content_type, link)
+        keep_in_memory = not body.spilled and body.size <= self._memory_entry_limit
+        if not keep_in_memory and body_path is None:
+            return
+        entry = CachedResponse(
+            etag=etag,
+            last_modified=last_modified,
+            status_code=status_code,
+            content_type=content_type,
+            encoding=body.encoding,
+            size=body.size,
+            data=body.read_bytes() if keep_in_memory else None,
+            body_path=body_path,
+            link=link,
+        )
+        self._remember(key, entry)
+
+    def _lookup_on_disk(self, key: str) -> Optional[CachedResponse]:
+        self._index_disk()
+        with self._lock:
+            if self._disk_keys is None or key not in self._disk_keys:
+                return None
+        entry = self._load_from_disk(key)
+        if entry is not None:
+            self._remember(key, entry)
+        return entry
+
+    def _remember(self, key: str, entry: CachedResponse) -> None:
+        evicted: list[str] = []
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+            if entry.body_path is not None and self._disk_keys is not None:
+                self._disk_keys[key] = None
+                self._disk_keys.move_to_end(key)
+                while len(self._disk_keys) > self._max_entries:
+                    stale, _ = self._disk_keys.popitem(last=False)
+                    self._entries.pop(stale, None)
+                    evicted.append(stale)
+        for stale in evicted:
+            self._unlink(stale)
+
+    def _index_disk(self) -> None:
+        """Index entries left by earlier runs, oldest first, and drop any beyond ``max_entries``."""
+
+        assert self._cache_dir is not None
+        with self._lock:
+            if self._disk_keys is not None:
+                return
+            stamped: list[tuple[float, str]] = []
+            if self._cache_dir.is_dir():
+                for meta_path in self._cache_dir.glob("*.json"):
+                    try:
+                        stamped.append((meta_path.stat().st_mtime, meta_path.stem))
+                    except OSError:
+                        continue
+            stamped.sort()
+            excess = max(0, len(stamped) - self._max_entries)
+            self._disk_keys = OrderedDict((key, None) for _, key in stamped[excess:])
+        for _, stale in stamped[:excess]:
+            self._unlink(stale)
+
+    def _unlink(self, key: str) -> None:
+        assert self._cache_dir is not None
+        for suffix in (".json", ".body"):
+            (self._cache_dir / f"{key}{suffix}").unlink(missing_ok=True)
+
+    def _persist(
+        self,
+        key: str,
+        body: ResponseBody,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        status_code: int,
+        content_type: str,
+        link: Optional[str],
+    ) -> Path:
+        assert self._cache_dir is not None
+        self._index_disk()
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        body_path = self._cache_dir / f"{key}.body"
+        tmp_body = body_path.with_suffix(".body.tmp")
+        if body.spilled:
+            assert body.path is not None
+            shutil.copyfile(body.path, tmp_body)
+        else:
+            tmp_body.write_bytes(body.read_bytes())
+        os.replace(tmp_body, body_path)
+        meta_path = self._cache_dir / f"{key}.json"
+        tmp_meta = meta_path.with_suffix(".json.tmp")
+        tmp_meta.write_text(
+            json.dumps(
+                {
+                    "etag": etag,
+                    "last_modified": last_modified,
+                    "status_code": status_code,
+                    "content_type": content_type,
+                    "encoding": body.encoding,
+                    "size": body.size,
+                    "link": link,
+                }
+            ),
+            encoding="utf-8",
+        )
+        os.replace(tmp_meta, meta_path)
+        return body_path
+
+    def _load_from_disk(self, key: str) -> Optional[CachedResponse]:
+        if self._cache_dir is None:
+            return None
+        meta_path = self._cache_dir / f"{key}.json"
+        body_path = self._cache_dir / f"{key}.body"
+        if not meta_path.exists() or not body_path.exists():
+            return None
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+        if not isinstance(meta, dict):
+            return None
+        size = int(meta.get("size") or body_path.stat().st_size)
+        data = body_path.read_bytes() if size <= self._memory_entry_limit else None
+        return CachedResponse(
+            etag=meta.get("etag"),
+            last_modified=meta.get("last_modified"),
+            status_code=int(meta.get("status_code") or 200),
+            content_type=str(meta.get("content_type") or ""),
+            encoding=str(meta.get("encoding") or "utf-8"),
+            size=size,
+            data=data,
+            body_path=body_path,
+            link=meta.get("link"),
+        )
+
+
+__all__ = ["CachedResponse", "ConditionalRequestCache"]
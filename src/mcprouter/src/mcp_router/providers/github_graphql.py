@@ -0,0 +1,422 @@
+"""GraphQL query batching for the GitHub provider.
+
+Small queries that arrive within a short window are merged into a single
+aliased document, sent as one POST, and the response is split back per
+caller. Only anonymous/named ``query`` operations without fragments or
+operation directives are batched; everything else is sent as-is.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+_DEFAULT_WINDOW_MS = 5.0
+_DEFAULT_MAX_BATCH_SIZE = 10
+_DEFAULT_MAX_BATCH_COST = 100
+# GitHub charges one point per 100 requested nodes, with a minimum of one.
+_NODES_PER_POINT = 100
+_UNKNOWN_PAGE_SIZE = 100
+
+_TOKEN_RE = re.compile(
+    r'''
+    (?P<block>"""(?:\\"""|[^"]|"(?!""))*""")
+  | (?P<string>"(?:\\.|[^"\\\n])*")
+  | (?P<spread>\.\.\.)
+  | (?P<var>\$[_A-Za-z][_0-9A-Za-z]*)
+  | (?P<directive>@[_A-Za-z][_0-9A-Za-z]*)
+  | (?P<name>[_A-Za-z][_0-9A-Za-z]*)
+  | (?P<number>-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)
+  | (?P<punct>[{}()\[\]:!=|&])
+  | (?P<skip>[\s,\ufeff]+|\#[^\n]*)
+    ''',
+    re.VERBOSE,
+)
+_NAME_RE = re.compile(r"[_A-Za-z][_0-9A-Za-z]*")
+
+
+@dataclass(slots=True)
+class _Selection:
+    key: str
+    tokens: list[str]
+
+
+@dataclass(slots=True)
+class GraphQLOperation:
+    """Root selections and variable definitions of a batchable query."""
+
+    variable_definitions: list[list[str]]
+    selections: list[_Selection]
+    nodes: int
+
+    @property
+    def cost(self) -> int:
+        return max(1, math.ceil(self.nodes / _NODES_PER_POINT))
+
+
+@dataclass(slots=True)
+class GraphQLBatchResult:
+    """Per-caller slice of a batched response."""
+
+    body: dict[str, Any]
+    meta: dict[str, Any]
+    size: int
+    estimated_cost: int
+
+
+@dataclass(slots=True)
+class _Pending:
+    operation: GraphQLOperation
+    query: str
+    variables: dict[str, Any]
+    timeout: Optional[float]
+    future: asyncio.Future = field(repr=False)
+
+
+SendFn = Callable[[dict[str, Any], Optional[float]], Awaitable[tuple[dict[str, Any], dict[str, Any]]]]
+
+
+def _tokenize(source: str) -> Optional[list[str]]:
+    tokens: list[str] = []
+    position = 0
+    length = len(source)
+    while position < length:
+        match = _TOKEN_RE.match(source, position)
+        if match is None:
+            return None
+        position = match.end()
+        if match.lastgroup != "skip":
+            tokens.append(match.group())
+    return tokens
+
+
+def _balanced(tokens: list[str], start: int, opener: str, closer: str) -> int:
+    """Return the index just past the bracket group opening at ``start``."""
+
+    depth = 0
+    for index in range(start, len(tokens)):
+        if tokens[index] == opener:
+            depth += 1
+        elif tokens[index] == closer:
+            depth -= 1
+            if depth == 0:
+                return index + 1
+    raise ValueError("unbalanced GraphQL document")
+
+
+def _count_nodes(tokens: list[str], variables: dict[str, Any]) -> int:
+    """Approximate GitHub's node count: products of nested ``first``/``last``."""
+
+    stack = [1]
+    pending: Optional[int] = None
+    nodes = 0
+    for index, token in enumerate(tokens):
+        if token in {"first", "last"} and index + 2 < len(tokens) and tokens[index + 1] == ":":
+            raw = tokens[index + 2]
+            if raw.startswith("$"):
+                value = variables.get(raw[1:])
+                pending = value if isinstance(value, int) else _UNKNOWN_PAGE_SIZE
+            else:
+                try:
+                    pending = int(raw)
+                except ValueError:
+                    pending = _UNKNOWN_PAGE_SIZE
+        elif token == "{":
+            multiplier = stack[-1] * (pending or 1)
+            if pending:
+                nodes += multiplier
+            stack.append(multiplier)
+            pending = None
+        elif token == "}" and len(stack) > 1:
+            stack.pop()
+    return nodes
+
+
+def parse_operation(query: str, variables: Optional[dict[str, Any]] = None) -> Optional[GraphQLOperation]:
+    """Parse ``query`` into a batchable operation, or ``None`` if it must go alone."""
+
+    tokens = _tokenize(query)
+    if not tokens:
+        return None
+    try:
+        index = 0
+        definitions: list[list[str]] = []
+        if tokens[0] != "{":
+            if tokens[0] != "query":
+                return None
+            index = 1
+            if index < len(tokens) and _NAME_RE.fullmatch(tokens[index]):
+                index += 1  # operation name
+            if index < len(tokens) and tokens[index] == "(":
+                end = _balanced(tokens, index, "(", ")")
+                current: list[str] = []
+                for token in tokens[index + 1 : end - 1]:
+                    if token.startswith("$") and current and current[-1] != "=" and current[-1] != ":":
+                        definitions.append(current)
+                        current = []
+                    current.append(token)
+                if current:
+                    definitions.append(current)
+                index = end
+            if index >= len(tokens) or tokens[index] != "{":
+                return None  # operation directives or malformed header
+        end = _balanced(tokens, index, "{", "}")
+        if end != len(tokens):
+            return None  # fragments or multiple operations
+        body = tokens[index + 1 : end - 1]
+        selections: list[_Selection] = []
+        cursor = 0
+        while cursor < len(body):
+            token = body[cursor]
+            if not _NAME_RE.fullmatch(token):
+                return None
+            key = token
+            cursor += 1
+            if cursor < len(body) and body[cursor] == ":":
+                cursor += 1
+                token = body[cursor]
+                cursor += 1
+            field_tokens = [token]
+            if cursor < len(body) and body[cursor] == "(":
+                stop = _balanced(body, cursor, "(", ")")
+                field_tokens.extend(body[cursor:stop])
+                cursor = stop
+            while cursor < len(body) and body[cursor].startswith("@"):
+                field_tokens.append(body[cursor])
+                cursor += 1
+                if cursor < len(body) and body[cursor] == "(":
+                    stop = _balanced(body, cursor, "(", ")")
+                    field_tokens.extend(body[cursor:stop])
+                    cursor = stop
+            if cursor < len(body) and body[cursor] == "{":
+                stop = _balanced(body, cursor, "{", "}")
+                field_tokens.extend(body[cursor:stop])
+                cursor = stop
+            selections.append(_Selection(key=key, tokens=field_tokens))
+    except (ValueError, IndexError):
+        return None
+    if not selections:
+        return None
+    return GraphQLOperation(
+        variable_definitions=definitions,
+        selections=selections,
+        nodes=_count_nodes(body, variables or {}),
+    )
+
+
+def _join(tokens: list[str]) -> str:
+    return " ".join(tokens)
+
+
+def _rename(tokens: list[str], prefix: str) -> list[str]:
+    return [f"${prefix}{token[1:]}" if token.startswith("$") else token for token in tokens]
+
+
+def merge_operations(
+    operations: list[GraphQLOperation],
+    variables: list[dict[str, Any]],
+) -> tuple[str, dict[str, Any], list[dict[str, str]]]:
+    """Merge operations into one aliased document.
+
+    Returns the document, the merged variables, and per-operation maps from
+    batch alias back to the caller's response key.
+    """
+
+    definitions: list[str] = []
+    selections: list[str] = []
+    merged_variables: dict[str, Any] = {}
+    key_maps: list[dict[str, str]] = []
+    for index, (operation, values) in enumerate(zip(operations, variables)):
+        prefix = f"b{index}_"
+        for definition in operation.variable_definitions:
+            definitions.append(_join(_rename(definition, prefix)))
+        for name, value in values.items():
+            merged_variables[f"{prefix}{name}"] = value
+        key_map: dict[str, str] = {}
+        for selection in operation.selections:
+            alias = f"{prefix}{selection.key}"
+            key_map[alias] = selection.key
+            selections.append(f"{alias}: {_join(_rename(selection.tokens, prefix))}")
+        key_maps.append(key_map)
+    header = f"query ({', '.join(definitions)}) " if definitions else ""
+    return f"{header}{{ {' '.join(selections)} }}", merged_variables, key_maps
+
+
+def split_response(body: dict[str, Any], key_maps: list[dict[str, str]]) -> list[dict[str, Any]]:
+    """Split a merged response back into one GraphQL body per operation."""
+
+    data = body.get("data")
+    errors = body.get("errors") or []
+    owners = {alias: index for index, key_map in enumerate(key_maps) for alias in key_map}
+    parts: list[dict[str, Any]] = []
+    for key_map in key_maps:
+        part_data = None
+        if isinstance(data, dict):
+            part_data = {original: data.get(alias) for alias, original in key_map.items()}
+        parts.append({"data": part_data})
+    for error in errors:
+        path = error.get("path") if isinstance(error, dict) else None
+        owner = owners.get(path[0]) if isinstance(path, list) and path else None
+        if owner is None:
+            for part in parts:
+                part.setdefault("errors", []).append(error)
+            continue
+        rewritten = {**error, "path": [key_maps[owner][path[0]], *path[1:]]}
+        parts[owner].setdefault("errors", []).append(rewritten)
+    for extra_key, value in body.items():
+        if extra_key not in {"data", "errors"}:
+            for part in parts:
+                part[extra_key] = value
+    return parts
+
+
+def _batch_rejected(body: dict[str, Any]) -> bool:
+    """Whether a merged response failed as a whole (``data: null`` or errors without a ``path``).
+
+    GitHub validates the merged document at once, so one invalid operation
+    rejects every other operation in the batch with it.
+    """
+
+    if not isinstance(body.get("data"), dict):
+        return True
+    return any(not (isinstance(error, dict) and error.get("path")) for error in body.get("errors") or [])
+
+
+class GraphQLBatcher:
+    """Collect GraphQL queries for ``window_ms`` and send them as one request.
+
+    A batch is flushed when the window elapses, when it reaches
+    ``max_batch_size`` operations, or before adding a query would push the
+    estimated cost above ``max_batch_cost`` points.
+    """
+
+    def __init__(
+        self,
+        send: SendFn,
+        *,
+        window_ms: float = _DEFAULT_WINDOW_MS,
+        max_batch_size: int = _DEFAULT_MAX_BATCH_SIZE,
+        max_batch_cost: int = _DEFAULT_MAX_BATCH_COST,
+    ) -> None:
+        if window_ms < 0:
+            raise ValueError("window_ms must be >= 0")
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        if max_batch_cost < 1:
+            raise ValueError("max_batch_cost must be >= 1")
+        self._send = send
+        self._window = window_ms / 1000.0
+        self._max_batch_size = max_batch_size
+        self._max_batch_cost = max_batch_cost
+        self._pending: list[_Pending] = []
+        self._pending_nodes = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._inflight: set[asyncio.Task] = set()
+
+    async def submit(
+        self,
+        query: str,
+        variables: Optional[dict[str, Any]] = None,
+        *,
+        timeout: Optional[float] = None,
+    ) -> Optional[GraphQLBatchResult]:
+        """Queue ``query`` for the next batch; ``None`` means send it directly."""
+
+        values = dict(variables or {})
+        operation = parse_operation(query, values)
+        if operation is None or operation.cost > self._max_batch_cost:
+            return None
+        loop = asyncio.get_running_loop()
+        projected = math.ceil((self._pending_nodes + operation.nodes) / _NODES_PER_POINT)
+        if self._pending and projected > self._max_batch_cost:
+            self._flush()
+        entry = _Pending(
+            operation=operation,
+            query=query,
+            variables=values,
+            timeout=timeout,
+            future=loop.create_future(),
+        )
+        self._pending.append(entry)
+        self._pending_nodes += operation.nodes
+        if len(self._pending) >= self._max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._window, self._flush)
+        return await entry.future
+
+    async def aclose(self) -> None:
+        self._flush()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+    # ------------------------------------------------------------------ #
+    # Internal helpers
+    # ------------------------------------------------------------------ #
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        self._pending_nodes = 0
+        if not batch:
+            return
+        task = asyncio.get_running_loop().create_task(self._dispatch(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: list[_Pending]) -> None:
+        timeouts = [entry.timeout for entry in batch]
+        timeout = None if any(value is None for value in timeouts) else max(timeouts)  # type: ignore[type-var]
+        nodes = sum(entry.operation.nodes for entry in batch)
+        estimated_cost = max(1, math.ceil(nodes / _NODES_PER_POINT))
+        try:
+            if len(batch) == 1:
+                only = batch[0]
+                body, meta = await self._send({"query": only.query, "variables": only.variables}, timeout)
+                parts = [body]
+            else:
+                document, merged_variables, key_maps = merge_operations(
+                    [entry.operation for entry in batch],
+                    [entry.variables for entry in batch],
+                )
+                body, meta = await self._send({"query": document, "variables": merged_variables}, timeout)
+                if _batch_rejected(body):
+                    # Bisect so the invalid operation fails alone and the rest still get answers.
+                    middle = len(batch) // 2
+                    await asyncio.gather(self._dispatch(batch[:middle]), self._dispatch(batch[middle:]))
+                    return
+                parts = split_response(body, key_maps)
+        except asyncio.CancelledError:
+            for entry in batch:
+                entry.future.cancel()
+            raise
+        except Exception as exc:  # every caller in the batch sees the failure
+            for entry in batch:
+                if not entry.future.done():
+                    entry.future.set_exception(exc)
+            return
+        for index, (entry, part) in enumerate(zip(batch, parts)):
+            if entry.future.done():
+                continue
+            entry.future.set_result(
+                GraphQLBatchResult(
+                    body=part,
+                    meta={**meta, "graphql_batch": {"size": len(batch), "index": index, "estimated_cost": estimated_cost}},
+                    size=len(batch),
+                    estimated_cost=estimated_cost,
+                )
+            )
+
+
+__all__ = [
+    "GraphQLBatchResult",
+    "GraphQLBatcher",
+    "GraphQLOperation",
+    "merge_operations",
+    "parse_operation",
+    "split_response",
+]
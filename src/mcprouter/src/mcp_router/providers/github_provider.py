@@ -2,15 +2,83 @@
 
 from __future__ import annotations
 
+import asyncio
+import json
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any, AsyncIterator, Mapping
+
 import httpx
 
-from ..schemas import ProviderRequest, ProviderResponse
+from ..schemas import ProviderRequest, ProviderResponse, ResponseBody
 from .base import BaseProvider, ProviderError
+from .github_cache import CachedResponse, ConditionalRequestCache
+from .github_graphql import GraphQLBatcher
 
 _DEFAULT_TIMEOUT = 15.0
 _DEFAULT_ACCEPT = "application/vnd.github+json"
 _DEFAULT_API_VERSION = "2022-11-28"
 _DEFAULT_USER_AGENT = "multi-agent-governance-mcp-router/1.0"
+_DEFAULT_SPILL_THRESHOLD = 1 << 20
+_SPILL_SUBDIR = "github"
+# full: text + parsed JSON (legacy); text/json: one representation only;
+# lazy: raw bytes kept once in ``body`` and decoded on access.
+_RESPONSE_MODES = frozenset({"full", "text", "json", "lazy"})
+_DEFAULT_MAX_PAGES = 100
+_DEFAULT_PAGE_CONCURRENCY = 4
+
+
+@dataclass(slots=True)
+class _Fetched:
+    """Outcome of a single HTTP exchange, possibly served from the cache."""
+
+    response: httpx.Response
+    body: ResponseBody
+    status_code: int
+    cache_hit: bool
+    link: str | None
+
+
+@dataclass(slots=True)
+class GitHubPage:
+    """One page of a paginated REST listing."""
+
+    number: int
+    url: str
+    items: list[Any]
+    size: int
+    cache_hit: bool
+    status_code: int = 200
+
+
+@dataclass(slots=True)
+class PaginationLimits:
+    """Caps applied while following ``Link`` headers.
+
+    ``max_bytes`` is a soft cap: no page is fetched after the total reaches
+    it, but the page that crosses it is returned whole.
+    """
+
+    max_pages: int = _DEFAULT_MAX_PAGES
+    max_items: int | None = None
+    max_bytes: int | None = None
+    concurrency: int = _DEFAULT_PAGE_CONCURRENCY
+    items_key: str | None = None
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "PaginationLimits":
+        def _optional_int(key: str) -> int | None:
+            value = config.get(key)
+            return int(value) if value is not None else None
+
+        return cls(
+            max_pages=max(1, int(config.get("max_pages") or _DEFAULT_MAX_PAGES)),
+            max_items=_optional_int("max_items"),
+            max_bytes=_optional_int("max_bytes"),
+            concurrency=max(1, int(config.get("page_concurrency") or _DEFAULT_PAGE_CONCURRENCY)),
+            items_key=config.get("items_key"),
+        )
 
 
 class GitHubProvider(BaseProvider):
@@ -19,6 +87,7 @@ class GitHubProvider(BaseProvider):
     name = "github"
     default_timeout = _DEFAULT_TIMEOUT
     default_api_version = _DEFAULT_API_VERSION
+    default_spill_threshold = _DEFAULT_SPILL_THRESHOLD
 
     def __init__(
         self,
@@ -28,12 +97,32 @@ class GitHubProvider(BaseProvider):
         default_timeout: float = _DEFAULT_TIMEOUT,
         api_version: str = _DEFAULT_API_VERSION,
         client: httpx.AsyncClient | None = None,
+        response_mode: str = "full",
+        spill_threshold_bytes: int | None = _DEFAULT_SPILL_THRESHOLD,
+        cache: ConditionalRequestCache | None = None,
+        graphql_batch_window_ms: float | None = None,
+        graphql_batch_max_size: int = 10,
+        graphql_batch_max_cost: int = 100,
     ) -> None:
         if not token:
             raise ValueError("token must be provided for GitHubProvider")
         self._token = token
         self._base_url = base_url.rstrip("/")
         self._api_version = api_version
+        normalized_mode = self._normalize_mode(response_mode)
+        if normalized_mode is None:
+            raise ValueError(f"unsupported github response_mode: {response_mode}")
+        self._response_mode = normalized_mode
+        self._spill_threshold = spill_threshold_bytes
+        self._cache = cache
+        self._graphql_batcher: GraphQLBatcher | None = None
+        if graphql_batch_window_ms is not None and graphql_batch_window_ms > 0:
+            self._graphql_batcher = GraphQLBatcher(
+                self._send_graphql,
+                window_ms=graphql_batch_window_ms,
+                max_batch_size=graphql_batch_max_size,
+                max_batch_cost=graphql_batch_max_cost,
+            )
         headers = {
             "Authorization": f"Bearer {token}",
             "Accept": _DEFAULT_ACCEPT,
@@ -80,19 +169,300 @@ class GitHubProvider(BaseProvider):
             path = config.get("path") or "/graphql"
             headers.setdefault("Content-Type", "application/json")
 
+        if config.get("paginate") and method == "GET":
+            return await self._agenerate_paginated(payload, path, params, headers, config)
+
+        requested_mode = config.get("response_mode") or self._response_mode
+        response_mode = self._normalize_mode(requested_mode)
+        if response_mode is None:
+            raise ProviderError(f"unsupported github response_mode: {requested_mode}")
+        spill_dir = None
+        spill_threshold = config.get("spill_threshold_bytes", self._spill_threshold)
+        if response_mode != "full" and payload.artifacts_dir is not None and spill_threshold is not None:
+            spill_dir = Path(payload.artifacts_dir) / _SPILL_SUBDIR
+
+        if (
+            graphql_enabled
+            and self._graphql_batcher is not None
+            and not config.get("no_batch")
+            and path == "/graphql"
+            and set(headers) <= {"Content-Type"}
+        ):
+            batched = await self._graphql_batcher.submit(
+                json_payload["query"],
+                json_payload["variables"],
+                timeout=payload.timeout_sec,
+            )
+            if batched is not None:
+                encoded = json.dumps(batched.body).encode("utf-8")
+                meta = dict(batched.meta)
+                latency_ms = meta.pop("latency_ms", None)
+                meta["response_mode"] = response_mode
+                meta["body_bytes"] = len(encoded)
+                return self._shape_response(
+                    ResponseBody(encoded, size=len(encoded)),
+                    response_mode,
+                    meta,
+                    latency_ms=latency_ms,
+                )
+
+        use_cache = method == "GET" and not config.get("no_cache")
+        fetched = await self._fetch(
+            method,
+            path,
+            params=params,
+            headers=headers,
+            timeout=payload.timeout_sec,
+            json_payload=json_payload,
+            data_payload=data_payload,
+            content=self._prepare_body(text_payload, raw_body),
+            spill_dir=spill_dir,
+            spill_threshold=int(spill_threshold) if spill_dir is not None else None,
+            use_cache=use_cache,
+        )
+        body = fetched.body
+
+        meta = self._base_meta(fetched, method, headers, use_cache=use_cache)
+        meta["response_mode"] = response_mode
+        meta["body_bytes"] = body.size
+        if body.spilled:
+            meta["body_path"] = str(body.path)
+        if use_cache and self._cache is not None:
+            meta["rate_limit_units_saved"] = 1 if fetched.cache_hit else 0
+        return self._shape_response(body, response_mode, meta, latency_ms=self._latency_ms(fetched.response))
+
+    @staticmethod
+    def _shape_response(
+        body: ResponseBody,
+        response_mode: str,
+        meta: dict[str, Any],
+        *,
+        latency_ms: float | None,
+    ) -> ProviderResponse:
+        text = ""
+        content: list[dict] = []
+        if response_mode in {"full", "text"}:
+            text = body.text
+        if response_mode in {"full", "json"}:
+            try:
+                content = [{"data": body.json()}]
+            except ValueError:
+                content = []
+        # Only lazy mode keeps the raw bytes in memory; the decoded text and JSON already cover
+        # the other modes. A spilled body costs nothing to keep because it lives on disk.
+        keep_body = response_mode == "lazy" or body.spilled
+        token_usage = {"tokens": {"input": 0, "output": 0, "total": 0}}
+        return ProviderResponse(
+            text=text,
+            content=content,
+            meta=meta,
+            latency_ms=latency_ms,
+            token_usage=token_usage,
+            body=body if keep_body else None,
+        )
+
+    async def aiter_pages(
+        self,
+        path: str,
+        *,
+        params: Mapping[str, Any] | None = None,
+        headers: Mapping[str, str] | None = None,
+        timeout: float | None = None,
+        limits: PaginationLimits | None = None,
+    ) -> AsyncIterator[GitHubPage]:
+        """Yield pages of a REST listing in order, following ``Link`` headers.
+
+        When the first page advertises a ``last`` link the remaining pages are
+        fetched concurrently (up to ``limits.concurrency``); otherwise ``next``
+        links are followed one at a time. Iteration stops at the page, item, or
+        byte cap, truncating the final page to ``max_items``; the byte cap is
+        soft, so the page that crosses ``max_bytes`` is yielded whole.
+        """
+
+        limits = limits or PaginationLimits()
+        request_headers = dict(headers or {})
+        first = await self._fetch("GET", path, params=params, headers=request_headers, timeout=timeout)
+        first_page = self._to_page(1, first, limits.items_key)
+        pages_seen = 1
+        items_seen = 0
+        bytes_seen = 0
+
+        def _admit(page: GitHubPage) -> tuple[GitHubPage, bool]:
+            nonlocal items_seen, bytes_seen
+            exhausted = False
+            if limits.max_items is not None and items_seen + len(page.items) >= limits.max_items:
+                page.items = page.items[: max(0, limits.max_items - items_seen)]
+                exhausted = True
+            items_seen += len(page.items)
+            bytes_seen += page.size
+            if limits.max_bytes is not None and bytes_seen >= limits.max_bytes:
+                exhausted = True
+            return page, exhausted
+
+        page, exhausted = _admit(first_page)
+        yield page
+        if exhausted or pages_seen >= limits.max_pages:
+            return
+
+        links = self._parse_links(first.link)
+        last_url = links.get("last")
+        next_url = links.get("next")
+        last_number = self._page_number(last_url) if last_url else None
+        if last_url and last_number is not None and next_url:
+            final = min(last_number, limits.max_pages)
+            template = httpx.URL(last_url)
+            semaphore = asyncio.Semaphore(limits.concurrency)
+
+            async def _fetch_page(number: int) -> GitHubPage:
+                url = str(template.copy_set_param("page", number))
+                async with semaphore:
+                    fetched = await self._fetch("GET", url, headers=request_headers, timeout=timeout)
+                return self._to_page(number, fetched, limits.items_key)
+
+            tasks = [asyncio.create_task(_fetch_page(number)) for number in range(2, final + 1)]
+            try:
+                for task in tasks:
+                    page, exhausted = _admit(await task)
+                    yield page
+                    if exhausted:
+                        return
+            finally:
+                pending = [task for task in tasks if not task.done()]
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    await asyncio.gather(*pending, return_exceptions=True)
+            return
+
+        number = 1
+        while next_url and number < limits.max_pages:
+            number += 1
+            fetched = await self._fetch("GET", next_url, headers=request_headers, timeout=timeout)
+            page, exhausted = _admit(self._to_page(number, fetched, limits.items_key))
+            yield page
+            if exhausted:
+                return
+            next_url = self._parse_links(fetched.link).get("next")
+
+    async def _agenerate_paginated(
+        self,
+        payload: ProviderRequest,
+        path: str,
+        params: Any,
+        headers: dict[str, str],
+        config: Mapping[str, Any],
+    ) -> ProviderResponse:
+        limits = PaginationLimits.from_config(config)
+        if config.get("per_page") is not None:
+            params = {**(params or {}), "per_page": config["per_page"]}
+        started = asyncio.get_running_loop().time()
+        items: list[Any] = []
+        pages = 0
+        total_bytes = 0
+        cache_hits = 0
+        last_page: GitHubPage | None = None
+        try:
+            async for page in self.aiter_pages(
+                path,
+                params=params,
+                headers=headers,
+                timeout=payload.timeout_sec,
+                limits=limits,
+            ):
+                pages += 1
+                total_bytes += page.size
+                cache_hits += int(page.cache_hit)
+                items.extend(page.items)
+                last_page = page
+        except ValueError as exc:
+            raise ProviderError(f"github pagination expected JSON pages: {exc}") from exc
+        meta: dict[str, Any] = {
+            "status_code": last_page.status_code if last_page is not None else 200,
+            "url": last_page.url if last_page is not None else path,
+            "method": "GET",
+            "response_mode": "json",
+            "body_bytes": total_bytes,
+            "pagination": {
+                "pages": pages,
+                "items": len(items),
+                "max_pages": limits.max_pages,
+                "max_items": limits.max_items,
+                "max_bytes": limits.max_bytes,
+                "concurrency": limits.concurrency,
+            },
+        }
+        if headers:
+            meta["request_headers"] = headers
+        if self._cache is not None:
+            meta["cache"] = {"status": "hit" if cache_hits == pages else "miss", **self._cache.stats()}
+            meta["rate_limit_units_saved"] = cache_hits
+        token_usage = {"tokens": {"input": 0, "output": 0, "total": 0}}
+        return ProviderResponse(
+            text="",
+            content=[{"data": items}],
+            meta=meta,
+            latency_ms=(asyncio.get_running_loop().time() - started) * 1000,
+            token_usage=token_usage,
+        )
+
+    async def _fetch(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: Any = None,
+        headers: dict[str, str],
+        timeout: float | None,
+        json_payload: Any = None,
+        data_payload: Any = None,
+        content: bytes | None = None,
+        spill_dir: Path | None = None,
+        spill_threshold: int | None = None,
+        use_cache: bool = True,
+    ) -> _Fetched:
+        """Send one request, revalidating against the conditional cache for GETs."""
+
+        cache_key: str | None = None
+        cached: CachedResponse | None = None
+        request_headers = headers
+        if self._cache is not None and use_cache and method == "GET":
+            url = self._client.build_request(method, path, params=params).url
+            accept = str(headers.get("Accept") or self._client.headers.get("Accept", ""))
+            cache_key = ConditionalRequestCache.make_key(str(url), accept=accept, credential=self._token)
+            cached = await self._cache.lookup(cache_key)
+            if cached is not None:
+                request_headers = {**headers, **cached.conditional_headers()}
+
         try:
-            response = await self._client.request(
+            async with self._client.stream(
                 method,
                 path,
                 params=params,
-                json=json_payload if json_payload is not None else None,
+                json=json_payload,
                 data=data_payload,
-                content=self._prepare_body(text_payload, raw_body),
-                headers=headers or None,
-                timeout=payload.timeout_sec,
-            )
-            response.raise_for_status()
-            await response.aread()
+                content=content,
+                headers=request_headers or None,
+                timeout=timeout,
+            ) as response:
+                if response.status_code == 304 and cached is not None:
+                    # 304s do not count against the primary rate limit.
+                    fetched = _Fetched(
+                        response=response,
+                        body=cached.to_body(),
+                        status_code=cached.status_code,
+                        cache_hit=True,
+                        link=response.headers.get("Link") or cached.link,
+                    )
+                else:
+                    response.raise_for_status()
+                    body = await self._read_body(response, spill_dir=spill_dir, threshold=spill_threshold)
+                    fetched = _Fetched(
+                        response=response,
+                        body=body,
+                        status_code=response.status_code,
+                        cache_hit=False,
+                        link=response.headers.get("Link"),
+                    )
         except httpx.HTTPStatusError as exc:
             retriable = 500 <= exc.response.status_code < 600
             raise ProviderError(
@@ -102,30 +472,66 @@ class GitHubProvider(BaseProvider):
         except httpx.HTTPError as exc:  # pragma: no cover - network failures mocked in tests
             raise ProviderError(str(exc), retriable=True) from exc
 
-        try:
-            json_content = response.json()
-            content = [{"data": json_content}]
-        except ValueError:
-            json_content = None
-            content = []
+        if self._cache is not None and cache_key is not None:
+            if fetched.cache_hit:
+                self._cache.record_hit()
+            else:
+                self._cache.record_miss()
+                await self._cache.store(
+                    cache_key,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                    status_code=response.status_code,
+                    content_type=response.headers.get("Content-Type", ""),
+                    link=fetched.link,
+                    body=fetched.body,
+                )
+        return fetched
 
-        text = response.text
+    async def _send_graphql(
+        self,
+        json_payload: dict[str, Any],
+        timeout: float | None,
+    ) -> tuple[dict[str, Any], dict[str, Any]]:
+        """Transport for :class:`GraphQLBatcher`; returns the parsed body and shared meta."""
 
-        latency_ms = None
+        headers = {"Content-Type": "application/json"}
+        fetched = await self._fetch(
+            "POST",
+            "/graphql",
+            headers=headers,
+            timeout=timeout,
+            json_payload=json_payload,
+            use_cache=False,
+        )
         try:
-            elapsed = response.elapsed
-        except RuntimeError:  # Mock transports might skip elapsed tracking
-            elapsed = None
-        if elapsed is not None:
-            latency_ms = elapsed.total_seconds() * 1000
+            body = fetched.body.json()
+        except ValueError as exc:
+            raise ProviderError(f"github graphql returned non-JSON body: {exc}") from exc
+        if not isinstance(body, dict):
+            raise ProviderError("github graphql returned an unexpected payload")
+        meta = self._base_meta(fetched, "POST", headers, use_cache=False)
+        meta["latency_ms"] = self._latency_ms(fetched.response)
+        return body, meta
 
-        meta = {
-            "status_code": response.status_code,
+    def _base_meta(
+        self,
+        fetched: _Fetched,
+        method: str,
+        headers: Mapping[str, str],
+        *,
+        use_cache: bool,
+    ) -> dict[str, Any]:
+        response = fetched.response
+        meta: dict[str, Any] = {
+            "status_code": fetched.status_code,
             "url": str(response.request.url),
             "method": method,
         }
         if headers:
-            meta["request_headers"] = headers
+            meta["request_headers"] = dict(headers)
+        if use_cache and self._cache is not None:
+            meta["cache"] = {"status": "hit" if fetched.cache_hit else "miss", **self._cache.stats()}
 
         rate_remaining = response.headers.get("X-RateLimit-Remaining")
         rate_reset = response.headers.get("X-RateLimit-Reset")
@@ -136,20 +542,112 @@ class GitHubProvider(BaseProvider):
                 meta["rate_limit_remaining"] = rate_remaining
         if rate_reset is not None:
             meta["rate_limit_reset"] = rate_reset
+        return meta
 
-        token_usage = {"tokens": {"input": 0, "output": 0, "total": 0}}
-        return ProviderResponse(
-            text=text,
-            content=content,
-            meta=meta,
-            latency_ms=latency_ms,
-            token_usage=token_usage,
+    @staticmethod
+    def _latency_ms(response: httpx.Response) -> float | None:
+        try:
+            elapsed = response.elapsed
+        except RuntimeError:  # Mock transports might skip elapsed tracking
+            elapsed = None
+        if elapsed is None:
+            return None
+        return elapsed.total_seconds() * 1000
+
+    @staticmethod
+    def _to_page(number: int, fetched: _Fetched, items_key: str | None) -> GitHubPage:
+        data = fetched.body.json()
+        if isinstance(data, list):
+            items = data
+        elif isinstance(data, dict):
+            candidate = data.get(items_key) if items_key else data.get("items")
+            if not isinstance(candidate, list):
+                candidate = next((value for value in data.values() if isinstance(value, list)), [data])
+            items = candidate
+        else:
+            items = [data]
+        return GitHubPage(
+            number=number,
+            url=str(fetched.response.request.url),
+            items=list(items),
+            size=fetched.body.size,
+            cache_hit=fetched.cache_hit,
+            status_code=fetched.status_code,
         )
 
+    @staticmethod
+    def _parse_links(link_header: str | None) -> dict[str, str]:
+        """Parse an RFC 8288 ``Link`` header into ``{rel: url}``."""
+
+        links: dict[str, str] = {}
+        for part in (link_header or "").split(","):
+            segments = [segment.strip() for segment in part.split(";")]
+            if not segments[0].startswith("<"):
+                continue
+            url = segments[0][1:-1]
+            for segment in segments[1:]:
+                key, _, value = segment.partition("=")
+                if key.strip() == "rel":
+                    for rel in value.strip().strip('"').split():
+                        links[rel] = url
+        return links
+
+    @staticmethod
+    def _page_number(url: str) -> int | None:
+        raw = httpx.URL(url).params.get("page")
+        try:
+            return int(raw) if raw is not None else None
+        except ValueError:
+            return None
+
     async def aclose(self) -> None:
+        if self._graphql_batcher is not None:
+            await self._graphql_batcher.aclose()
         if self._owns_client:
             await self._client.aclose()
 
+    @staticmethod
+    async def _read_body(
+        response: httpx.Response,
+        *,
+        spill_dir: Path | None,
+        threshold: int | None,
+    ) -> ResponseBody:
+        """Stream the body into memory, switching to a spill file past ``threshold``."""
+
+        encoding = response.encoding or "utf-8"
+        chunks: list[bytes] = []
+        size = 0
+        spill_path: Path | None = None
+        handle: IO[bytes] | None = None
+        try:
+            async for chunk in response.aiter_bytes():
+                size += len(chunk)
+                if handle is None and spill_dir is not None and threshold is not None and size > threshold:
+                    spill_dir.mkdir(parents=True, exist_ok=True)
+                    suffix = ".json" if "json" in response.headers.get("Content-Type", "") else ".bin"
+                    spill_path = spill_dir / f"{uuid.uuid4().hex}{suffix}"
+                    handle = spill_path.open("wb")
+                    for buffered in chunks:
+                        handle.write(buffered)
+                    chunks.clear()
+                if handle is not None:
+                    handle.write(chunk)
+                else:
+                    chunks.append(chunk)
+        finally:
+            if handle is not None:
+                handle.close()
+        if spill_path is not None:
+            return ResponseBody(path=spill_path, size=size, encoding=encoding)
+        data = chunks[0] if len(chunks) == 1 else b"".join(chunks)
+        return ResponseBody(data, size=size, encoding=encoding)
+
+    @staticmethod
+    def _normalize_mode(raw: object) -> str | None:
+        mode = str(raw).strip().lower()
+        return mode if mode in _RESPONSE_MODES else None
+
     def _resolve_path(self, config: dict, prompt: str) -> str:
         """Resolve the API path or URL from config/prompt."""
 
@@ -2,6 +2,11 @@
 
 from __future__ import annotations
 
+import importlib.util
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
 import httpx
 
 from ..schemas import ProviderRequest, ProviderResponse
@@ -9,23 +14,100 @@ from .base import BaseProvider, ProviderError
 
 OPENAI_ENDPOINT = "https://api.openai.com/v1/chat/completions"
 
+_DEFAULT_MAX_CONNECTIONS = 20
+_DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 10
+_DEFAULT_KEEPALIVE_EXPIRY = 30.0
+_DEFAULT_CONNECT_TIMEOUT = 5.0
+_DEFAULT_READ_TIMEOUT = 60.0
+_DEFAULT_WRITE_TIMEOUT = 10.0
+_DEFAULT_POOL_TIMEOUT = 5.0
+
+
+def _retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Return the server-requested delay from ``retry-after-ms`` / ``Retry-After``."""
+
+    raw_ms = response.headers.get("retry-after-ms")
+    if raw_ms is not None:
+        try:
+            return max(0.0, float(raw_ms) / 1000.0)
+        except ValueError:
+            pass
+    raw = response.headers.get("Retry-After")
+    if raw is None:
+        return None
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(raw)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=UTC)
+    return max(0.0, (when - datetime.now(UTC)).total_seconds())
+
 
 class OpenAIProvider(BaseProvider):
-    """Lightweight wrapper around the OpenAI responses endpoint."""
+    """Lightweight wrapper around the OpenAI responses endpoint.
+
+    The underlying client keeps a tuned connection pool alive across calls.
+    HTTP 429 and 5xx responses are retriable and carry ``Retry-After`` on the
+    raised :class:`ProviderError`; other 4xx responses fail fast.
+    """
 
     name = "openai"
 
-    def __init__(self, api_key: str) -> None:
+    def __init__(
+        self,
+        api_key: str,
+        *,
+        endpoint: str = OPENAI_ENDPOINT,
+        max_connections: int = _DEFAULT_MAX_CONNECTIONS,
+        max_keepalive_connections: int = _DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = _DEFAULT_KEEPALIVE_EXPIRY,
+        http2: bool = False,
+        connect_timeout: float = _DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = _DEFAULT_READ_TIMEOUT,
+        write_timeout: float = _DEFAULT_WRITE_TIMEOUT,
+        pool_timeout: float = _DEFAULT_POOL_TIMEOUT,
+        client: httpx.AsyncClient | None = None,
+    ) -> None:
         if not api_key:
             raise ValueError("api_key must be provided for OpenAIProvider")
+        if max_connections < 1:
+            raise ValueError("max_connections must be at least 1")
         self._api_key = api_key
-        self._client = httpx.AsyncClient()
-
-    async def agenerate(self, payload: ProviderRequest) -> ProviderResponse:
-        headers = {
-            "Authorization": f"Bearer {self._api_key}",
+        self._endpoint = endpoint
+        self._headers = {
+            "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json",
         }
+        self._connect_timeout = connect_timeout
+        self._read_timeout = read_timeout
+        self._write_timeout = write_timeout
+        self._pool_timeout = pool_timeout
+        self._default_timeout = self._build_timeout(read_timeout)
+        # HTTP/2 needs the optional ``h2`` package; fall back to HTTP/1.1 without it.
+        self.http2 = bool(http2) and importlib.util.find_spec("h2") is not None
+        if client is None:
+            self._client = httpx.AsyncClient(
+                headers=self._headers,
+                timeout=self._default_timeout,
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=min(max_keepalive_connections, max_connections),
+                    keepalive_expiry=keepalive_expiry,
+                ),
+                http2=self.http2,
+            )
+            self._owns_client = True
+        else:
+            client.headers.update(self._headers)
+            self._client = client
+            self._owns_client = False
+
+    async def agenerate(self, payload: ProviderRequest) -> ProviderResponse:
         request_body = {
             "model": payload.model,
             "messages": [{"role": "user", "content": payload.prompt}],
@@ -33,14 +115,22 @@ class OpenAIProvider(BaseProvider):
         }
         try:
             response = await self._client.post(
-                OPENAI_ENDPOINT,
-                headers=headers,
+                self._endpoint,
                 json=request_body,
-                timeout=payload.timeout_sec,
+                timeout=self._timeout_for(payload.timeout_sec),
             )
             response.raise_for_status()
-        except httpx.HTTPError as exc:  # pragma: no cover - network not exercised in tests
-            raise ProviderError(str(exc), retriable=True) from exc
+        except httpx.HTTPStatusError as exc:
+            status = exc.response.status_code
+            retriable = status == 429 or status >= 500
+            raise ProviderError(
+                f"openai request failed: {status} {exc.response.reason_phrase}",
+                retriable=retriable,
+                retry_after=_retry_after_seconds(exc.response) if retriable else None,
+            ) from exc
+        except httpx.HTTPError as exc:
+            # Transport failures (connect/read timeouts, resets) are transient.
+            raise ProviderError(str(exc) or type(exc).__name__, retriable=True) from exc
 
         data = response.json()
         choices = data.get("choices") or []
@@ -57,10 +147,26 @@ class OpenAIProvider(BaseProvider):
         return ProviderResponse(
             text=text,
             content=choices,
-            meta={"provider": self.name, "raw": data},
+            meta={"provider": self.name, "raw": data, "http_version": response.http_version},
             latency_ms=latency_ms,
             token_usage=usage,
         )
 
     async def aclose(self) -> None:
-        await self._client.aclose()
+        if self._owns_client:
+            await self._client.aclose()
+
+    def _build_timeout(self, read_timeout: float) -> httpx.Timeout:
+        return httpx.Timeout(
+            connect=self._connect_timeout,
+            read=read_timeout,
+            write=self._write_timeout,
+            pool=self._pool_timeout,
+        )
+
+    def _timeout_for(self, timeout_sec: Optional[float]) -> httpx.Timeout:
+        """Per-request timeouts: the read phase ends at the request budget or ``read_timeout``, whichever is sooner."""
+
+        if not timeout_sec or timeout_sec <= 0 or timeout_sec >= self._read_timeout:
+            return self._default_timeout
+        return self._build_timeout(timeout_sec)
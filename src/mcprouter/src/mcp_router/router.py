@@ -4,10 +4,13 @@ from __future__ import annotations
 
 import asyncio
 import json
+import math
 import os
 import random
+import re
 import threading
 import time
+from collections import deque
 from contextlib import AbstractContextManager
 from dataclasses import dataclass
 from datetime import UTC, datetime
@@ -18,21 +21,168 @@ from typing import Any, Awaitable, Callable, Optional, Sequence
 from .config import load_settings
 from .providers.base import BaseProvider, ProviderError
 from .providers.dummy_provider import DummyProvider
+from .providers.github_cache import ConditionalRequestCache
 from .providers.github_provider import GitHubProvider
 from .providers.openai_provider import OpenAIProvider
 from .redaction import mask_sensitive
-from .schemas import AuditRecord, ProviderRequest, ProviderResponse, QueueItem, Result
+from .schemas import ProviderRequest, ProviderResponse, Result
 from .skills import SkillManager
+from .telemetry import TelemetryPolicy
+from .tokens import TokenService, default_token_service
 
 _DEFAULT_TIMEOUT = 30.0
 _DEFAULT_RETRIES = 1
 _DEFAULT_BACKOFF = 0.5
+# Upper bound on a provider-supplied Retry-After delay.
+_MAX_RETRY_AFTER = 60.0
+# Only requests that are safe to send twice are mirrored to the shadow provider.
+_SHADOW_SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+_GRAPHQL_MUTATION = re.compile(r"^\s*mutation\b", re.MULTILINE)
 
 
-@dataclass
-class _QueueEntry:
-    item: QueueItem
+@dataclass(slots=True)
+class _QueueItem:
+    """Internal work item; the request was validated once in ``generate``."""
+
+    request: ProviderRequest
+    prompt_limit: int
+    prompt_buffer: int
+    retries: int
+    prompt_chars: int
+    token_estimate: dict[str, Any]
     future: asyncio.Future[ProviderResponse]
+    # The caller's explicit timeout_sec; adaptive timeouts never exceed it.
+    timeout_cap: Optional[float] = None
+
+
+@dataclass(slots=True)
+class _AuditLine:
+    """Hot-path twin of ``schemas.AuditRecord`` serialized without ``model_dump``."""
+
+    ts: datetime
+    model: str
+    latency_ms: float
+    prompt_chars: int
+    token_usage: dict[str, Any]
+    status: str
+    worker: Optional[str] = None
+    error: Optional[str] = None
+    timeout_sec: Optional[float] = None
+
+    def to_json(self) -> str:
+        payload = {
+            "ts": self.ts.isoformat().replace("+00:00", "Z"),
+            "model": self.model,
+            "worker": self.worker,
+            "latency_ms": self.latency_ms,
+            "prompt_chars": self.prompt_chars,
+            "token_usage": mask_sensitive(self.token_usage),
+            "status": self.status,
+            "error": self.error,
+            "timeout_sec": self.timeout_sec,
+        }
+        return json.dumps(payload, ensure_ascii=False)
+
+
+@dataclass(slots=True)
+class ShadowConfig:
+    """Mirror a sample of traffic to a secondary provider/model for comparison.
+
+    Shadow responses are discarded; only latency and token usage are logged
+    to ``mcp_shadow.jsonl``. ``provider=None`` reuses the primary provider.
+    Requests with side effects (a non-GET ``method`` or a GraphQL mutation in
+    their config) are never mirrored, so they are not executed twice.
+    """
+
+    model: Optional[str] = None
+    provider: Optional[BaseProvider] = None
+    sample_rate: float = 0.1
+    max_concurrency: int = 2
+    timeout_sec: Optional[float] = None
+
+    def __post_init__(self) -> None:
+        if not 0.0 <= self.sample_rate <= 1.0:
+            raise ValueError("shadow sample_rate must be between 0 and 1")
+        if self.max_concurrency < 1:
+            raise ValueError("shadow max_concurrency must be at least 1")
+        if self.model is None and self.provider is None:
+            raise ValueError("shadow mode needs a secondary model or provider")
+
+
+@dataclass(slots=True)
+class AdaptiveTimeoutConfig:
+    """Derive attempt timeouts from observed latency per provider/model.
+
+    Once ``min_samples`` successful calls are seen, each attempt is bounded by
+    ``multiplier`` x the ``percentile`` latency of the last ``window`` calls,
+    clamped to ``[floor_sec, ceiling_sec]`` and never above a ``timeout_sec``
+    the caller passed explicitly. Until then the request's static timeout
+    applies, and attempts cut off by it are not recorded. An attempt that hits
+    the adaptive bound is recorded at the bound and multiplies the next bound
+    by ``multiplier`` (up to ``ceiling_sec``) until a call succeeds, so a
+    model that slows down is not cut off forever.
+    """
+
+    percentile: float = 0.95
+    multiplier: float = 3.0
+    floor_sec: float = 2.0
+    ceiling_sec: float = 120.0
+    min_samples: int = 20
+    window: int = 256
+
+    def __post_init__(self) -> None:
+        if not 0.0 < self.percentile <= 1.0:
+            raise ValueError("adaptive timeout percentile must be in (0, 1]")
+        if self.multiplier <= 0:
+            raise ValueError("adaptive timeout multiplier must be positive")
+        if not 0 < self.floor_sec <= self.ceiling_sec:
+            raise ValueError("adaptive timeout requires 0 < floor_sec <= ceiling_sec")
+        if self.min_samples < 1 or self.window < self.min_samples:
+            raise ValueError("adaptive timeout requires 1 <= min_samples <= window")
+
+
+class _LatencyWindow:
+    """Sliding window of recent latencies with a cached percentile."""
+
+    __slots__ = ("_samples", "_cached", "escalation")
+
+    def __init__(self, size: int) -> None:
+        self._samples: deque[float] = deque(maxlen=size)
+        self._cached: Optional[float] = None
+        # Adaptive timeouts hit since the last success; each one widens the next bound.
+        self.escalation = 0
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        self._cached = None
+        self.escalation = 0
+
+    def add_timeout(self, seconds: float) -> None:
+        """Record an attempt cut off at ``seconds``; its real latency is at least that."""
+
+        self._samples.append(seconds)
+        self._cached = None
+        self.escalation += 1
+
+    def percentile(self, pct: float) -> float:
+        if self._cached is None:
+            ordered = sorted(self._samples)
+            index = min(len(ordered) - 1, max(0, math.ceil(pct * len(ordered)) - 1))
+            self._cached = ordered[index]
+        return self._cached
+
+
+@dataclass(slots=True)
+class _ShadowProbe:
+    """Primary-call outcome handed to the shadow task once it is known."""
+
+    done: asyncio.Event
+    latency_ms: float = 0.0
+    status: str = "ok"
+    token_usage: Optional[dict[str, Any]] = None
 
 
 class PromptLimitExceeded(RuntimeError):
@@ -53,6 +203,9 @@ class MCPRouter(AbstractContextManager["MCPRouter"]):
         log_dir: Optional[Path] = None,
         log_flush_every: int = 1,
         skills: Optional[SkillManager] = None,
+        shadow: Optional[ShadowConfig] = None,
+        adaptive_timeout: Optional[AdaptiveTimeoutConfig] = None,
+        tokens: Optional[TokenService] = None,
     ) -> None:
         if max_sessions < 1:
             raise ValueError("max_sessions must be at least 1")
@@ -63,7 +216,7 @@ class MCPRouter(AbstractContextManager["MCPRouter"]):
         self._backoff_base = backoff_base
         self._log_dir = (log_dir or Path.cwd()).resolve()
         self._log_dir.mkdir(parents=True, exist_ok=True)
-        self._queue: asyncio.Queue[_QueueEntry | None] = asyncio.Queue()
+        self._queue: asyncio.Queue[_QueueItem | None] = asyncio.Queue()
         self._loop: Optional[asyncio.AbstractEventLoop] = None
         self._thread: Optional[threading.Thread] = None
         self._workers: list[asyncio.Task[None]] = []
@@ -73,6 +226,20 @@ class MCPRouter(AbstractContextManager["MCPRouter"]):
         self._audit_writer = _AsyncLineWriter(self._log_path, flush_every=log_flush_every)
         self._audit_writer.start()
         self._skills_manager = skills
+        # Start loading the tokenizer before the first near-limit prompt needs it.
+        self._tokens = tokens or default_token_service()
+        self._tokens.warm_up()
+        self._adaptive_timeout = adaptive_timeout
+        self._latency_windows: dict[tuple[str, str], _LatencyWindow] = {}
+        self._shadow = shadow
+        self._shadow_tasks: set[asyncio.Task[None]] = set()
+        self._shadow_writer: Optional[_AsyncLineWriter] = None
+        if shadow is not None and shadow.sample_rate > 0:
+            self._shadow_writer = _AsyncLineWriter(
+                self._log_dir / "mcp_shadow.jsonl",
+                flush_every=log_flush_every,
+            )
+            self._shadow_writer.start()
 
     # ------------------------------------------------------------------
     # Construction helpers
@@ -100,6 +267,8 @@ class MCPRouter(AbstractContextManager["MCPRouter"]):
         provider_name = env_provider_override or router_settings.get("provider")
         provider = cls._build_provider(provider_name, providers_config, env_override=env_provider_override)
         skills_manager = cls._build_skills_manager(settings)
+        shadow = cls._build_shadow(router_settings.get("shadow"), providers_config)
+        adaptive_timeout = cls._build_adaptive_timeout(router_settings.get("adaptive_timeout"))
 
         max_sessions = cls._coerce_int(
             router_settings.get("max_sessions"),
@@ -143,6 +312,8 @@ class MCPRouter(AbstractContextManager["MCPRouter"]):
             log_dir=log_dir,
             log_flush_every=parsed_flush,
             skills=skills_manager,
+            shadow=shadow,
+            adaptive_timeout=adaptive_timeout,
         )
 
     # ------------------------------------------------------------------
@@ -170,36 +341,26 @@ class MCPRouter(AbstractContextManager["MCPRouter"]):
         config: Optional[dict] = None,
         timeout_sec: Optional[float] = None,
         retries: Optional[int] = None,
+        artifacts_dir: Optional[Path] = None,
     ) -> Result:
-        """Queue a request and block until the result is available."""
+        """Queue a request and block until the result is available.
+
+        ``artifacts_dir`` lets providers spill large response bodies to disk;
+        the spilled file is exposed through ``Result.body``.
+        """
 
         if not self._started:
             self._ensure_started()
-        config = dict(config or {})
-        if self._skills_manager and self._skills_manager.enabled:
-            try:
-                matches = self._skills_manager.prepare_payload(prompt)
-            except Exception:  # pylint: disable=broad-except
-                matches = []
-            if matches:
-                skill_config = {
-                    "version": "skills_v1",
-                    "matches": matches,
-                    "exec_enabled": self._skills_manager.exec_enabled,
-                }
-                existing = config.get("skills")
-                if isinstance(existing, dict):
-                    existing.update(skill_config)
-                else:
-                    config["skills"] = skill_config
         timeout = timeout_sec or self._request_timeout
         retry_budget = retries if retries is not None else self._max_retries
         prompt_chars = len(prompt)
-        token_estimate = BaseProvider.approx_token_usage(prompt)
-        approx_tokens = token_estimate["tokens"]
+        # tiktoken only runs unless the prompt's UTF-8 length fits or the estimate is far over the limit.
+        measured = self._tokens.check(prompt, prompt_limit - prompt_buffer, model=model)
+        approx_tokens = max(1, measured.tokens)
+        token_estimate = {"tokens": approx_tokens, "exact": measured.exact}
         if approx_tokens + prompt_buffer > prompt_limit:
             self._log_audit(
-                AuditRecord(
+                _AuditLine(
                     ts=datetime.now(UTC),
                     model=model,
                     latency_ms=0.0,
@@ -215,6 +376,27 @@ class MCPRouter(AbstractContextManager["MCPRouter"]):
             )
             raise PromptLimitExceeded(message)
 
+        config = config or {}
+        if self._skills_manager and self._skills_manager.enabled:
+            try:
+                # Skill bodies share the budget left after the prompt itself.
+                matches = self._skills_manager.prepare_payload(
+                    prompt, token_budget=prompt_limit - prompt_buffer - approx_tokens
+                )
+            except Exception:  # pylint: disable=broad-except
+                matches = []
+            if matches:
+                skill_config = {
+                    "version": "skills_v1",
+                    "matches": matches,
+                    "exec_enabled": self._skills_manager.exec_enabled,
+                }
+                existing = config.get("skills")
+                if isinstance(existing, dict):
+                    skill_config = {**existing, **skill_config}
+                config = {**config, "skills": skill_config}
+
+        # Single validation point: everything downstream trusts this request.
         request = ProviderRequest(
             prompt=prompt,
             model=model,
@@ -222,28 +404,33 @@ class MCPRouter(AbstractContextManager["MCPRouter"]):
             approval_policy=approval_policy,
             config=config,
             timeout_sec=timeout,
-        )
-        queue_item = QueueItem(
-            request=request,
-            prompt_limit=prompt_limit,
-            prompt_buffer=prompt_buffer,
-            retries=retry_budget,
-            prompt_chars=prompt_chars,
-            token_estimate=token_estimate,
+            artifacts_dir=artifacts_dir,
         )
 
-        future = asyncio.run_coroutine_threadsafe(self._enqueue(queue_item), self._loop)
+        future = asyncio.run_coroutine_threadsafe(
+            self._enqueue(
+                request,
+                prompt_limit=prompt_limit,
+                prompt_buffer=prompt_buffer,
+                retries=retry_budget,
+                prompt_chars=prompt_chars,
+                token_estimate=token_estimate,
+                timeout_cap=timeout_sec or None,
+            ),
+            self._loop,
+        )
         provider_response = future.result()
-        meta = dict(provider_response.meta)
-        meta.setdefault("provider", self._provider.name)
-        meta.setdefault("retries", retry_budget)
-        meta.setdefault("token_usage", provider_response.token_usage or token_estimate)
-        meta.setdefault("latency_ms", provider_response.latency_ms)
-        safe_meta = mask_sensitive(meta)
-        return Result(
+        safe_meta = mask_sensitive(provider_response.meta)
+        safe_meta.setdefault("provider", self._provider.name)
+        safe_meta.setdefault("retries", retry_budget)
+        safe_meta.setdefault("token_usage", provider_response.token_usage or token_estimate)
+        safe_meta.setdefault("latency_ms", provider_response.latency_ms)
+        # ProviderResponse was validated by the provider; skip a second pass.
+        return Result.model_construct(
             text=provider_response.text,
             content=provider_response.content,
             meta=safe_meta,
+            body=provider_response.body,
         )
 
     # ------------------------------------------------------------------
@@ -287,7 +474,7 @@ class MCPRouter(AbstractContextManager["MCPRouter"]):
                 cfg_api_key = MCPRouter._normalize_secret(provider_entry.get("api_key"))
             api_key = cfg_api_key or api_key_env
             if api_key:
-                return OpenAIProvider(api_key)
+                return OpenAIProvider(api_key, **MCPRouter._openai_options(provider_entry))
             if env == "production":
                 raise ValueError("OPENAI_API_KEY is required when provider=openai and ENV=production")
             return DummyProvider()
@@ -297,11 +484,22 @@ class MCPRouter(AbstractContextManager["MCPRouter"]):
             cfg_base_url = None
             timeout_setting = None
             cfg_api_version = None
+            cfg_response_mode = None
+            spill_setting = None
+            cache_setting: Any = None
+            cfg_cache_dir = None
+            batch_settings: dict[str, Any] = {}
             if isinstance(provider_entry, dict):
                 cfg_token = MCPRouter._normalize_secret(provider_entry.get("token"))
                 cfg_base_url = provider_entry.get("base_url")
                 timeout_setting = provider_entry.get("timeout_sec")
                 cfg_api_version = provider_entry.get("api_version")
+                cfg_response_mode = provider_entry.get("response_mode")
+                spill_setting = provider_entry.get("spill_threshold_bytes")
+                cache_setting = provider_entry.get("conditional_cache")
+                cfg_cache_dir = provider_entry.get("cache_dir")
+                batch_raw = provider_entry.get("graphql_batch")
+                batch_settings = batch_raw if isinstance(batch_raw, dict) else {}
             token_env = MCPRouter._normalize_secret(os.getenv("GITHUB_TOKEN"))
             token = cfg_token or token_env
             if not token:
@@ -317,10 +515,131 @@ class MCPRouter(AbstractContextManager["MCPRouter"]):
             api_version_raw = cfg_api_version or os.getenv("GITHUB_API_VERSION") or GitHubProvider.default_api_version
             api_version = str(api_version_raw).strip() if api_version_raw is not None else GitHubProvider.default_api_version
             kwargs["api_version"] = api_version or GitHubProvider.default_api_version
+            if isinstance(cfg_response_mode, str) and cfg_response_mode.strip():
+                kwargs["response_mode"] = cfg_response_mode.strip()
+            kwargs["spill_threshold_bytes"] = MCPRouter._coerce_int(
+                spill_setting,
+                fallback=os.getenv("GITHUB_SPILL_THRESHOLD_BYTES"),
+                default=GitHubProvider.default_spill_threshold,
+                minimum=0,
+            )
+            if SkillManager._coerce_bool(cache_setting):
+                cache_dir = None
+                if isinstance(cfg_cache_dir, str) and cfg_cache_dir.strip():
+                    candidate = Path(cfg_cache_dir.strip())
+                    cache_dir = candidate if candidate.is_absolute() else Path.cwd() / candidate
+                kwargs["cache"] = ConditionalRequestCache(cache_dir=cache_dir)
+            if SkillManager._coerce_bool(batch_settings.get("enabled")):
+                kwargs["graphql_batch_window_ms"] = MCPRouter._coerce_float(
+                    batch_settings.get("window_ms"),
+                    default=5.0,
+                )
+                kwargs["graphql_batch_max_size"] = MCPRouter._coerce_int(
+                    batch_settings.get("max_batch_size"),
+                    default=10,
+                    minimum=1,
+                )
+                kwargs["graphql_batch_max_cost"] = MCPRouter._coerce_int(
+                    batch_settings.get("max_batch_cost"),
+                    default=100,
+                    minimum=1,
+                )
             return GitHubProvider(token, **kwargs)
 
         raise ValueError(f"unsupported MCP provider type: {provider_type}")
 
+    @staticmethod
+    def _build_shadow(settings: Any, providers_config: dict[str, Any]) -> Optional[ShadowConfig]:
+        if not isinstance(settings, dict) or not SkillManager._coerce_bool(settings.get("enabled")):
+            return None
+        sample_rate = MCPRouter._coerce_float(settings.get("sample_rate"), default=0.1)
+        if sample_rate <= 0:
+            return None
+        alias = settings.get("provider")
+        provider = None
+        if isinstance(alias, str) and alias.strip():
+            provider = MCPRouter._build_provider(alias.strip(), providers_config, env_override=alias.strip())
+        model = settings.get("model")
+        model_name = model.strip() if isinstance(model, str) and model.strip() else None
+        if provider is None and model_name is None:
+            return None
+        timeout_setting = settings.get("timeout_sec")
+        return ShadowConfig(
+            model=model_name,
+            provider=provider,
+            sample_rate=min(1.0, sample_rate),
+            max_concurrency=MCPRouter._coerce_int(settings.get("max_concurrency"), default=2, minimum=1),
+            timeout_sec=MCPRouter._try_parse_float(timeout_setting),
+        )
+
+    @staticmethod
+    def _build_telemetry_policy(settings: Any) -> Optional[TelemetryPolicy]:
+        if not isinstance(settings, dict):
+            return None
+        defaults = TelemetryPolicy()
+        rates_raw = settings.get("sample_rates")
+        rates = {
+            str(event): max(0.0, min(1.0, MCPRouter._coerce_float(rate, default=1.0)))
+            for event, rate in (rates_raw.items() if isinstance(rates_raw, dict) else ())
+        }
+        keep_statuses = settings.get("keep_statuses")
+        return TelemetryPolicy(
+            sample_rates=rates,
+            default_rate=max(0.0, min(1.0, MCPRouter._coerce_float(settings.get("default_rate"), default=1.0))),
+            keep_statuses=(
+                frozenset(str(status) for status in keep_statuses)
+                if isinstance(keep_statuses, list)
+                else defaults.keep_statuses
+            ),
+            aggregate_interval_sec=max(
+                0.0,
+                MCPRouter._coerce_float(
+                    settings.get("aggregate_interval_sec"), default=defaults.aggregate_interval_sec
+                ),
+            ),
+        )
+
+    @staticmethod
+    def _build_adaptive_timeout(settings: Any) -> Optional[AdaptiveTimeoutConfig]:
+        if not isinstance(settings, dict) or not SkillManager._coerce_bool(settings.get("enabled")):
+            return None
+        defaults = AdaptiveTimeoutConfig()
+        return AdaptiveTimeoutConfig(
+            percentile=MCPRouter._coerce_float(settings.get("percentile"), default=defaults.percentile),
+            multiplier=MCPRouter._coerce_float(settings.get("multiplier"), default=defaults.multiplier),
+            floor_sec=MCPRouter._coerce_float(settings.get("floor_sec"), default=defaults.floor_sec),
+            ceiling_sec=MCPRouter._coerce_float(settings.get("ceiling_sec"), default=defaults.ceiling_sec),
+            min_samples=MCPRouter._coerce_int(settings.get("min_samples"), default=defaults.min_samples, minimum=1),
+            window=MCPRouter._coerce_int(settings.get("window"), default=defaults.window, minimum=1),
+        )
+
+    @staticmethod
+    def _openai_options(provider_entry: Any) -> dict[str, Any]:
+        if not isinstance(provider_entry, dict):
+            return {}
+        options: dict[str, Any] = {}
+        if isinstance(provider_entry.get("endpoint"), str) and provider_entry["endpoint"].strip():
+            options["endpoint"] = provider_entry["endpoint"].strip()
+        pool_raw = provider_entry.get("pool")
+        pool = pool_raw if isinstance(pool_raw, dict) else {}
+        if pool.get("max_connections") is not None:
+            options["max_connections"] = MCPRouter._coerce_int(pool["max_connections"], default=20, minimum=1)
+        if pool.get("max_keepalive_connections") is not None:
+            options["max_keepalive_connections"] = MCPRouter._coerce_int(
+                pool["max_keepalive_connections"], default=10, minimum=0
+            )
+        if pool.get("keepalive_expiry_sec") is not None:
+            options["keepalive_expiry"] = MCPRouter._coerce_float(pool["keepalive_expiry_sec"], default=30.0)
+        if "http2" in provider_entry:
+            options["http2"] = SkillManager._coerce_bool(provider_entry.get("http2"))
+        timeouts_raw = provider_entry.get("timeouts")
+        timeouts = timeouts_raw if isinstance(timeouts_raw, dict) else {}
+        for phase in ("connect", "read", "write", "pool"):
+            parsed = MCPRouter._try_parse_float(timeouts.get(phase))
+            if parsed is not None:
+                options[f"{phase}_timeout"] = parsed
+        return options
+
     @staticmethod
     def _build_skills_manager(settings: dict[str, Any]) -> Optional[SkillManager]:
         features_raw = settings.get("features")
@@ -356,6 +675,38 @@ class MCPRouter(AbstractContextManager["MCPRouter"]):
             kwargs["top_k"] = MCPRouter._coerce_int(skills_settings.get("top_k"), default=3, minimum=1)
         if "threshold" in skills_settings:
             kwargs["threshold"] = MCPRouter._coerce_float(skills_settings.get("threshold"), default=0.75)
+        if "embedding_skip_margin" in skills_settings:
+            kwargs["embedding_skip_margin"] = MCPRouter._coerce_float(
+                skills_settings.get("embedding_skip_margin"), default=0.0
+            )
+        if "query_cache_size" in skills_settings:
+            kwargs["query_cache_size"] = MCPRouter._coerce_int(
+                skills_settings.get("query_cache_size"), default=256, minimum=0
+            )
+        if "ann_min_skills" in skills_settings:
+            kwargs["ann_min_skills"] = MCPRouter._coerce_int(
+                skills_settings.get("ann_min_skills"), default=20000, minimum=0
+            )
+        if "ann_nprobe" in skills_settings:
+            kwargs["ann_nprobe"] = MCPRouter._coerce_int(skills_settings.get("ann_nprobe"), default=16, minimum=1)
+        if "body_cache_mb" in skills_settings:
+            cache_mb = MCPRouter._coerce_float(skills_settings.get("body_cache_mb"), default=8.0)
+            kwargs["body_cache_bytes"] = int(max(0.0, cache_mb) * 1024 * 1024)
+        if "preload_bodies" in skills_settings:
+            kwargs["preload_bodies"] = SkillManager._coerce_bool(skills_settings.get("preload_bodies"))
+        telemetry_policy = MCPRouter._build_telemetry_policy(skills_settings.get("telemetry"))
+        if telemetry_policy is not None:
+            kwargs["telemetry_policy"] = telemetry_policy
+        model_name = skills_settings.get("embedding_model")
+        if isinstance(model_name, str) and model_name.strip():
+            kwargs["embedding_model"] = model_name.strip()
+        quantization = str(skills_settings.get("embedding_quantization") or "none").strip().lower()
+        if quantization in SkillManager.EMBEDDING_QUANTIZATIONS:
+            kwargs["embedding_quantization"] = quantization
+        if "watch_interval_sec" in skills_settings:
+            kwargs["watch_interval_sec"] = MCPRouter._coerce_float(
+                skills_settings.get("watch_interval_sec"), default=0.0
+            )
         try:
             return SkillManager(**kwargs)
         except Exception:  # pylint: disable=broad-except
@@ -471,6 +822,8 @@ class MCPRouter(AbstractContextManager["MCPRouter"]):
     def close(self) -> None:
         """Signal the background loop to stop."""
 
+        if self._skills_manager is not None:
+            self._skills_manager.close()
         if not self._started:
             return
         self._closing.set()
@@ -481,14 +834,13 @@ class MCPRouter(AbstractContextManager["MCPRouter"]):
             self._loop.call_soon_threadsafe(self._loop.stop)
         if self._thread:
             self._thread.join(timeout=5)
-        closer = getattr(self._provider, "aclose", None)
-        if closer is not None:
-            if asyncio.iscoroutinefunction(closer):
-                self._run_async_cleanup(closer)
-            else:
-                closer()
+        self._close_provider(self._provider)
+        if self._shadow is not None and self._shadow.provider not in (None, self._provider):
+            self._close_provider(self._shadow.provider)
         self._started = False
         self._audit_writer.close()
+        if self._shadow_writer is not None:
+            self._shadow_writer.close()
 
     # ------------------------------------------------------------------
     # Internal helpers
@@ -502,6 +854,14 @@ class MCPRouter(AbstractContextManager["MCPRouter"]):
         asyncio.run_coroutine_threadsafe(self._start_workers(), self._loop).result()
         self._started = True
 
+    def _close_provider(self, provider: BaseProvider) -> None:
+        closer = getattr(provider, "aclose", None)
+        if closer is not None:
+            if asyncio.iscoroutinefunction(closer):
+                self._run_async_cleanup(closer)
+            else:
+                closer()
+
     def _run_async_cleanup(self, closer: Callable[[], Awaitable[None]]) -> None:
         """Execute an async cleanup function without leaking event loop errors."""
 
@@ -544,49 +904,186 @@ class MCPRouter(AbstractContextManager["MCPRouter"]):
         await self._queue.join()
         await asyncio.gather(*self._workers, return_exceptions=True)
         self._workers.clear()
+        # Shadow calls are best-effort; never hold shutdown for them.
+        for task in self._shadow_tasks:
+            task.cancel()
+        await asyncio.gather(*self._shadow_tasks, return_exceptions=True)
 
-    async def _enqueue(self, item: QueueItem) -> ProviderResponse:
+    async def _enqueue(
+        self,
+        request: ProviderRequest,
+        *,
+        prompt_limit: int,
+        prompt_buffer: int,
+        retries: int,
+        prompt_chars: int,
+        token_estimate: dict[str, Any],
+        timeout_cap: Optional[float] = None,
+    ) -> ProviderResponse:
         assert self._loop is not None
         future: asyncio.Future[ProviderResponse] = self._loop.create_future()
-        await self._queue.put(_QueueEntry(item=item, future=future))
+        await self._queue.put(
+            _QueueItem(
+                request=request,
+                prompt_limit=prompt_limit,
+                prompt_buffer=prompt_buffer,
+                retries=retries,
+                prompt_chars=prompt_chars,
+                token_estimate=token_estimate,
+                future=future,
+                timeout_cap=timeout_cap,
+            )
+        )
         return await future
 
     async def _worker(self, index: int) -> None:
         worker_name = f"worker-{index}"
         while True:
-            entry = await self._queue.get()
-            if entry is None:
+            item = await self._queue.get()
+            if item is None:
                 self._queue.task_done()
                 break
-            assert isinstance(entry, _QueueEntry)
+            probe = self._maybe_shadow(item)
+            started = time.perf_counter()
             try:
-                response = await self._execute(worker_name, entry.item)
+                response = await self._execute(worker_name, item)
             except Exception as exc:  # pylint: disable=broad-except
-                entry.future.set_exception(exc)
+                item.future.set_exception(exc)
+                if probe is not None:
+                    probe.status = "error"
             else:
-                entry.future.set_result(response)
+                item.future.set_result(response)
+                if probe is not None:
+                    probe.token_usage = response.token_usage
             finally:
+                if probe is not None:
+                    probe.latency_ms = (time.perf_counter() - started) * 1000
+                    probe.done.set()
                 self._queue.task_done()
 
-    async def _execute(self, worker_name: str, queue_item: QueueItem) -> ProviderResponse:
+    def _maybe_shadow(self, item: _QueueItem) -> Optional[_ShadowProbe]:
+        shadow = self._shadow
+        if shadow is None or self._shadow_writer is None or not self._shadow_safe(item.request):
+            return None
+        if random.random() >= shadow.sample_rate:
+            return None
+        shadow_model = shadow.model or item.request.model
+        if len(self._shadow_tasks) >= shadow.max_concurrency:
+            self._shadow_writer.write(
+                json.dumps(
+                    {
+                        "ts": datetime.now(UTC).isoformat().replace("+00:00", "Z"),
+                        "model": item.request.model,
+                        "shadow_model": shadow_model,
+                        "status": "dropped",
+                    }
+                )
+            )
+            return None
+        probe = _ShadowProbe(done=asyncio.Event())
+        task = asyncio.create_task(self._run_shadow(item, probe, shadow, shadow_model))
+        self._shadow_tasks.add(task)
+        task.add_done_callback(self._shadow_tasks.discard)
+        return probe
+
+    @staticmethod
+    def _shadow_safe(request: ProviderRequest) -> bool:
+        """Whether ``request`` is read-only, so executing it a second time has no side effects."""
+
+        config = request.config or {}
+        if config.get("graphql"):
+            return not _GRAPHQL_MUTATION.search(str(config.get("query") or request.prompt))
+        return str(config.get("method") or "GET").upper().strip() in _SHADOW_SAFE_METHODS
+
+    async def _run_shadow(
+        self,
+        item: _QueueItem,
+        probe: _ShadowProbe,
+        shadow: ShadowConfig,
+        shadow_model: str,
+    ) -> None:
+        provider = shadow.provider or self._provider
+        timeout = shadow.timeout_sec or item.request.timeout_sec
+        request = item.request.model_copy(update={"model": shadow_model, "timeout_sec": timeout})
+        started = time.perf_counter()
+        status = "ok"
+        error: Optional[str] = None
+        token_usage: Optional[dict[str, Any]] = None
+        try:
+            response = await asyncio.wait_for(provider.agenerate(request), timeout=timeout)
+        except asyncio.TimeoutError:
+            status, error = "timeout", f"shadow call exceeded {timeout}s"
+        except Exception as exc:  # pylint: disable=broad-except
+            status, error = "error", str(exc)
+        else:
+            token_usage = response.token_usage
+        latency_ms = (time.perf_counter() - started) * 1000
+        await probe.done.wait()
+        assert self._shadow_writer is not None
+        self._shadow_writer.write(
+            json.dumps(
+                {
+                    "ts": datetime.now(UTC).isoformat().replace("+00:00", "Z"),
+                    "model": item.request.model,
+                    "shadow_model": shadow_model,
+                    "shadow_provider": provider.name,
+                    "status": status,
+                    "error": error,
+                    "primary": {
+                        "latency_ms": probe.latency_ms,
+                        "status": probe.status,
+                        "token_usage": mask_sensitive(probe.token_usage or item.token_estimate),
+                    },
+                    "shadow": {
+                        "latency_ms": latency_ms,
+                        "token_usage": mask_sensitive(token_usage or {}),
+                    },
+                    "latency_delta_ms": latency_ms - probe.latency_ms,
+                },
+                ensure_ascii=False,
+            )
+        )
+
+    async def _execute(self, worker_name: str, queue_item: _QueueItem) -> ProviderResponse:
         attempts = queue_item.retries + 1
         last_error: Optional[Exception] = None
+        window = self._latency_window(queue_item.request.model)
         for attempt in range(attempts):
+            request, attempt_timeout, adaptive = self._attempt_request(
+                queue_item.request, window, queue_item.timeout_cap
+            )
             attempt_start = time.perf_counter()
             try:
-                response = await self._provider.agenerate(queue_item.request)
+                if window is not None and attempt_timeout is not None:
+                    try:
+                        response = await asyncio.wait_for(self._provider.agenerate(request), timeout=attempt_timeout)
+                    except asyncio.TimeoutError as exc:
+                        # Static or caller-imposed cut-offs say nothing about the model's latency; skip them.
+                        if adaptive:
+                            window.add_timeout(attempt_timeout)
+                        kind = "adaptive timeout" if adaptive else "timeout"
+                        raise ProviderError(
+                            f"attempt exceeded {kind} of {attempt_timeout:.2f}s",
+                            retriable=True,
+                        ) from exc
+                else:
+                    response = await self._provider.agenerate(request)
             except ProviderError as exc:
                 last_error = exc
                 should_retry = exc.retriable and attempt < attempts - 1
+                retry_after = exc.retry_after
             except Exception as exc:  # pylint: disable=broad-except
                 last_error = exc
                 should_retry = attempt < attempts - 1
+                retry_after = None
             else:
                 latency_ms = (time.perf_counter() - attempt_start) * 1000
+                if window is not None:
+                    window.add(latency_ms / 1000)
                 if response.latency_ms is None:
                     response.latency_ms = latency_ms
                 self._log_audit(
-                    AuditRecord(
+                    _AuditLine(
                         ts=datetime.now(UTC),
                         model=queue_item.request.model,
                         worker=worker_name,
@@ -594,12 +1091,13 @@ class MCPRouter(AbstractContextManager["MCPRouter"]):
                         prompt_chars=queue_item.prompt_chars,
                         token_usage=response.token_usage or queue_item.token_estimate,
                         status="ok",
+                        timeout_sec=attempt_timeout,
                     )
                 )
                 return response
             latency_ms = (time.perf_counter() - attempt_start) * 1000
             self._log_audit(
-                AuditRecord(
+                _AuditLine(
                     ts=datetime.now(UTC),
                     model=queue_item.request.model,
                     worker=worker_name,
@@ -608,20 +1106,55 @@ class MCPRouter(AbstractContextManager["MCPRouter"]):
                     token_usage=queue_item.token_estimate,
                     status="error",
                     error=str(last_error),
+                    timeout_sec=attempt_timeout,
                 )
             )
             if not should_retry:
                 raise last_error  # type: ignore[misc]
-            jitter = random.uniform(0.8, 1.2)
-            backoff = self._backoff_base * (2 ** attempt) * jitter
+            if retry_after is not None:
+                # Honour the server's hint; a little extra spread avoids a thundering herd.
+                backoff = min(retry_after, _MAX_RETRY_AFTER) * random.uniform(1.0, 1.1)
+            else:
+                jitter = random.uniform(0.8, 1.2)
+                backoff = self._backoff_base * (2 ** attempt) * jitter
             await asyncio.sleep(backoff)
         raise AssertionError("unreachable: all retry attempts exhausted")
 
-    def _log_audit(self, record: AuditRecord) -> None:
-        payload = mask_sensitive(record.model_dump())
-        payload["ts"] = record.ts.isoformat().replace("+00:00", "Z")
-        line = json.dumps(payload, ensure_ascii=False)
-        self._audit_writer.write(line)
+    def _latency_window(self, model: str) -> Optional[_LatencyWindow]:
+        if self._adaptive_timeout is None:
+            return None
+        key = (self._provider.name, model)
+        window = self._latency_windows.get(key)
+        if window is None:
+            window = self._latency_windows[key] = _LatencyWindow(self._adaptive_timeout.window)
+        return window
+
+    def _attempt_request(
+        self,
+        request: ProviderRequest,
+        window: Optional[_LatencyWindow],
+        cap: Optional[float] = None,
+    ) -> tuple[ProviderRequest, Optional[float], bool]:
+        """Pick the timeout for one attempt and whether it is the adaptive bound.
+
+        The bound is adaptive once enough samples exist, unless the caller's
+        explicit ``cap`` is lower.
+        """
+
+        settings = self._adaptive_timeout
+        if settings is None or window is None or len(window) < settings.min_samples:
+            return request, request.timeout_sec, False
+        observed = window.percentile(settings.percentile) * settings.multiplier ** (1 + window.escalation)
+        timeout = round(min(settings.ceiling_sec, max(settings.floor_sec, observed)), 3)
+        adaptive = cap is None or timeout < cap
+        if not adaptive:
+            timeout = cap
+        if timeout == request.timeout_sec:
+            return request, timeout, adaptive
+        return request.model_copy(update={"timeout_sec": timeout}), timeout, adaptive
+
+    def _log_audit(self, record: _AuditLine) -> None:
+        self._audit_writer.write(record.to_json())
 
 
 class _AsyncLineWriter:
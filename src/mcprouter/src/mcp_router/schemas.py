@@ -2,18 +2,82 @@
 
 from __future__ import annotations
 
+import json
 from datetime import datetime
+from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class ResponseBody:
+    """Raw response payload held once and decoded lazily on access.
+
+    The bytes live either in memory or, for large bodies, in a spill file;
+    ``text`` and ``json()`` are computed on first use and cached.
+    """
+
+    __slots__ = ("_data", "path", "size", "encoding", "_text", "_json")
+
+    def __init__(
+        self,
+        data: bytes | None = None,
+        *,
+        path: Path | None = None,
+        size: int | None = None,
+        encoding: str = "utf-8",
+    ) -> None:
+        if data is None and path is None:
+            raise ValueError("ResponseBody requires data or a spill path")
+        self._data = data
+        self.path = path
+        self.size = size if size is not None else len(data or b"")
+        self.encoding = encoding
+        self._text: Optional[str] = None
+        self._json: Any = None
+
+    @property
+    def spilled(self) -> bool:
+        return self._data is None
+
+    def read_bytes(self) -> bytes:
+        if self._data is not None:
+            return self._data
+        assert self.path is not None
+        return self.path.read_bytes()
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self.read_bytes().decode(self.encoding, errors="replace")
+        return self._text
+
+    def json(self) -> Any:
+        """Parse the payload as JSON; raises ``ValueError`` when it is not JSON."""
+
+        if self._json is None:
+            if self._data is not None:
+                self._json = json.loads(self._data)
+            else:
+                assert self.path is not None
+                with self.path.open("rb") as handle:
+                    self._json = json.load(handle)
+        return self._json
+
+    def __repr__(self) -> str:
+        location = str(self.path) if self.spilled else "memory"
+        return f"ResponseBody(size={self.size}, location={location})"
 
 
 class Result(BaseModel):
     """Normalized response returned to synchronous callers."""
 
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     text: str
     content: List[Dict[str, Any]] = Field(default_factory=list)
     meta: Dict[str, Any] = Field(default_factory=dict)
+    body: Optional[ResponseBody] = Field(default=None, exclude=True)
 
 
 class ProviderRequest(BaseModel):
@@ -25,16 +89,20 @@ class ProviderRequest(BaseModel):
     approval_policy: str
     config: Dict[str, Any] = Field(default_factory=dict)
     timeout_sec: float
+    artifacts_dir: Optional[Path] = None
 
 
 class ProviderResponse(BaseModel):
     """Simplified provider output."""
 
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     text: str
     content: List[Dict[str, Any]] = Field(default_factory=list)
     meta: Dict[str, Any] = Field(default_factory=dict)
     latency_ms: Optional[float] = None
     token_usage: Optional[Dict[str, Any]] = None
+    body: Optional[ResponseBody] = Field(default=None, exclude=True)
 
 
 class AuditRecord(BaseModel):
@@ -48,14 +116,4 @@ class AuditRecord(BaseModel):
     token_usage: Dict[str, Any] = Field(default_factory=dict)
     status: str
     error: Optional[str] = None
-
-
-class QueueItem(BaseModel):
-    """Work item stored in the in-memory queue."""
-
-    request: ProviderRequest
-    prompt_limit: int
-    prompt_buffer: int
-    retries: int
-    prompt_chars: int
-    token_estimate: Dict[str, Any] = Field(default_factory=dict)
+    timeout_sec: Optional[float] = None
@@ -0,0 +1,228 @@
+"""Inverted-file (IVF) approximate nearest-neighbour index over skill embeddings.
+
+Spherical k-means splits the unit rows into ``nlist`` cells. A query ranks the
+centroids, then scores only the rows of the ``nprobe`` nearest cells: about
+``nprobe / nlist`` of the catalog. Raising ``nprobe`` trades latency for
+recall; ``nprobe == nlist`` is exact search.
+
+The index is written by ``embed_skills.py --ann`` beside the embedding cache.
+It stores skill keys rather than row numbers, so it can be bound to any later
+matrix: skills added since the build are scored exhaustively and removed
+skills are dropped until the next build. NumPy is required; without it
+``SkillManager`` keeps exact search.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import zipfile
+from pathlib import Path
+from typing import Iterable, Optional
+
+from .vectors import EmbeddingMatrix, np
+
+ANN_VERSION = 1
+DEFAULT_ANN_NAME = "skills_ann.npz"
+DEFAULT_ANN_NPROBE = 16
+DEFAULT_ANN_MIN_SKILLS = 20000
+DEFAULT_ANN_ITERATIONS = 10
+
+# k-means trains on at most this many sampled rows per cell.
+_TRAIN_PER_LIST = 64
+# Rows assigned per step when placing the full catalog into cells.
+_ASSIGN_CHUNK = 4096
+
+
+def default_nlist(rows: int) -> int:
+    """About ``4 x sqrt(rows)`` cells, the usual IVF starting point."""
+
+    return max(1, min(rows, int(4 * math.sqrt(rows))))
+
+
+class IVFIndex:
+    """Centroids plus cell membership; use :meth:`build` or :meth:`load`, then :meth:`bind`."""
+
+    __slots__ = ("keys", "centroids", "offsets", "members", "unindexed", "model")
+
+    def __init__(self, keys: list[str], centroids, offsets, members, *, unindexed=None, model: Optional[str] = None):
+        self.keys = keys
+        self.centroids = centroids
+        # members[offsets[c]:offsets[c + 1]] are the rows (positions in ``keys``) of cell c.
+        self.offsets = offsets
+        self.members = members
+        self.unindexed = unindexed if unindexed is not None else np.zeros(0, dtype=np.int64)
+        self.model = model
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    @property
+    def dim(self) -> int:
+        return int(self.centroids.shape[1]) if self.centroids.ndim == 2 else 0
+
+    @classmethod
+    def build(
+        cls,
+        matrix: EmbeddingMatrix,
+        *,
+        nlist: int = 0,
+        iterations: int = DEFAULT_ANN_ITERATIONS,
+        seed: int = 0,
+        model: Optional[str] = None,
+    ) -> "IVFIndex":
+        """Cluster ``matrix`` (float32 or int8) with spherical k-means."""
+
+        if np is None or not matrix.uses_numpy:
+            raise RuntimeError("IVFIndex requires NumPy")
+        count = len(matrix)
+        if count == 0:
+            raise ValueError("cannot build an ANN index over an empty matrix")
+        nlist = min(count, nlist) if nlist > 0 else default_nlist(count)
+        rng = np.random.default_rng(seed)
+        sample = np.sort(rng.choice(count, size=min(count, nlist * _TRAIN_PER_LIST), replace=False))
+        train = matrix.rows_at(sample)
+        centroids = train[rng.choice(len(train), size=nlist, replace=False)].copy()
+        for _ in range(max(0, iterations)):
+            assign = np.argmax(train @ centroids.T, axis=1)
+            order = np.argsort(assign, kind="stable")
+            cells, starts = np.unique(assign[order], return_index=True)
+            sums = np.zeros_like(centroids)
+            sums[cells] = np.add.reduceat(train[order], starts, axis=0)
+            empty = np.setdiff1d(np.arange(nlist), cells)
+            if len(empty):
+                # Re-seed empty cells from random training rows.
+                sums[empty] = train[rng.choice(len(train), size=len(empty))]
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            norms[norms == 0.0] = 1.0
+            centroids = (sums / norms).astype(np.float32)
+        assign = np.empty(count, dtype=np.int64)
+        for start in range(0, count, _ASSIGN_CHUNK):
+            block = matrix.rows_at(np.arange(start, min(count, start + _ASSIGN_CHUNK)))
+            assign[start : start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        members = np.argsort(assign, kind="stable")
+        offsets = np.searchsorted(assign[members], np.arange(nlist + 1))
+        return cls(list(matrix.keys), centroids, offsets, members, model=model)
+
+    def bind(self, matrix: EmbeddingMatrix) -> "IVFIndex":
+        """Re-express membership as rows of ``matrix``; rows the index does not know go to ``unindexed``."""
+
+        if list(matrix.keys) == self.keys:
+            return IVFIndex(matrix.keys, self.centroids, self.offsets, self.members, model=self.model)
+        lookup = matrix.index
+        mapping = np.fromiter((lookup.get(key, -1) for key in self.keys), dtype=np.int64, count=len(self.keys))
+        rows = mapping[self.members]
+        cells = np.repeat(np.arange(self.nlist), np.diff(self.offsets))
+        kept = rows >= 0
+        rows, cells = rows[kept], cells[kept]
+        offsets = np.searchsorted(cells, np.arange(self.nlist + 1))
+        covered = np.zeros(len(matrix), dtype=bool)
+        covered[rows] = True
+        return IVFIndex(
+            matrix.keys, self.centroids, offsets, rows, unindexed=np.flatnonzero(~covered), model=self.model
+        )
+
+    def candidates(self, query, nprobe: int):
+        """Rows in the ``nprobe`` cells nearest to the unit vector ``query``, plus unindexed rows."""
+
+        nprobe = max(1, min(nprobe, self.nlist))
+        cell_scores = self.centroids @ query
+        if nprobe < self.nlist:
+            probed = np.argpartition(cell_scores, self.nlist - nprobe)[self.nlist - nprobe :]
+        else:
+            probed = np.arange(self.nlist)
+        parts = [self.members[self.offsets[cell] : self.offsets[cell + 1]] for cell in probed]
+        parts.append(self.unindexed)
+        return np.concatenate(parts)
+
+    def search(
+        self,
+        matrix: EmbeddingMatrix,
+        query,
+        k: int,
+        *,
+        nprobe: int = DEFAULT_ANN_NPROBE,
+        include: Iterable[int] = (),
+    ) -> dict[str, float]:
+        """Approximate top-``k`` of a bound ``matrix`` plus exact scores for ``include`` rows.
+
+        Scores are rescaled to [0, 1] like :meth:`EmbeddingMatrix.select`.
+        """
+
+        if len(query) != matrix.dim:
+            raise ValueError(f"query dimension {len(query)} does not match matrix dimension {matrix.dim}")
+        vector = np.asarray(query, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        if norm == 0.0:
+            return {}
+        vector = vector / norm
+        rows = self.candidates(vector, nprobe)
+        extra = np.fromiter(include, dtype=np.int64)
+        if len(extra):
+            rows = np.union1d(rows, extra)
+        if not len(rows):
+            return {}
+        scores = matrix.rows_at(rows) @ vector
+        k = min(k, len(rows))
+        top = np.argpartition(scores, len(rows) - k)[len(rows) - k :] if k > 0 else np.zeros(0, dtype=np.int64)
+        picked = set(top.tolist())
+        if len(extra):
+            picked.update(np.flatnonzero(np.isin(rows, extra)).tolist())
+        return {
+            matrix.keys[int(rows[position])]: max(0.0, min(1.0, (float(scores[position]) + 1.0) / 2.0))
+            for position in picked
+        }
+
+    def save(self, path: Path) -> Path:
+        """Write the index atomically as an uncompressed ``.npz``."""
+
+        meta = {"version": ANN_VERSION, "model": self.model}
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with tmp_path.open("wb") as handle:
+            np.savez(
+                handle,
+                meta=np.array(json.dumps(meta)),
+                keys=np.array(self.keys),
+                centroids=self.centroids.astype(np.float32),
+                offsets=self.offsets.astype(np.int64),
+                members=self.members.astype(np.int64),
+            )
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["IVFIndex"]:
+        """Read ``path``; ``None`` if NumPy is missing or the file is absent, foreign, or corrupt."""
+
+        if np is None:
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data["meta"]))
+                if not isinstance(meta, dict) or meta.get("version") != ANN_VERSION:
+                    return None
+                keys = [str(key) for key in data["keys"]]
+                centroids = np.ascontiguousarray(data["centroids"], dtype=np.float32)
+                offsets = data["offsets"].astype(np.int64)
+                members = data["members"].astype(np.int64)
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            return None
+        if centroids.ndim != 2 or len(offsets) != len(centroids) + 1 or len(members) != len(keys):
+            return None
+        if len(members) and (members.min() < 0 or members.max() >= len(keys)):
+            return None
+        return cls(keys, centroids, offsets, members, model=meta.get("model"))
+
+
+__all__ = [
+    "ANN_VERSION",
+    "DEFAULT_ANN_ITERATIONS",
+    "DEFAULT_ANN_MIN_SKILLS",
+    "DEFAULT_ANN_NAME",
+    "DEFAULT_ANN_NPROBE",
+    "IVFIndex",
+    "default_nlist",
+]
@@ -0,0 +1,155 @@
+"""Inverted BM25 index over skill descriptions."""
+
+from __future__ import annotations
+
+import math
+from typing import Collection, Iterable, Mapping, Optional, Sequence
+
+K1 = 1.5
+B = 0.75
+
+
+def _idf(doc_count: int, doc_freq: int) -> float:
+    return math.log((doc_count - doc_freq + 0.5) / (doc_freq + 0.5) + 1)
+
+
+class _LazyIdf(dict):
+    """IDF filled in on first lookup, so loading a packed index stays O(1) in vocabulary."""
+
+    def __init__(self, postings: Mapping[str, Sequence[tuple[int, int]]], doc_count: int) -> None:
+        super().__init__()
+        self._postings = postings
+        self._doc_count = doc_count
+
+    def __missing__(self, token: str) -> float:
+        value = _idf(self._doc_count, len(self._postings[token]))
+        self[token] = value
+        return value
+
+
+class BM25Index:
+    """Postings, IDF, and length norms computed once per catalog.
+
+    Scoring touches only the postings of the query's terms, so a query costs
+    O(postings touched) rather than O(catalog x vocabulary).
+    """
+
+    __slots__ = ("doc_ids", "postings", "idf", "doc_lengths", "avg_doc_len", "_norms")
+
+    def __init__(self, documents: Mapping[str, Sequence[str]] | None = None) -> None:
+        self.doc_ids: list[str] = []
+        self.postings: Mapping[str, Sequence[tuple[int, int]]] = {}
+        self.idf: dict[str, float] = {}
+        self.doc_lengths: list[int] = []
+        self.avg_doc_len = 0.0
+        self._norms: list[float] = []
+        if documents:
+            self._build(documents)
+
+    @classmethod
+    def from_postings(
+        cls,
+        doc_ids: Sequence[str],
+        doc_lengths: Sequence[int],
+        postings: Mapping[str, Sequence[tuple[int, int]]],
+    ) -> "BM25Index":
+        """Wrap postings built elsewhere (e.g. a mapped skills pack) without re-tokenizing."""
+
+        index = cls()
+        index.doc_ids = list(doc_ids)
+        index.doc_lengths = list(doc_lengths)
+        index.postings = postings
+        index.idf = _LazyIdf(postings, len(index.doc_ids))
+        index._set_norms()
+        return index
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def updated(
+        self,
+        documents: Mapping[str, Sequence[str]],
+        previous: Mapping[str, Sequence[str]] | None = None,
+    ) -> "BM25Index":
+        """Return a copy with ``documents`` replaced or appended.
+
+        ``previous`` holds the old tokens of replaced documents. Only postings
+        lists of touched terms are copied, so the receiver stays valid for
+        readers that still hold it.
+        """
+
+        index = BM25Index()
+        index.doc_ids = list(self.doc_ids)
+        index.doc_lengths = list(self.doc_lengths)
+        postings = dict(self.postings)
+        position = {doc_id: doc_index for doc_index, doc_id in enumerate(index.doc_ids)}
+        for doc_id, tokens in documents.items():
+            doc_index = position.get(doc_id)
+            if doc_index is None:
+                doc_index = len(index.doc_ids)
+                index.doc_ids.append(doc_id)
+                index.doc_lengths.append(0)
+            else:
+                for token in set((previous or {}).get(doc_id, ())):
+                    kept = [entry for entry in postings.get(token, ()) if entry[0] != doc_index]
+                    if kept:
+                        postings[token] = kept
+                    else:
+                        postings.pop(token, None)
+            index.doc_lengths[doc_index] = len(tokens)
+            counts: dict[str, int] = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, count in counts.items():
+                postings[token] = [*postings.get(token, ()), (doc_index, count)]
+        index.postings = postings
+        index.idf = _LazyIdf(postings, len(index.doc_ids))
+        index._set_norms()
+        return index
+
+    def _build(self, documents: Mapping[str, Sequence[str]]) -> None:
+        postings: dict[str, list[tuple[int, int]]] = {}
+        for doc_index, (doc_id, tokens) in enumerate(documents.items()):
+            self.doc_ids.append(doc_id)
+            self.doc_lengths.append(len(tokens))
+            counts: dict[str, int] = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, count in counts.items():
+                postings.setdefault(token, []).append((doc_index, count))
+        self.postings = postings
+        doc_count = len(self.doc_ids)
+        self.idf = {token: _idf(doc_count, len(entries)) for token, entries in postings.items()}
+        self._set_norms()
+
+    def _set_norms(self) -> None:
+        self.avg_doc_len = sum(self.doc_lengths) / len(self.doc_lengths) if self.doc_lengths else 0.0
+        avg = self.avg_doc_len or 1.0
+        # Document-side half of the BM25 denominator: k1 * (1 - b + b * |d| / avgdl).
+        self._norms = [K1 * (1 - B + B * (length / avg)) for length in self.doc_lengths]
+
+    def score(
+        self,
+        query_tokens: Iterable[str],
+        *,
+        allowed: Optional[Collection[int]] = None,
+    ) -> dict[int, float]:
+        """Return raw BM25 scores keyed by document index for touched documents."""
+
+        term_counts: dict[str, int] = {}
+        for token in query_tokens:
+            if token in self.postings:
+                term_counts[token] = term_counts.get(token, 0) + 1
+        scores: dict[int, float] = {}
+        norms = self._norms
+        for token, repeats in term_counts.items():
+            weight = self.idf[token] * repeats * (K1 + 1)
+            for doc_index, term_freq in self.postings[token]:
+                if allowed is not None and doc_index not in allowed:
+                    continue
+                contribution = weight * term_freq / ((term_freq + norms[doc_index]) or 1.0)
+                scores[doc_index] = scores.get(doc_index, 0.0) + contribution
+        return scores
+
+
+__all__ = ["BM25Index"]
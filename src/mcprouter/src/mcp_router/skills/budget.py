@@ -0,0 +1,184 @@
+"""Token-budgeted skill bodies: section-aware truncation and score-per-token packing."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Optional, Sequence
+
+from ..tokens import DEFAULT_ENCODING, TokenService, default_token_service
+
+TokenCounter = Callable[[str], int]
+
+# A partially packed body smaller than this is dropped rather than sent as a stub.
+MIN_PARTIAL_TOKENS = 64
+
+
+def default_token_counter(encoding: str = DEFAULT_ENCODING) -> TokenCounter:
+    """Memoized tiktoken counts from the shared token service, else the heuristic."""
+
+    service = default_token_service() if encoding == DEFAULT_ENCODING else TokenService(encoding=encoding)
+    return service.count
+
+
+def _is_heading(block: str) -> bool:
+    return block.startswith("#")
+
+
+def split_sections(body: str) -> list[str]:
+    """Split Markdown into headings, paragraphs and fenced code blocks.
+
+    Blank lines end a paragraph except inside a fence; every heading is a
+    block of its own so truncation can cut before it.
+    """
+
+    blocks: list[str] = []
+    current: list[str] = []
+    fenced = False
+    for line in body.splitlines():
+        stripped = line.strip()
+        if stripped.startswith(("```", "~~~")):
+            fenced = not fenced
+            current.append(line)
+            continue
+        if fenced:
+            current.append(line)
+            continue
+        if not stripped or stripped.startswith("#"):
+            if current:
+                blocks.append("\n".join(current))
+                current = []
+            if stripped:
+                blocks.append(line)
+            continue
+        current.append(line)
+    if current:
+        blocks.append("\n".join(current))
+    return blocks
+
+
+def _cut_words(text: str, max_tokens: int, count: TokenCounter) -> str:
+    words = text.split()
+    low, high = 0, len(words)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count(" ".join(words[:middle])) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return " ".join(words[:low])
+
+
+def truncate_sections(
+    body: str, max_tokens: int, count: TokenCounter, *, total: Optional[int] = None
+) -> tuple[str, int, bool]:
+    """Keep whole leading sections of ``body`` within ``max_tokens``.
+
+    Returns ``(text, tokens, truncated)``. A trailing heading whose content
+    did not fit is dropped; only when not even the first block fits is it cut
+    at a word boundary. ``total`` is the already-known count of ``body``.
+    """
+
+    text = body.strip()
+    tokens = count(text) if total is None else total
+    if tokens <= max_tokens:
+        return text, tokens, False
+    if max_tokens <= 0:
+        return "", 0, True
+    blocks = split_sections(text)
+    kept: list[str] = []
+    used = 0
+    for block in blocks:
+        # Paragraphs are re-joined with a blank line: about one token each.
+        cost = count(block) + (1 if kept else 0)
+        if used + cost > max_tokens:
+            break
+        kept.append(block)
+        used += cost
+    while kept and _is_heading(kept[-1]):
+        kept.pop()
+    while kept:
+        text = "\n\n".join(kept)
+        tokens = count(text)
+        if tokens <= max_tokens:
+            return text, tokens, True
+        kept.pop()
+    text = _cut_words(blocks[0], max_tokens, count) if blocks else ""
+    return text, count(text), True
+
+
+@dataclass(slots=True)
+class PackedBody:
+    """One skill body after packing, with what it cost and what was cut."""
+
+    text: str
+    tokens: int
+    truncated: bool
+    source_tokens: int
+    source_bytes: int
+    dropped: bool = False
+
+    @property
+    def bytes(self) -> int:
+        return len(self.text.encode("utf-8"))
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.source_tokens - self.tokens
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.source_bytes - self.bytes
+
+
+def pack_bodies(
+    items: Sequence[tuple[float, str]],
+    budget: int,
+    count: TokenCounter,
+    *,
+    max_tokens: Optional[int] = None,
+    min_partial_tokens: int = MIN_PARTIAL_TOKENS,
+    totals: Optional[Sequence[int]] = None,
+) -> list[PackedBody]:
+    """Fit ``(score, body)`` items into ``budget`` tokens, best score per token first.
+
+    Bodies are visited greedily by density: each one that fits is taken
+    whole, and each one that does not is section-truncated to the remainder
+    while at least ``min_partial_tokens`` remain, so several bodies may be
+    truncated. ``max_tokens`` caps any single body. Results are
+    in input order; dropped items have ``dropped=True`` and no text.
+    ``totals`` are already-known counts of the stripped bodies.
+    """
+
+    sources = [body.strip() for _, body in items]
+    full = list(totals) if totals is not None else [count(text) for text in sources]
+    order = sorted(range(len(items)), key=lambda slot: (-items[slot][0] / max(1, full[slot]), slot))
+    packed = [
+        PackedBody("", 0, True, tokens, len(text.encode("utf-8")), dropped=True) for text, tokens in zip(sources, full)
+    ]
+    remaining = max(0, budget)
+    for slot in order:
+        allowance = remaining if max_tokens is None else min(remaining, max_tokens)
+        entry = packed[slot]
+        if full[slot] <= allowance:
+            entry.text, entry.tokens, entry.truncated, entry.dropped = sources[slot], full[slot], False, False
+        elif allowance >= min_partial_tokens:
+            text, tokens, _ = truncate_sections(sources[slot], allowance, count, total=full[slot])
+            if not text:
+                continue
+            entry.text, entry.tokens, entry.dropped = text, tokens, False
+        else:
+            continue
+        remaining -= entry.tokens
+    return packed
+
+
+__all__ = [
+    "DEFAULT_ENCODING",
+    "MIN_PARTIAL_TOKENS",
+    "PackedBody",
+    "TokenCounter",
+    "default_token_counter",
+    "pack_bodies",
+    "split_sections",
+    "truncate_sections",
+]
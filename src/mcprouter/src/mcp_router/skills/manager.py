@@ -1,9 +1,17 @@
 from __future__ import annotations
 
+import base64
+import binascii
+import heapq
 import json
-import math
+import os
+import sys
 import threading
-from dataclasses import dataclass
+import time
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
 from datetime import UTC, datetime
 from hashlib import sha256
 from pathlib import Path
@@ -11,7 +19,12 @@ from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Seque
 
 import yaml
 
-from ..redaction import mask_sensitive
+from ..telemetry import TelemetryPolicy, TelemetrySink
+from .ann import DEFAULT_ANN_ITERATIONS, DEFAULT_ANN_MIN_SKILLS, DEFAULT_ANN_NAME, DEFAULT_ANN_NPROBE, IVFIndex
+from .bm25 import BM25Index
+from .budget import PackedBody, TokenCounter, default_token_counter, pack_bodies, truncate_sections
+from .pack import DEFAULT_PACK_NAME, SkillsPack, write_pack
+from .vectors import EmbeddingMatrix, QuantizedEmbeddingMatrix, dequantize_int8, quantize_int8
 
 SKILLS_DIR_NAME = "skills"
 AGENTS_DIR_NAME = "agents"
@@ -19,6 +32,21 @@ DEFAULT_CACHE_DIR = Path(".mcp/cache")
 DEFAULT_TELEMETRY_DIR = Path("telemetry/skills")
 DEFAULT_METADATA_CACHE = "skills_metadata.json"
 DEFAULT_EMBEDDING_CACHE = "skills_embeddings.json"
+PARSE_WORKERS = 8
+DEFAULT_QUERY_CACHE_SIZE = 256
+EMBEDDING_QUANTIZATIONS = ("none", "int8")
+DEFAULT_BODY_TOKENS = 5000
+DEFAULT_BODY_CACHE_BYTES = 8 * 1024 * 1024
+
+# Int8 scoring keeps this many times top_k candidates for full-precision re-ranking.
+_RERANK_FACTOR = 4
+
+# Blend weights: a skill's final score is 0.7 x embedding + 0.3 x keyword.
+_EMBEDDING_WEIGHT = 0.7
+_KEYWORD_WEIGHT = 0.3
+
+# libyaml's loader is several times faster on frontmatter; fall back when PyYAML lacks it.
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 
 def _tokenize(text: str) -> list[str]:
@@ -89,9 +117,128 @@ class SkillMatch:
         return payload
 
 
+@dataclass(slots=True)
+class _CatalogSnapshot:
+    """Everything ``match`` reads, published as one reference on refresh."""
+
+    metadata_by_path: dict[str, SkillMetadata]
+    enabled: list[SkillMetadata]
+    bm25_index: BM25Index
+    bm25_enabled_ids: frozenset[int]
+    position: dict[str, int]
+    embedding_matrix: Optional[EmbeddingMatrix] = None
+    ann_index: Optional[IVFIndex] = None
+
+
+@dataclass(frozen=True, slots=True)
+class _EmbeddingVectors:
+    """Per-path vectors from the embedding cache, replaced as one reference on reload."""
+
+    floats: Mapping[str, Sequence[float]] = field(default_factory=dict)
+    quantized: Mapping[str, tuple[float, bytes]] = field(default_factory=dict)
+    stamp: Optional[tuple[int, int]] = None
+    # The snapshot's matrix came from the skills pack; per-path vectors are not loaded yet.
+    deferred: bool = False
+
+
+@dataclass(slots=True)
+class _EmbeddingGateStats:
+    """Running counters for the query-embedding cascade."""
+
+    queries: int = 0
+    computed: int = 0
+    cache_hits: int = 0
+    skipped: int = 0
+    embed_ms: float = 0.0
+    saved_ms: float = 0.0
+
+    def record(self, decision: str, elapsed_ms: float = 0.0) -> float:
+        """Count one query; return the embedder time it avoided (mean of computed calls)."""
+
+        self.queries += 1
+        if decision == "computed":
+            self.computed += 1
+            self.embed_ms += elapsed_ms
+            return 0.0
+        if decision == "cached":
+            self.cache_hits += 1
+        else:
+            self.skipped += 1
+        saved = self.embed_ms / self.computed if self.computed else 0.0
+        self.saved_ms += saved
+        return saved
+
+    def to_dict(self) -> dict[str, Any]:
+        queries = self.queries or 1
+        return {
+            "queries": self.queries,
+            "computed": self.computed,
+            "cache_hits": self.cache_hits,
+            "skipped": self.skipped,
+            "skip_rate": round(self.skipped / queries, 4),
+            "cache_hit_rate": round(self.cache_hits / queries, 4),
+            "saved_ms": round(self.saved_ms, 3),
+        }
+
+
+class _BodyCache:
+    """LRU of parsed skill bodies, bounded by the memory their text occupies."""
+
+    __slots__ = ("max_bytes", "bytes", "hits", "misses", "_entries", "_lock")
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max(0, max_bytes)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[Any, ...], tuple[PackedBody, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple[Any, ...]) -> Optional[PackedBody]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: tuple[Any, ...], body: PackedBody) -> bool:
+        """Insert ``body``; False when it alone exceeds the budget."""
+
+        cost = sys.getsizeof(body.text)
+        if cost > self.max_bytes:
+            return False
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            self._entries[key] = (body, cost)
+            self.bytes += cost
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+        return True
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
 class SkillManager:
     """Load Skill metadata, embeddings, and provide match operations."""
 
+    EMBEDDING_QUANTIZATIONS = EMBEDDING_QUANTIZATIONS
+
     def __init__(
         self,
         *,
@@ -102,7 +249,22 @@ class SkillManager:
         embedder: Callable[[Sequence[str]], Sequence[Sequence[float]]] | None = None,
         top_k: int = 3,
         threshold: float = 0.75,
+        pack_path: Path | None = None,
+        watch_interval_sec: float = 0.0,
+        embedding_skip_margin: float = 0.0,
+        query_cache_size: int = DEFAULT_QUERY_CACHE_SIZE,
+        embedding_model: str | None = None,
+        embedding_quantization: str = "none",
+        ann_path: Path | None = None,
+        ann_min_skills: int = DEFAULT_ANN_MIN_SKILLS,
+        ann_nprobe: int = DEFAULT_ANN_NPROBE,
+        token_counter: TokenCounter | None = None,
+        body_cache_bytes: int = DEFAULT_BODY_CACHE_BYTES,
+        preload_bodies: bool = False,
+        telemetry_policy: TelemetryPolicy | None = None,
     ) -> None:
+        if embedding_quantization not in EMBEDDING_QUANTIZATIONS:
+            raise ValueError(f"embedding_quantization must be one of {EMBEDDING_QUANTIZATIONS}")
         self._root = root
         raw_flags = feature_flags or {}
         self._feature_flags = {k: self._coerce_bool(v) for k, v in raw_flags.items()}
@@ -111,21 +273,51 @@ class SkillManager:
         self._embedder = embedder
         self._top_k = max(1, top_k)
         self._threshold = max(0.0, min(1.0, threshold))
+        self._embedding_skip_margin = max(0.0, embedding_skip_margin)
+        self._embedding_model = embedding_model
+        self._quantization = embedding_quantization
+        self._query_cache_size = max(0, query_cache_size)
+        self._ann_min_skills = max(0, ann_min_skills)
+        self._ann_nprobe = max(1, ann_nprobe)
+        # Resolved on first use: loading a tiktoken encoding is not free.
+        self._token_counter = token_counter
+        self._body_cache = _BodyCache(body_cache_bytes)
+        self._query_cache: OrderedDict[str, Sequence[float]] = OrderedDict()
+        self._gate_stats = _EmbeddingGateStats()
+        self._gate_lock = threading.Lock()
         self._cache_dir = cache_dir or (self._root / DEFAULT_CACHE_DIR)
         self._telemetry_dir = telemetry_dir or (self._root / DEFAULT_TELEMETRY_DIR)
         self._metadata_cache_path = self._cache_dir / DEFAULT_METADATA_CACHE
         self._embedding_cache_path = self._cache_dir / DEFAULT_EMBEDDING_CACHE
+        self._pack_path = pack_path or (self._cache_dir / DEFAULT_PACK_NAME)
+        self._ann_path = ann_path or (self._cache_dir / DEFAULT_ANN_NAME)
         self._telemetry_path = self._telemetry_dir / "events.jsonl"
+        # Shared with every other writer of the same file; acquired on first emit.
+        self._telemetry_policy = telemetry_policy
+        self._telemetry: Optional[TelemetrySink] = None
         self._telemetry_lock = threading.Lock()
 
-        self._metadata_by_path: dict[str, SkillMetadata] = {}
-        self._embeddings: dict[str, list[float]] = {}
-        self._bm25_index: dict[str, dict[str, float]] = {}
-        self._avg_doc_len = 0.0
+        self._snapshot = _CatalogSnapshot({}, [], BM25Index(), frozenset(), {})
+        self._vectors = _EmbeddingVectors()
+        self._pack: Optional[SkillsPack] = None
+        self._body_offsets: dict[str, tuple[int, int, int]] = {}
+        self._ann: Optional[IVFIndex] = None
+        self._ann_stamp: Optional[tuple[int, int]] = None
+        # rel_path -> ((size, mtime_ns), parsed metadata or None when the frontmatter is unusable)
+        self._parsed: dict[str, tuple[tuple[int, int], Optional[SkillMetadata]]] = {}
+        self._persisted: Optional[dict[str, SkillMetadata]] = None
+        self._refresh_lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._watcher_stop = threading.Event()
 
         if self._enabled:
-            self.refresh_metadata()
-            self._load_embeddings()
+            if not self._load_pack():
+                self.refresh_metadata()
+                self._load_embeddings()
+            if preload_bodies:
+                self.preload_bodies()
+            if watch_interval_sec > 0:
+                self.start_watcher(watch_interval_sec)
 
     # ------------------------------------------------------------------ #
     # Public API
@@ -138,112 +330,244 @@ class SkillManager:
     def exec_enabled(self) -> bool:
         return self._skills_exec_enabled
 
-    def refresh_metadata(self) -> None:
-        """Scan Skills directories and write the metadata cache."""
+    @property
+    def loaded_from_pack(self) -> bool:
+        return self._pack is not None
 
-        discovered = {meta.rel_path: meta for meta in self._discover_metadata()}
-        self._metadata_by_path = discovered
-        self._cache_dir.mkdir(parents=True, exist_ok=True)
-        serialized = {rel_path: meta.to_dict() for rel_path, meta in sorted(discovered.items())}
-        payload = {"generated_at": datetime.now(UTC).isoformat().replace("+00:00", "Z"), "skills": serialized}
-        self._metadata_cache_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
-        self._build_bm25_index()
+    def refresh_metadata(self) -> bool:
+        """Rescan Skills directories, re-parsing only files whose size or mtime changed.
+
+        Changed files are parsed in parallel, the BM25 index is patched rather
+        than rebuilt, and the result is published as one snapshot so concurrent
+        ``match`` calls keep serving the previous catalog until the swap. The
+        metadata cache is rewritten only when the catalog differs from it.
+        Returns True when the catalog changed.
+        """
+
+        with self._refresh_lock:
+            if self._persisted is None:
+                self._seed_parse_cache()
+            registry = self._load_registry()
+            stats: dict[str, tuple[Path, os.stat_result]] = {}
+            for skill_path in self._iter_skill_files():
+                rel_path = skill_path.relative_to(self._root).as_posix()
+                if rel_path not in registry:
+                    continue
+                try:
+                    stats[rel_path] = (skill_path, skill_path.stat())
+                except OSError:
+                    continue
+            stale = [
+                (rel_path, skill_path, stat)
+                for rel_path, (skill_path, stat) in stats.items()
+                if rel_path not in self._parsed or self._parsed[rel_path][0] != (stat.st_size, stat.st_mtime_ns)
+            ]
+            for (rel_path, _, stat), meta in zip(stale, self._parse_skills(stale)):
+                self._parsed[rel_path] = ((stat.st_size, stat.st_mtime_ns), meta)
+            for rel_path in self._parsed.keys() - stats.keys():
+                del self._parsed[rel_path]
+
+            previous = self._snapshot.metadata_by_path
+            # Keep surviving skills in their current order so index positions stay valid.
+            order = [rel_path for rel_path in previous if rel_path in stats]
+            order.extend(rel_path for rel_path in stats if rel_path not in previous)
+            metadata: dict[str, SkillMetadata] = {}
+            for rel_path in order:
+                meta = self._parsed[rel_path][1]
+                if meta is not None:
+                    metadata[rel_path] = self._apply_registry(meta, registry[rel_path])
+            if metadata != self._persisted or not self._metadata_cache_path.exists():
+                self._write_metadata_cache(metadata)
+            if metadata == previous:
+                return False
+            self._publish_snapshot(metadata, self._patched_index(previous, metadata))
+            self._pack = None
+            return True
+
+    def start_watcher(self, interval_sec: float = 2.0) -> None:
+        """Poll for added, edited, or removed skills in a daemon thread and publish them."""
+
+        if self._watcher is not None or not self._enabled:
+            return
+        self._watcher_stop.clear()
+        self._watcher = threading.Thread(
+            target=self._watch, args=(max(0.05, interval_sec),), name="skills-watcher", daemon=True
+        )
+        self._watcher.start()
+
+    def close(self) -> None:
+        """Stop the background watcher, if any, and release the telemetry sink."""
+
+        watcher, self._watcher = self._watcher, None
+        if watcher is not None:
+            self._watcher_stop.set()
+            watcher.join(timeout=5)
+        with self._telemetry_lock:
+            sink, self._telemetry = self._telemetry, None
+        if sink is not None:
+            sink.release()
+
+    def flush_telemetry(self, timeout: float = 5.0) -> bool:
+        """Wait until queued telemetry events are written; ``False`` on timeout."""
+
+        sink = self._telemetry
+        return sink.flush(timeout) if sink is not None else True
+
+    def embedding_stats(self) -> dict[str, Any]:
+        """Cumulative query-embedding counters: skip and cache-hit rates, embedder time saved."""
+
+        with self._gate_lock:
+            return self._gate_stats.to_dict()
+
+    def body_cache_stats(self) -> dict[str, Any]:
+        return self._body_cache.to_dict()
+
+    def preload_bodies(self, *, max_tokens: int = DEFAULT_BODY_TOKENS) -> int:
+        """Parse enabled skill bodies into the cache until it is full; return how many were cached."""
+
+        loaded = 0
+        for metadata in self._snapshot.enabled:
+            if self._body_cache.bytes >= self._body_cache.max_bytes:
+                break
+            try:
+                self._parsed_body(metadata, max_tokens)
+            except (OSError, UnicodeDecodeError):
+                continue
+            loaded += 1
+        return loaded
 
     def list_enabled(self) -> list[SkillMetadata]:
         if not self._enabled:
             return []
-        return [meta for meta in self._metadata_by_path.values() if meta.enabled]
+        return list(self._snapshot.enabled)
 
     def list_all(self) -> list[SkillMetadata]:
-        return list(self._metadata_by_path.values())
+        return list(self._snapshot.metadata_by_path.values())
 
     def match(self, query: str) -> list[SkillMatch]:
+        return self.match_many([query])[0]
+
+    def match_many(self, queries: Sequence[str]) -> list[list[SkillMatch]]:
+        """Match a batch of queries against one catalog snapshot.
+
+        Results equal calling ``match`` per query, but the queries that need an
+        embedding share one embedder call, similarities come from one
+        matrix-matrix product, and the ``skill_selected`` lines are written
+        together.
+        """
+
+        results: list[list[SkillMatch]] = [[] for _ in queries]
         if not self._enabled:
-            return []
-        trimmed = query.strip()
-        if not trimmed:
-            return []
-        candidates = self.list_enabled()
-        if not candidates:
-            return []
-        keyword_scores = self._score_keyword(trimmed, candidates)
-        embedding_scores = self._score_embeddings(trimmed, candidates)
-        results: list[SkillMatch] = []
-        for meta in candidates:
-            kw_score = keyword_scores.get(meta.rel_path, 0.0)
-            emb_score = embedding_scores.get(meta.rel_path)
-            if emb_score is not None:
-                blended = (emb_score * 0.7) + (kw_score * 0.3)
-            else:
-                blended = kw_score
-            if blended < self._threshold:
-                continue
-            results.append(
-                SkillMatch(
-                    metadata=meta,
-                    score=blended,
-                    threshold=self._threshold,
-                    keyword_score=kw_score,
-                    embedding_score=emb_score,
-                )
-            )
-        results.sort(key=lambda item: item.score, reverse=True)
-        final = results[: self._top_k]
-        self._emit_event(
-            "skill_selected",
-            {
-                "query_preview": trimmed[:160],
+            return results
+        snapshot = self._snapshot
+        if not snapshot.enabled:
+            return results
+        live = [(position, query.strip()) for position, query in enumerate(queries) if query.strip()]
+        if not live:
+            return results
+        texts = [text for _, text in live]
+        keyword = [self._score_keyword(text, snapshot) for text in texts]
+        embedding: list[dict[str, float]] = [{} for _ in texts]
+        gates: list[Optional[dict[str, Any]]] = [None] * len(texts)
+        if self._embedder:
+            vectors, gates = self._query_embeddings(texts, keyword)
+            embedding = self._score_embeddings(vectors, snapshot, keyword_hits=[scores.keys() for scores in keyword])
+        events: list[dict[str, Any]] = []
+        for (position, text), keyword_scores, embedding_scores, gate in zip(live, keyword, embedding, gates):
+            final = self._rank(snapshot, keyword_scores, embedding_scores)
+            results[position] = final
+            event: dict[str, Any] = {
+                "query_preview": text[:160],
                 "threshold": self._threshold,
                 "selected": [item.to_dict() | {"rank": idx + 1} for idx, item in enumerate(final)],
-                "available": len(candidates),
+                "available": len(snapshot.enabled),
                 "feature_flag": "skills_v1",
-            },
-        )
-        return final
-
-    def load_body(self, metadata: SkillMetadata, *, max_tokens: int = 5000) -> tuple[str, int, bool]:
-        raw = metadata.path.read_text(encoding="utf-8")
-        _, body = self._split_frontmatter(raw)
-        tokens = 0
-        truncated = False
-        collected: list[str] = []
-        for line in body.splitlines():
-            line_tokens = line.split()
-            if not line_tokens:
-                collected.append(line)
+            }
+            if gate is not None:
+                event["embedding"] = gate
+            events.append(event)
+        self._emit_events("skill_selected", events)
+        return results
+
+    def _rank(
+        self,
+        snapshot: _CatalogSnapshot,
+        keyword_scores: Mapping[str, float],
+        embedding_scores: Mapping[str, float],
+    ) -> list[SkillMatch]:
+        if self._threshold > 0:
+            # Unscored skills blend to 0.0 and can never clear a positive threshold.
+            pool: Iterable[str] = keyword_scores.keys() | embedding_scores.keys()
+        else:
+            pool = (meta.rel_path for meta in snapshot.enabled)
+        position = snapshot.position
+        blended_scores: list[tuple[float, int, str]] = []
+        for rel_path in pool:
+            rank = position.get(rel_path)
+            if rank is None:
                 continue
-            projected = tokens + len(line_tokens)
-            if projected <= max_tokens:
-                collected.append(line)
-                tokens = projected
+            emb_score = embedding_scores.get(rel_path)
+            kw_score = keyword_scores.get(rel_path, 0.0)
+            if emb_score is not None:
+                blended = (emb_score * _EMBEDDING_WEIGHT) + (kw_score * _KEYWORD_WEIGHT)
             else:
-                remaining = max_tokens - tokens
-                if remaining > 0:
-                    snippet = " ".join(line_tokens[:remaining])
-                    collected.append(snippet)
-                    tokens += remaining
-                truncated = True
-                break
-        if not collected:
-            payload = ""
-        else:
-            payload = "\n".join(collected).strip()
-        self._emit_event(
-            "skill_loaded",
-            {
-                "path": metadata.rel_path,
-                "tokens": tokens,
-                "truncated": truncated,
-                "allow_exec": metadata.allow_exec and self._skills_exec_enabled,
-            },
-        )
-        return payload, tokens, truncated
+                blended = kw_score
+            if blended >= self._threshold:
+                # Negative catalog rank breaks ties in catalog order, as a stable sort would.
+                blended_scores.append((blended, -rank, rel_path))
+        return [
+            SkillMatch(
+                metadata=snapshot.metadata_by_path[rel_path],
+                score=blended,
+                threshold=self._threshold,
+                keyword_score=keyword_scores.get(rel_path, 0.0),
+                embedding_score=embedding_scores.get(rel_path),
+            )
+            for blended, _, rel_path in heapq.nlargest(self._top_k, blended_scores)
+        ]
+
+    def load_body(self, metadata: SkillMetadata, *, max_tokens: int = DEFAULT_BODY_TOKENS) -> tuple[str, int, bool]:
+        """Read a skill body, keeping whole leading sections within ``max_tokens``."""
+
+        packed = self._parsed_body(metadata, max_tokens)
+        self._emit_event("skill_loaded", self._loaded_event(metadata, packed))
+        return packed.text, packed.tokens, packed.truncated
+
+    def prepare_payload(
+        self,
+        query: str,
+        *,
+        token_budget: int | None = None,
+        max_tokens: int = DEFAULT_BODY_TOKENS,
+    ) -> list[dict[str, Any]]:
+        """Matched skills with their bodies, each capped at ``max_tokens``.
+
+        With ``token_budget`` (the prompt tokens still available), bodies are
+        packed by score per token: whole bodies first, then one section-truncated
+        body, and skills that no longer fit are left out. A
+        ``skill_payload_packed`` event reports what the budget saved.
+        """
 
-    def prepare_payload(self, query: str) -> list[dict[str, Any]]:
         matches = self.match(query)
+        if not matches:
+            return []
+        if token_budget is None:
+            packed = [self._parsed_body(match.metadata, max_tokens) for match in matches]
+        else:
+            sources = [self._parsed_body(match.metadata) for match in matches]
+            packed = pack_bodies(
+                [(match.score, source.text) for match, source in zip(matches, sources)],
+                token_budget,
+                self._count_tokens(),
+                max_tokens=max_tokens,
+                totals=[source.tokens for source in sources],
+            )
         prepared: list[dict[str, Any]] = []
-        for idx, match in enumerate(matches, start=1):
-            body, tokens, truncated = self.load_body(match.metadata)
+        loaded: list[dict[str, Any]] = []
+        for idx, (match, body) in enumerate(zip(matches, packed), start=1):
+            if body.dropped:
+                continue
+            loaded.append(self._loaded_event(match.metadata, body))
             prepared.append(
                 {
                     "name": match.metadata.name,
@@ -252,43 +576,282 @@ class SkillManager:
                     "rank": idx,
                     "score": match.score,
                     "threshold": match.threshold,
-                    "body": body,
-                    "tokens": tokens,
-                    "truncated": truncated,
+                    "body": body.text,
+                    "tokens": body.tokens,
+                    "truncated": body.truncated,
                     "allow_exec": match.metadata.allow_exec and self._skills_exec_enabled,
                 }
             )
+        self._emit_events("skill_loaded", loaded)
+        if token_budget is not None:
+            pairs = list(zip(matches, packed))
+            self._emit_event(
+                "skill_payload_packed",
+                {
+                    "budget_tokens": token_budget,
+                    "tokens": sum(body.tokens for body in packed),
+                    "bytes": sum(body.bytes for body in packed),
+                    "tokens_saved": sum(body.tokens_saved for body in packed),
+                    "bytes_saved": sum(body.bytes_saved for body in packed),
+                    "truncated": [m.metadata.rel_path for m, body in pairs if body.truncated and not body.dropped],
+                    "dropped": [m.metadata.rel_path for m, body in pairs if body.dropped],
+                },
+            )
         return prepared
 
+    def build_pack(
+        self,
+        path: Path | None = None,
+        *,
+        embeddings: Mapping[str, Sequence[float]] | None = None,
+        model: str | None = None,
+    ) -> Path:
+        """Compile the current catalog, BM25 postings, and embeddings into a skills pack."""
+
+        if self._vectors.deferred:
+            self._load_embeddings()
+        if embeddings is None:
+            vectors = self._vectors
+            embeddings = {key: dequantize_int8(*codes) for key, codes in vectors.quantized.items()}
+            embeddings.update(vectors.floats)
+        snapshot = self._snapshot
+        index = snapshot.bm25_index
+        skills: list[dict[str, Any]] = []
+        for doc_index, rel_path in enumerate(index.doc_ids):
+            meta = snapshot.metadata_by_path[rel_path]
+            raw = meta.path.read_bytes()
+            _, body = self._split_frontmatter(raw.decode("utf-8"))
+            entry = meta.to_dict()
+            entry["doc_length"] = index.doc_lengths[doc_index]
+            entry["body_offset"] = len(raw) - len(body.encode("utf-8"))
+            skills.append(entry)
+        return write_pack(
+            path or self._pack_path,
+            root=self._root,
+            skills=skills,
+            postings=index.postings,
+            embeddings=embeddings,
+            model=model,
+            embedding_cache_stamp=self._cache_stamp(self._embedding_cache_path),
+        )
+
+    def build_ann(
+        self,
+        path: Path | None = None,
+        *,
+        nlist: int = 0,
+        iterations: int = DEFAULT_ANN_ITERATIONS,
+        model: str | None = None,
+    ) -> Path:
+        """Cluster the enabled skills' embeddings into an IVF index and persist it (NumPy required)."""
+
+        matrix = self._current_embedding_matrix(self._snapshot)
+        if not len(matrix):
+            raise ValueError("no skill embeddings to index; run embed_skills.py first")
+        index = IVFIndex.build(matrix, nlist=nlist, iterations=iterations, model=model or self._embedding_model)
+        return index.save(path or self._ann_path)
+
+    # ------------------------------------------------------------------ #
+    # Compiled pack
+    # ------------------------------------------------------------------ #
+    def _load_pack(self) -> bool:
+        """Adopt a fresh skills pack instead of scanning; False means scan as usual."""
+
+        pack = SkillsPack.open(self._pack_path)
+        if pack is None or not pack.is_fresh(self._root):
+            return False
+        metadata: dict[str, SkillMetadata] = {}
+        doc_lengths: list[int] = []
+        embedding_rows: dict[str, int] = {}
+        body_offsets: dict[str, tuple[int, int, int]] = {}
+        try:
+            for entry in pack.skills:
+                rel_path = str(entry["path"])
+                metadata[rel_path] = SkillMetadata(
+                    name=str(entry["name"]),
+                    description=str(entry["description"]),
+                    path=self._root / rel_path,
+                    rel_path=rel_path,
+                    frontmatter_hash=str(entry["frontmatter_hash"]),
+                    mtime=float(entry["mtime"]),
+                    enabled=bool(entry["enabled"]),
+                    allow_exec=bool(entry["allow_exec"]),
+                    registry_tags=tuple(str(tag) for tag in entry.get("tags") or ()),
+                )
+                doc_lengths.append(int(entry["doc_length"]))
+                body_offsets[rel_path] = (int(entry["body_offset"]), int(entry["size"]), int(entry["mtime_ns"]))
+                if entry.get("embedding_row") is not None and entry["enabled"]:
+                    embedding_rows[rel_path] = int(entry["embedding_row"])
+        except (KeyError, TypeError, ValueError):
+            return False
+        self._pack = pack
+        self._body_offsets = body_offsets
+        self._parsed = {
+            rel_path: ((size, mtime_ns), metadata[rel_path]) for rel_path, (_, size, mtime_ns) in body_offsets.items()
+        }
+        self._publish_snapshot(metadata, BM25Index.from_postings(list(metadata), doc_lengths, pack.postings()))
+        stamp = self._cache_stamp(self._embedding_cache_path)
+        if pack.embedding_cache_stamp == stamp:
+            self._vectors = _EmbeddingVectors(stamp=stamp, deferred=True)
+            self._snapshot = replace(
+                self._snapshot,
+                embedding_matrix=EmbeddingMatrix.from_normalized(embedding_rows, pack.matrix(), pack.dim),
+            )
+        else:
+            self._load_embeddings()
+        return True
+
+    def _count_tokens(self) -> TokenCounter:
+        if self._token_counter is None:
+            self._token_counter = default_token_counter()
+        return self._token_counter
+
+    def _loaded_event(self, metadata: SkillMetadata, packed: PackedBody) -> dict[str, Any]:
+        return {
+            "path": metadata.rel_path,
+            "tokens": packed.tokens,
+            "truncated": packed.truncated,
+            "allow_exec": metadata.allow_exec and self._skills_exec_enabled,
+            "bytes": packed.bytes,
+            "tokens_saved": packed.tokens_saved,
+            "bytes_saved": packed.bytes_saved,
+        }
+
+    def _parsed_body(self, metadata: SkillMetadata, max_tokens: Optional[int] = None) -> PackedBody:
+        """The stripped body (``max_tokens=None``) or its section-truncated form, via the LRU.
+
+        Entries are keyed on path, size, mtime and ``max_tokens``, so an edited
+        SKILL.md misses and its old entries age out.
+        """
+
+        try:
+            stat = metadata.path.stat()
+        except OSError:
+            stat = None
+        key = (metadata.rel_path, stat.st_size, stat.st_mtime_ns, max_tokens) if stat is not None else None
+        if key is not None:
+            cached = self._body_cache.get(key)
+            if cached is not None:
+                return cached
+        count = self._count_tokens()
+        if max_tokens is None:
+            source = self._read_body(metadata).strip()
+            tokens = count(source)
+            body = PackedBody(source, tokens, False, tokens, len(source.encode("utf-8")))
+        else:
+            full = self._parsed_body(metadata)
+            text, tokens, truncated = truncate_sections(full.text, max_tokens, count, total=full.tokens)
+            body = PackedBody(text, tokens, truncated, full.tokens, full.source_bytes)
+        if key is not None:
+            self._body_cache.put(key, body)
+        return body
+
+    def _read_body(self, metadata: SkillMetadata) -> str:
+        packed = self._body_offsets.get(metadata.rel_path)
+        if packed is not None:
+            offset, size, mtime_ns = packed
+            try:
+                with metadata.path.open("rb") as handle:
+                    stat = os.fstat(handle.fileno())
+                    if stat.st_size == size and stat.st_mtime_ns == mtime_ns:
+                        handle.seek(offset)
+                        return handle.read().decode("utf-8")
+            except (OSError, UnicodeDecodeError):
+                pass
+        _, body = self._split_frontmatter(metadata.path.read_text(encoding="utf-8"))
+        return body
+
     # ------------------------------------------------------------------ #
     # Discovery and indexing
     # ------------------------------------------------------------------ #
-    def _discover_metadata(self) -> Iterable[SkillMetadata]:
-        registry = self._load_registry()
-        for skill_path in self._iter_skill_files():
-            rel_path = skill_path.relative_to(self._root).as_posix()
-            if rel_path not in registry:
+    def _seed_parse_cache(self) -> None:
+        """Trust metadata cache entries whose recorded size and mtime still match."""
+
+        self._persisted = {}
+        try:
+            payload = json.loads(self._metadata_cache_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return
+        skills = payload.get("skills") if isinstance(payload, dict) else None
+        if not isinstance(skills, dict):
+            return
+        for rel_path, entry in skills.items():
+            try:
+                stamp = (int(entry["size"]), int(entry["mtime_ns"]))
+                meta = SkillMetadata(
+                    name=str(entry["name"]),
+                    description=str(entry["description"]),
+                    path=self._root / rel_path,
+                    rel_path=rel_path,
+                    frontmatter_hash=str(entry["frontmatter_hash"]),
+                    mtime=float(entry["mtime"]),
+                    enabled=bool(entry["enabled"]),
+                    allow_exec=bool(entry["allow_exec"]),
+                    registry_tags=tuple(str(tag) for tag in entry.get("tags") or ()),
+                )
+            except (KeyError, TypeError, ValueError):
                 continue
-            registry_entry = registry[rel_path]
+            self._parsed.setdefault(rel_path, (stamp, meta))
+            self._persisted[rel_path] = meta
+
+    def _write_metadata_cache(self, metadata: Mapping[str, SkillMetadata]) -> None:
+        serialized: dict[str, dict[str, Any]] = {}
+        for rel_path, meta in sorted(metadata.items()):
+            size, mtime_ns = self._parsed[rel_path][0]
+            serialized[rel_path] = meta.to_dict() | {"size": size, "mtime_ns": mtime_ns}
+        payload = {"generated_at": datetime.now(UTC).isoformat().replace("+00:00", "Z"), "skills": serialized}
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        self._metadata_cache_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+        self._persisted = dict(metadata)
+
+    def _parse_skills(self, pending: Sequence[tuple[str, Path, os.stat_result]]) -> list[Optional[SkillMetadata]]:
+        if len(pending) < 2:
+            return [self._parse_skill(*item) for item in pending]
+        # File reads release the GIL; threads overlap I/O with libyaml parsing.
+        with ThreadPoolExecutor(max_workers=min(PARSE_WORKERS, len(pending))) as pool:
+            return list(pool.map(lambda item: self._parse_skill(*item), pending))
+
+    def _parse_skill(self, rel_path: str, skill_path: Path, stat: os.stat_result) -> Optional[SkillMetadata]:
+        """Parse one SKILL.md; registry fields are applied by ``_apply_registry``."""
+
+        try:
             frontmatter, _ = self._read_skill(skill_path)
-            name = str(frontmatter.get("name", "")).strip()
-            description = str(frontmatter.get("description", "")).strip()
-            if not name or not description:
+        except (OSError, UnicodeDecodeError, yaml.YAMLError):
+            # Possibly mid-write; the next size/mtime change triggers a re-parse.
+            return None
+        name = str(frontmatter.get("name", "")).strip()
+        description = str(frontmatter.get("description", "")).strip()
+        if not name or not description:
+            return None
+        data = json.dumps(frontmatter, sort_keys=True, ensure_ascii=False, default=str)
+        return SkillMetadata(
+            name=name,
+            description=description,
+            path=skill_path,
+            rel_path=rel_path,
+            frontmatter_hash=sha256(data.encode("utf-8")).hexdigest(),
+            mtime=stat.st_mtime,
+            enabled=False,
+            allow_exec=False,
+        )
+
+    @staticmethod
+    def _apply_registry(meta: SkillMetadata, registry_entry: Mapping[str, Any]) -> SkillMetadata:
+        enabled = bool(registry_entry.get("enabled"))
+        allow_exec = bool(registry_entry.get("allow_exec"))
+        tags = tuple(str(tag) for tag in registry_entry.get("tags", []) if isinstance(tag, str))
+        if (meta.enabled, meta.allow_exec, meta.registry_tags) == (enabled, allow_exec, tags):
+            return meta
+        return replace(meta, enabled=enabled, allow_exec=allow_exec, registry_tags=tags)
+
+    def _watch(self, interval_sec: float) -> None:
+        while not self._watcher_stop.wait(interval_sec):
+            try:
+                if self.refresh_metadata():
+                    self._emit_event("skills_reloaded", {"skills": len(self._snapshot.metadata_by_path)})
+            except Exception:  # pylint: disable=broad-except
+                # Keep serving the last good snapshot; the next poll retries.
                 continue
-            data = json.dumps(frontmatter, sort_keys=True, ensure_ascii=False)
-            digest = sha256(data.encode("utf-8")).hexdigest()
-            meta = SkillMetadata(
-                name=name,
-                description=description,
-                path=skill_path,
-                rel_path=rel_path,
-                frontmatter_hash=digest,
-                mtime=skill_path.stat().st_mtime,
-                enabled=bool(registry_entry.get("enabled")),
-                allow_exec=bool(registry_entry.get("allow_exec")),
-                registry_tags=tuple(str(tag) for tag in registry_entry.get("tags", []) if isinstance(tag, str)),
-            )
-            yield meta
 
     def _iter_skill_files(self) -> Iterable[Path]:
         shared_root = self._root / SKILLS_DIR_NAME
@@ -335,7 +898,7 @@ class SkillManager:
     def _read_skill(self, path: Path) -> tuple[dict[str, Any], str]:
         raw = path.read_text(encoding="utf-8")
         frontmatter, body = self._split_frontmatter(raw)
-        data = yaml.safe_load(frontmatter) or {}
+        data = yaml.load(frontmatter, Loader=_YAML_LOADER) or {}
         if not isinstance(data, dict):
             data = {}
         return data, body
@@ -354,106 +917,335 @@ class SkillManager:
     # ------------------------------------------------------------------ #
     # Embedding handling
     # ------------------------------------------------------------------ #
-    def _load_embeddings(self) -> None:
-        if not self._embedding_cache_path.exists():
-            self._embeddings = {}
-            return
+    def _load_embeddings(self) -> EmbeddingMatrix:
+        """Reload the embedding cache and publish its vectors and matrix together.
+
+        The cache is read into fresh mappings and the matrix for the enabled
+        skills is built from them before ``_vectors`` and the snapshot are
+        swapped under the refresh lock, so ``match`` never sees a partial load.
+        """
+
+        vectors = self._read_embeddings()
+        with self._refresh_lock:
+            snapshot = self._snapshot
+            matrix = self._build_embedding_matrix((meta.rel_path for meta in snapshot.enabled), vectors)
+            self._vectors = vectors
+            self._snapshot = replace(snapshot, embedding_matrix=matrix, ann_index=None)
+        return matrix
+
+    def _read_embeddings(self) -> _EmbeddingVectors:
+        """Float and/or int8 vectors from the embedding cache.
+
+        Float vectors are kept as ``array('f')`` rather than lists of Python
+        floats. A cache produced by a different ``embedding_model`` is ignored.
+        """
+
+        stamp = self._cache_stamp(self._embedding_cache_path)
+        if stamp is None:
+            return _EmbeddingVectors()
         try:
             payload = json.loads(self._embedding_cache_path.read_text(encoding="utf-8"))
-        except json.JSONDecodeError:
-            self._embeddings = {}
-            return
+        except (OSError, json.JSONDecodeError):
+            return _EmbeddingVectors(stamp=stamp)
+        if not isinstance(payload, dict):
+            return _EmbeddingVectors(stamp=stamp)
+        cache_model = payload.get("model")
+        if self._embedding_model and cache_model and cache_model != self._embedding_model:
+            self._emit_event(
+                "skill_embedding_fallback",
+                {"reason": "model_mismatch", "cache_model": cache_model, "model": self._embedding_model},
+            )
+            return _EmbeddingVectors(stamp=stamp)
+        floats: dict[str, Sequence[float]] = {}
+        codes: dict[str, tuple[float, bytes]] = {}
         vectors = payload.get("embeddings")
-        if not isinstance(vectors, dict):
-            self._embeddings = {}
-            return
-        result: dict[str, list[float]] = {}
-        for rel_path, vector in vectors.items():
-            if not isinstance(vector, list):
-                continue
+        if isinstance(vectors, dict):
+            for rel_path, vector in vectors.items():
+                if not isinstance(vector, list):
+                    continue
+                try:
+                    floats[rel_path] = array("f", (float(item) for item in vector))
+                except (TypeError, ValueError):
+                    continue
+        quantized = payload.get("embeddings_int8")
+        if isinstance(quantized, dict):
+            for rel_path, entry in quantized.items():
+                try:
+                    codes[rel_path] = (float(entry["scale"]), base64.b64decode(entry["codes"]))
+                except (KeyError, TypeError, ValueError, binascii.Error):
+                    continue
+        return _EmbeddingVectors(floats=floats, quantized=codes, stamp=stamp)
+
+    @staticmethod
+    def _cache_stamp(path: Path) -> Optional[tuple[int, int]]:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _current_embedding_matrix(self, snapshot: _CatalogSnapshot) -> EmbeddingMatrix:
+        """Return the matrix for enabled skills, rebuilding after metadata or cache changes."""
+
+        vectors = self._vectors
+        if self._cache_stamp(self._embedding_cache_path) != vectors.stamp or (
+            snapshot.embedding_matrix is None and vectors.deferred
+        ):
+            # Pack-backed matrices carry no per-path vectors; reload them to rebuild.
+            return self._load_embeddings()
+        matrix = snapshot.embedding_matrix
+        if matrix is None:
+            # ``vectors`` is a complete load, so caching its matrix on the snapshot is safe.
+            matrix = self._build_embedding_matrix((meta.rel_path for meta in snapshot.enabled), vectors)
+            snapshot.embedding_matrix = matrix
+        return matrix
+
+    def _build_embedding_matrix(self, keys: Iterable[str], vectors: _EmbeddingVectors) -> EmbeddingMatrix:
+        floats, codes = vectors.floats, vectors.quantized
+        if self._quantization == "int8":
+            return QuantizedEmbeddingMatrix(
+                {
+                    key: codes[key] if key in codes else quantize_int8(floats[key])
+                    for key in keys
+                    if key in codes or key in floats
+                }
+            )
+        return EmbeddingMatrix(
+            {
+                key: floats[key] if key in floats else dequantize_int8(*codes[key])
+                for key in keys
+                if key in floats or key in codes
+            }
+        )
+
+    def _embedding_skip_reason(self, keyword_scores: Mapping[str, float]) -> Optional[str]:
+        """Why the query embedding can be skipped, or ``None`` when it is needed.
+
+        ``unreachable``: even a perfect embedding score gives at most
+        0.7 + 0.3 x the best keyword score, which is below ``threshold``, so the
+        result is empty either way. ``decisive``: the best keyword score leads
+        the runner-up by ``embedding_skip_margin`` (opt-in; keyword-only blend).
+        """
+
+        best = max(keyword_scores.values(), default=0.0)
+        if _EMBEDDING_WEIGHT + _KEYWORD_WEIGHT * best < self._threshold:
+            return "unreachable"
+        if self._embedding_skip_margin > 0 and keyword_scores:
+            top = heapq.nlargest(2, keyword_scores.values())
+            runner_up = top[1] if len(top) > 1 else 0.0
+            if top[0] - runner_up >= self._embedding_skip_margin:
+                return "decisive"
+        return None
+
+    def _query_embeddings(
+        self, queries: Sequence[str], keyword_scores: Sequence[Mapping[str, float]]
+    ) -> tuple[list[Optional[Sequence[float]]], list[dict[str, Any]]]:
+        """Embed the queries the cascade keeps, in one embedder call.
+
+        Vectors are LRU-cached on whitespace-normalized text; repeats within the
+        batch are embedded once and reported as ``cached``.
+        """
+
+        vectors: list[Optional[Sequence[float]]] = [None] * len(queries)
+        decisions: list[str] = []
+        pending: dict[str, list[int]] = {}
+        cache_keys = [" ".join(query.split()) for query in queries]
+        with self._gate_lock:
+            for slot, (cache_key, scores) in enumerate(zip(cache_keys, keyword_scores)):
+                reason = self._embedding_skip_reason(scores)
+                if reason is not None:
+                    decisions.append(f"skipped_{reason}")
+                    continue
+                cached = self._query_cache.get(cache_key)
+                if cached is not None:
+                    self._query_cache.move_to_end(cache_key)
+                    vectors[slot] = cached
+                    decisions.append("cached")
+                elif cache_key in pending:
+                    pending[cache_key].append(slot)
+                    decisions.append("cached")
+                else:
+                    pending[cache_key] = [slot]
+                    decisions.append("computed")
+        elapsed_ms = 0.0
+        computed: dict[str, Sequence[float]] = {}
+        if pending and self._embedder:
+            started = time.perf_counter()
             try:
-                normalized = [float(item) for item in vector]
-            except (TypeError, ValueError):
-                continue
-            result[rel_path] = normalized
-        self._embeddings = result
+                batch = self._embedder([queries[slots[0]] for slots in pending.values()])
+            except Exception:  # pylint: disable=broad-except
+                self._emit_event("skill_embedding_fallback", {"reason": "embedder_error"})
+                batch = []
+            elapsed_ms = (time.perf_counter() - started) * 1000 / len(pending)
+            for (cache_key, slots), vector in zip(pending.items(), batch):
+                if vector is None or len(vector) == 0:
+                    continue
+                computed[cache_key] = vector
+                for slot in slots:
+                    vectors[slot] = vector
+        gates: list[dict[str, Any]] = []
+        with self._gate_lock:
+            if self._query_cache_size:
+                for cache_key, vector in computed.items():
+                    self._query_cache[cache_key] = vector
+                while len(self._query_cache) > self._query_cache_size:
+                    self._query_cache.popitem(last=False)
+            for decision in decisions:
+                latency_ms = elapsed_ms if decision == "computed" else 0.0
+                saved_ms = self._gate_stats.record(decision, latency_ms)
+                gates.append(
+                    {
+                        "decision": decision,
+                        "latency_ms": round(latency_ms, 3),
+                        "saved_ms": round(saved_ms, 3),
+                        "skip_rate": round(self._gate_stats.skipped / self._gate_stats.queries, 4),
+                    }
+                )
+        return vectors, gates
 
-    def _score_embeddings(self, query: str, candidates: Sequence[SkillMetadata]) -> dict[str, float]:
-        if not self._embedder:
-            return {}
+    def _score_embeddings(
+        self,
+        query_vectors: Sequence[Optional[Sequence[float]]],
+        snapshot: _CatalogSnapshot,
+        *,
+        keyword_hits: Sequence[Iterable[str]],
+    ) -> list[dict[str, float]]:
+        """Score each query's embedding top-k plus its keyword hits.
+
+        A skill outside both sets blends to at most 0.7 x its embedding score,
+        which cannot beat ``top_k`` skills with higher embedding scores, so the
+        final ranking is unchanged. With a zero threshold every skill is scored.
+        """
+
+        results: list[dict[str, float]] = [{} for _ in query_vectors]
+        wanted = [slot for slot, vector in enumerate(query_vectors) if vector is not None]
+        if not wanted:
+            return results
+        matrix = self._current_embedding_matrix(snapshot)
+        if not len(matrix):
+            return results
+        ann = self._current_ann(snapshot, matrix)
+        columns: list = []
         try:
-            query_vector = self._embedder([query])[0]
-        except Exception:  # pylint: disable=broad-except
-            self._emit_event("skill_embedding_fallback", {"reason": "embedder_error"})
-            return {}
-        if not isinstance(query_vector, Sequence) or not query_vector:
-            return {}
-        scores: dict[str, float] = {}
-        for meta in candidates:
-            vector = self._embeddings.get(meta.rel_path)
-            if not vector:
-                continue
-            score = self._cosine_similarity(query_vector, vector)
-            normalized = (score + 1.0) / 2.0
-            scores[meta.rel_path] = max(0.0, min(1.0, normalized))
-        return scores
+            if ann is None:
+                columns = matrix.similarities_many([query_vectors[slot] for slot in wanted])
+        except ValueError:
+            self._emit_event("skill_embedding_fallback", {"reason": "dimension_mismatch"})
+            return results
+        quantized = isinstance(matrix, QuantizedEmbeddingMatrix)
+        depth = self._top_k * _RERANK_FACTOR if quantized else self._top_k
+        for position, slot in enumerate(wanted):
+            hits = [matrix.index[rel_path] for rel_path in keyword_hits[slot] if rel_path in matrix.index]
+            if ann is not None:
+                try:
+                    selected = ann.search(matrix, query_vectors[slot], depth, nprobe=self._ann_nprobe, include=hits)
+                except ValueError:
+                    self._emit_event("skill_embedding_fallback", {"reason": "dimension_mismatch"})
+                    return results
+            elif self._threshold <= 0:
+                selected = matrix.select(columns[position], range(len(matrix)))
+            else:
+                similarities = columns[position]
+                indices = set(matrix.top_indices(similarities, depth))
+                indices.update(hits)
+                selected = matrix.select(similarities, indices)
+            if quantized and self._vectors.floats:
+                selected.update(self._rerank_full_precision(query_vectors[slot], selected))
+            results[slot] = selected
+        return results
 
-    @staticmethod
-    def _cosine_similarity(lhs: Sequence[float], rhs: Sequence[float]) -> float:
-        length = min(len(lhs), len(rhs))
-        if length == 0:
-            return 0.0
-        dot = sum(lhs[i] * rhs[i] for i in range(length))
-        norm_l = math.sqrt(sum(lhs[i] * lhs[i] for i in range(length)))
-        norm_r = math.sqrt(sum(rhs[i] * rhs[i] for i in range(length)))
-        if norm_l == 0.0 or norm_r == 0.0:
-            return 0.0
-        return dot / (norm_l * norm_r)
+    def _current_ann(self, snapshot: _CatalogSnapshot, matrix: EmbeddingMatrix) -> Optional[IVFIndex]:
+        """The persisted IVF index bound to ``matrix``, or ``None`` to search exactly.
+
+        Exact search is kept for small catalogs (``ann_min_skills``), a zero
+        threshold (every skill is scored anyway), no NumPy, and an index built
+        for another model or dimension.
+        """
+
+        if self._threshold <= 0 or len(matrix) < self._ann_min_skills or not matrix.uses_numpy:
+            return None
+        stamp = self._cache_stamp(self._ann_path)
+        if stamp != self._ann_stamp:
+            self._ann_stamp = stamp
+            self._ann = IVFIndex.load(self._ann_path) if stamp is not None else None
+            snapshot.ann_index = None
+            if self._ann is not None and self._embedding_model and self._ann.model not in (None, self._embedding_model):
+                self._emit_event(
+                    "skill_ann_fallback",
+                    {"reason": "model_mismatch", "index_model": self._ann.model, "model": self._embedding_model},
+                )
+                self._ann = None
+        source = self._ann
+        if source is None or source.dim != matrix.dim:
+            return None
+        bound = snapshot.ann_index
+        if bound is None or bound.keys is not matrix.keys:
+            bound = source.bind(matrix)
+            snapshot.ann_index = bound
+        return bound
+
+    def _rerank_full_precision(self, query_vector: Sequence[float], selected: Iterable[str]) -> dict[str, float]:
+        """Exact scores for int8 candidates that also have float vectors in the cache."""
+
+        floats = self._vectors.floats
+        exact = EmbeddingMatrix({key: floats[key] for key in selected if key in floats})
+        if not len(exact) or exact.dim != len(query_vector):
+            return {}
+        return exact.select(exact.similarities(query_vector), range(len(exact)))
 
     # ------------------------------------------------------------------ #
     # Keyword scoring (BM25-style)
     # ------------------------------------------------------------------ #
-    def _build_bm25_index(self) -> None:
-        dok: dict[str, dict[str, float]] = {}
-        doc_lengths: dict[str, int] = {}
-        for rel_path, meta in self._metadata_by_path.items():
-            tokens = _tokenize(meta.description)
-            doc_lengths[rel_path] = len(tokens)
-            counts: dict[str, int] = {}
-            for token in tokens:
-                counts[token] = counts.get(token, 0) + 1
-            dok[rel_path] = {token: float(count) for token, count in counts.items()}
-        self._bm25_index = dok
-        if doc_lengths:
-            self._avg_doc_len = sum(doc_lengths.values()) / len(doc_lengths)
-        else:
-            self._avg_doc_len = 0.0
+    def _publish_snapshot(self, metadata: dict[str, SkillMetadata], index: BM25Index | None = None) -> None:
+        """Derive match state for ``metadata`` and swap it in with one assignment."""
+
+        if index is None:
+            index = BM25Index({rel_path: _tokenize(meta.description) for rel_path, meta in metadata.items()})
+        enabled = [meta for meta in metadata.values() if meta.enabled]
+        snapshot = _CatalogSnapshot(
+            metadata_by_path=metadata,
+            enabled=enabled,
+            bm25_index=index,
+            bm25_enabled_ids=frozenset(
+                doc_index for doc_index, rel_path in enumerate(index.doc_ids) if metadata[rel_path].enabled
+            ),
+            position={meta.rel_path: rank for rank, meta in enumerate(enabled)},
+        )
+        matrix = self._snapshot.embedding_matrix
+        if matrix is not None:
+            added = (meta.rel_path for meta in enabled if meta.rel_path not in matrix.index)
+            # New rows need float vectors; pack-backed or int8-only sources rebuild lazily instead.
+            floats = self._vectors.floats
+            if all(rel_path in floats for rel_path in added):
+                snapshot.embedding_matrix = matrix.reindexed((meta.rel_path for meta in enabled), floats)
+        self._snapshot = snapshot
+
+    def _patched_index(
+        self, previous: Mapping[str, SkillMetadata], metadata: Mapping[str, SkillMetadata]
+    ) -> Optional[BM25Index]:
+        """Patch the current BM25 index for added or edited skills; ``None`` means rebuild."""
+
+        index = self._snapshot.bm25_index
+        if not len(index) or previous.keys() - metadata.keys():
+            return None
+        changed = {
+            rel_path: _tokenize(meta.description)
+            for rel_path, meta in metadata.items()
+            if rel_path not in previous or previous[rel_path].description != meta.description
+        }
+        if not changed:
+            return index
+        replaced = {rel_path: _tokenize(previous[rel_path].description) for rel_path in changed if rel_path in previous}
+        return index.updated(changed, replaced)
 
-    def _score_keyword(self, query: str, candidates: Sequence[SkillMetadata]) -> dict[str, float]:
+    def _score_keyword(self, query: str, snapshot: _CatalogSnapshot) -> dict[str, float]:
         query_tokens = _tokenize(query)
-        if not self._bm25_index or not query_tokens:
+        index = snapshot.bm25_index
+        if not len(index) or not query_tokens:
             return {}
-        doc_count = len(self._bm25_index)
-        token_document_frequency: dict[str, int] = {}
-        for index in self._bm25_index.values():
-            for token in index.keys():
-                token_document_frequency[token] = token_document_frequency.get(token, 0) + 1
-        scores: dict[str, float] = {}
-        for meta in candidates:
-            tf = self._bm25_index.get(meta.rel_path, {})
-            doc_len = sum(tf.values())
-            score = 0.0
-            for token in query_tokens:
-                df = token_document_frequency.get(token, 0)
-                if df == 0:
-                    continue
-                idf = math.log((doc_count - df + 0.5) / (df + 0.5) + 1)
-                term_freq = tf.get(token, 0.0)
-                k1 = 1.5
-                b = 0.75
-                denom = term_freq + k1 * (1 - b + b * (doc_len / (self._avg_doc_len or 1.0)))
-                score += idf * ((term_freq * (k1 + 1)) / (denom or 1.0))
-            scores[meta.rel_path] = score
+        raw = index.score(query_tokens, allowed=snapshot.bm25_enabled_ids)
+        doc_ids = index.doc_ids
+        scores = {doc_ids[doc_index]: score for doc_index, score in raw.items()}
         max_score = max(scores.values(), default=0.0)
         if max_score > 0:
             scores = {path: min(1.0, score / max_score) for path, score in scores.items()}
@@ -463,17 +1255,18 @@ class SkillManager:
     # Telemetry
     # ------------------------------------------------------------------ #
     def _emit_event(self, event: str, data: Mapping[str, Any]) -> None:
-        payload = {
-            "ts": datetime.now(UTC).isoformat().replace("+00:00", "Z"),
-            "event": event,
-            "data": mask_sensitive(dict(data)),
-        }
-        serialized = json.dumps(payload, ensure_ascii=False)
-        self._telemetry_dir.mkdir(parents=True, exist_ok=True)
-        with self._telemetry_lock:
-            with self._telemetry_path.open("a", encoding="utf-8") as handle:
-                handle.write(serialized)
-                handle.write("\n")
+        self._emit_events(event, [data])
+
+    def _emit_events(self, event: str, batch: Sequence[Mapping[str, Any]]) -> None:
+        if not batch:
+            return
+        sink = self._telemetry
+        if sink is None:
+            with self._telemetry_lock:
+                if self._telemetry is None:
+                    self._telemetry = TelemetrySink.acquire(self._telemetry_path, policy=self._telemetry_policy)
+                sink = self._telemetry
+        sink.emit_many(event, batch)
 
     # ------------------------------------------------------------------ #
     # Flag helpers
@@ -0,0 +1,267 @@
+"""Compiled skills pack: one memory-mappable file for instant cold start.
+
+Layout (all offsets absolute, sections 64-byte aligned, native byte order
+recorded in the header)::
+
+    header    magic, version, byte order, section offsets/lengths, rows, dim
+    metadata  UTF-8 JSON: skill table, BM25 term directory, validation hashes
+    postings  uint32 (doc, term frequency) pairs, grouped by term
+    matrix    float32 row-normalized embeddings, ``rows x dim``
+
+The pack is written by ``embed_skills.py``. ``SkillManager`` maps it
+read-only and validates it against ``skills/registry.json`` and each
+SKILL.md before trusting it; a stale or unreadable pack means a normal scan.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+from hashlib import sha256
+from pathlib import Path
+from typing import Any, Iterator, Optional, Sequence
+
+PACK_MAGIC = b"MAGSKPK\x00"
+PACK_VERSION = 1
+DEFAULT_PACK_NAME = "skills.pack"
+
+_HEADER = struct.Struct("<8sIIQQQQQQII")
+_ALIGN = 64
+_BYTE_ORDERS = {"little": 0, "big": 1}
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def file_sha256(path: Path) -> str:
+    digest = sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def registry_sha256(root: Path) -> Optional[str]:
+    registry_path = root / "skills" / "registry.json"
+    try:
+        return sha256(registry_path.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def write_pack(
+    path: Path,
+    *,
+    root: Path,
+    skills: Sequence[Mapping[str, Any]],
+    postings: Mapping[str, Sequence[tuple[int, int]]],
+    embeddings: Mapping[str, Sequence[float]] | None = None,
+    model: str | None = None,
+    embedding_cache_stamp: tuple[int, int] | None = None,
+) -> Path:
+    """Write a pack atomically.
+
+    ``skills`` are ``SkillMetadata.to_dict()`` payloads in BM25 document order
+    plus ``body_offset``; ``postings`` maps each term to ``(doc, tf)`` pairs.
+    Embedding rows are normalized before they are stored.
+    """
+
+    entries: list[dict[str, Any]] = []
+    rows = array("f")
+    dim = 0
+    for skill in skills:
+        rel_path = str(skill["path"])
+        skill_path = root / rel_path
+        stat = skill_path.stat()
+        entry = dict(skill)
+        entry["size"] = stat.st_size
+        entry["mtime_ns"] = stat.st_mtime_ns
+        entry["file_sha256"] = file_sha256(skill_path)
+        entry["embedding_row"] = None
+        vector = (embeddings or {}).get(rel_path)
+        if vector is not None and len(vector) > 0 and (not dim or len(vector) == dim):
+            dim = dim or len(vector)
+            norm = math.sqrt(sum(float(value) * float(value) for value in vector)) or 1.0
+            entry["embedding_row"] = len(rows) // dim
+            rows.extend(float(value) / norm for value in vector)
+        entries.append(entry)
+
+    flat = array("I")
+    directory: dict[str, list[int]] = {}
+    for term, pairs in postings.items():
+        directory[term] = [len(flat), len(pairs)]
+        for doc_index, term_freq in pairs:
+            flat.append(doc_index)
+            flat.append(term_freq)
+
+    meta = {
+        "registry_sha256": registry_sha256(root),
+        "model": model,
+        "embedding_cache_stamp": list(embedding_cache_stamp) if embedding_cache_stamp else None,
+        "skills": entries,
+        "terms": directory,
+    }
+    meta_bytes = json.dumps(meta, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    meta_offset = _align(_HEADER.size)
+    postings_offset = _align(meta_offset + len(meta_bytes))
+    postings_bytes = flat.tobytes()
+    matrix_offset = _align(postings_offset + len(postings_bytes))
+    matrix_bytes = rows.tobytes()
+    row_count = len(rows) // dim if dim else 0
+    header = _HEADER.pack(
+        PACK_MAGIC,
+        PACK_VERSION,
+        _BYTE_ORDERS[sys.byteorder],
+        meta_offset,
+        len(meta_bytes),
+        postings_offset,
+        len(postings_bytes),
+        matrix_offset,
+        len(matrix_bytes),
+        row_count,
+        dim,
+    )
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with tmp_path.open("wb") as handle:
+        for offset, blob in (
+            (0, header),
+            (meta_offset, meta_bytes),
+            (postings_offset, postings_bytes),
+            (matrix_offset, matrix_bytes),
+        ):
+            handle.write(b"\x00" * (offset - handle.tell()))
+            handle.write(blob)
+    os.replace(tmp_path, path)
+    return path
+
+
+class PackedPostings(Mapping):
+    """Read-only ``term -> [(doc, tf), ...]`` view over the mapped postings."""
+
+    __slots__ = ("_directory", "_pairs")
+
+    def __init__(self, directory: dict[str, list[int]], pairs: memoryview) -> None:
+        self._directory = directory
+        self._pairs = pairs
+
+    def __getitem__(self, term: str) -> list[tuple[int, int]]:
+        start, count = self._directory[term]
+        end = start + 2 * count
+        pairs = self._pairs
+        return list(zip(pairs[start:end:2], pairs[start + 1 : end : 2]))
+
+    def __contains__(self, term: object) -> bool:
+        return term in self._directory
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._directory)
+
+    def __len__(self) -> int:
+        return len(self._directory)
+
+    def document_frequency(self, term: str) -> int:
+        return self._directory[term][1]
+
+
+class SkillsPack:
+    """A mapped pack file; use :meth:`open` and check :meth:`is_fresh`."""
+
+    __slots__ = (
+        "path",
+        "skills",
+        "model",
+        "embedding_cache_stamp",
+        "rows",
+        "dim",
+        "_meta",
+        "_mmap",
+        "_view",
+        "_postings_span",
+        "_matrix_span",
+    )
+
+    def __init__(self, path: Path, buffer: mmap.mmap, header: tuple[Any, ...], meta: dict[str, Any]) -> None:
+        self.path = path
+        self._mmap = buffer
+        self._view = memoryview(buffer)
+        self._meta = meta
+        self.skills: list[dict[str, Any]] = meta.get("skills") or []
+        self.model: Optional[str] = meta.get("model")
+        stamp = meta.get("embedding_cache_stamp")
+        self.embedding_cache_stamp = tuple(stamp) if stamp else None
+        postings_offset, postings_length, matrix_offset, matrix_length, self.rows, self.dim = header[5:]
+        self._postings_span = (postings_offset, postings_offset + postings_length)
+        self._matrix_span = (matrix_offset, matrix_offset + matrix_length)
+
+    @classmethod
+    def open(cls, path: Path) -> Optional["SkillsPack"]:
+        """Map ``path``; ``None`` if it is missing, foreign, or corrupt."""
+
+        try:
+            with path.open("rb") as handle:
+                buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        try:
+            header = _HEADER.unpack_from(buffer, 0)
+            magic, version, byte_order, meta_offset, meta_length = header[:5]
+            if magic != PACK_MAGIC or version != PACK_VERSION or byte_order != _BYTE_ORDERS[sys.byteorder]:
+                raise ValueError("incompatible skills pack")
+            if header[7] + header[8] > len(buffer):
+                raise ValueError("truncated skills pack")
+            meta = json.loads(buffer[meta_offset : meta_offset + meta_length].decode("utf-8"))
+            if not isinstance(meta, dict):
+                raise ValueError("invalid skills pack metadata")
+        except (struct.error, ValueError, UnicodeDecodeError):
+            buffer.close()
+            return None
+        return cls(path, buffer, header, meta)
+
+    def is_fresh(self, root: Path) -> bool:
+        """True when the registry and every packed SKILL.md are unchanged."""
+
+        if self._meta.get("registry_sha256") != registry_sha256(root):
+            return False
+        for entry in self.skills:
+            skill_path = root / str(entry.get("path"))
+            try:
+                stat = skill_path.stat()
+            except OSError:
+                return False
+            if stat.st_size == entry.get("size") and stat.st_mtime_ns == entry.get("mtime_ns"):
+                continue
+            # Touched but possibly identical (e.g. fresh checkout): compare content.
+            if stat.st_size != entry.get("size") or file_sha256(skill_path) != entry.get("file_sha256"):
+                return False
+        return True
+
+    def postings(self) -> PackedPostings:
+        start, end = self._postings_span
+        return PackedPostings(self._meta.get("terms") or {}, self._view[start:end].cast("I"))
+
+    def matrix(self) -> memoryview:
+        """Flat float32 view of the normalized embedding rows (zero-copy)."""
+
+        start, end = self._matrix_span
+        return self._view[start:end].cast("f")
+
+
+__all__ = [
+    "DEFAULT_PACK_NAME",
+    "PACK_MAGIC",
+    "PACK_VERSION",
+    "PackedPostings",
+    "SkillsPack",
+    "file_sha256",
+    "registry_sha256",
+    "write_pack",
+]
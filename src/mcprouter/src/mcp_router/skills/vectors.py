@@ -0,0 +1,347 @@
+"""Contiguous, pre-normalized embedding matrices (float32 or int8) for skill scoring."""
+
+from __future__ import annotations
+
+import math
+from array import array
+from operator import mul
+from typing import Iterable, Mapping, Optional, Sequence
+
+try:  # NumPy is optional; the array-based fallback keeps the same interface.
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised via monkeypatch in tests
+    np = None  # type: ignore[assignment]
+
+
+# Rows widened to float32 per step in int8 scoring; small enough to stay in cache.
+_BLOCK_ROWS = 128
+
+
+def _unit(vector: Sequence[float]) -> list[float]:
+    norm = math.sqrt(sum(value * value for value in vector))
+    if norm == 0.0:
+        return [0.0] * len(vector)
+    return [value / norm for value in vector]
+
+
+def quantize_int8(vector: Sequence[float]) -> tuple[float, bytes]:
+    """Unit-normalize ``vector`` and encode it as int8 codes with one per-vector scale.
+
+    ``codes[i] * scale`` approximates the i-th component of the unit vector;
+    the scale maps the largest magnitude to 127.
+    """
+
+    unit = _unit([float(value) for value in vector])
+    peak = max((abs(value) for value in unit), default=0.0)
+    scale = peak / 127.0 if peak else 1.0
+    codes = array("b", (max(-127, min(127, round(value / scale))) for value in unit))
+    return scale, codes.tobytes()
+
+
+def dequantize_int8(scale: float, codes: bytes) -> array:
+    return array("f", (code * scale for code in array("b", codes)))
+
+
+class EmbeddingMatrix:
+    """Row-normalized float32 matrix; cosine similarity is one mat-vec product.
+
+    Rows whose dimension differs from the first vector are skipped. With NumPy
+    the rows live in a single ``(n, dim)`` array; otherwise in one flat
+    ``array('f')`` buffer.
+    """
+
+    __slots__ = ("keys", "index", "dim", "_rows", "_flat")
+
+    def __init__(self, vectors: Mapping[str, Sequence[float]]) -> None:
+        self.keys: list[str] = []
+        self.index: dict[str, int] = {}
+        self.dim = 0
+        self._rows = None
+        self._flat: Optional[array] = None
+        kept: list[Sequence[float]] = []
+        for key, vector in vectors.items():
+            if len(vector) == 0:
+                continue
+            if not self.dim:
+                self.dim = len(vector)
+            if len(vector) != self.dim:
+                continue
+            self.index[key] = len(self.keys)
+            self.keys.append(key)
+            kept.append(vector)
+        if not kept:
+            return
+        if np is not None:
+            rows = np.asarray(kept, dtype=np.float32)
+            norms = np.linalg.norm(rows, axis=1, keepdims=True)
+            norms[norms == 0.0] = 1.0
+            self._rows = np.ascontiguousarray(rows / norms, dtype=np.float32)
+        else:
+            flat = array("f")
+            for vector in kept:
+                flat.extend(_unit(vector))
+            self._flat = flat
+
+    @classmethod
+    def from_normalized(cls, rows: Mapping[str, int], buffer, dim: int) -> "EmbeddingMatrix":
+        """Wrap already-normalized float32 rows; ``rows`` maps key to row number in ``buffer``.
+
+        When every row is selected in order, the NumPy matrix is a zero-copy
+        view of ``buffer`` (for example a memory-mapped skills pack).
+        """
+
+        matrix = cls({})
+        if not rows or dim <= 0:
+            return matrix
+        matrix.dim = dim
+        matrix.keys = list(rows)
+        matrix.index = {key: position for position, key in enumerate(matrix.keys)}
+        picked = list(rows.values())
+        if np is not None:
+            full = np.frombuffer(buffer, dtype=np.float32).reshape(-1, dim)
+            if picked == list(range(len(full))):
+                matrix._rows = full
+            else:
+                matrix._rows = np.ascontiguousarray(full[picked])
+        else:
+            view = memoryview(buffer).cast("B").cast("f")
+            flat = array("f")
+            for row in picked:
+                flat.extend(view[row * dim : (row + 1) * dim])
+            matrix._flat = flat
+        return matrix
+
+    def reindexed(self, keys: Iterable[str], vectors: Mapping[str, Sequence[float]]) -> "EmbeddingMatrix":
+        """Matrix over ``keys``: existing rows are copied as-is, new keys are normalized from ``vectors``.
+
+        Keys with neither a row nor a vector of matching dimension are dropped.
+        Returns ``self`` when the key order is unchanged.
+        """
+
+        if not self.dim:
+            return EmbeddingMatrix({key: vectors[key] for key in keys if key in vectors})
+        kept = [key for key in keys if key in self.index or len(vectors.get(key, ())) == self.dim]
+        if kept == self.keys:
+            return self
+        fresh = EmbeddingMatrix({key: vectors[key] for key in kept if key not in self.index})
+        matrix = EmbeddingMatrix({})
+        matrix.dim = self.dim
+        matrix.keys = kept
+        matrix.index = {key: position for position, key in enumerate(kept)}
+        if self._rows is not None:
+            rows = np.empty((len(kept), self.dim), dtype=np.float32)
+            old = [(position, self.index[key]) for position, key in enumerate(kept) if key in self.index]
+            new = [(position, fresh.index[key]) for position, key in enumerate(kept) if key in fresh.index]
+            if old:
+                target, source = zip(*old)
+                rows[list(target)] = self._rows[list(source)]
+            if new:
+                target, source = zip(*new)
+                rows[list(target)] = fresh._rows[list(source)]
+            matrix._rows = rows
+        else:
+            dim = self.dim
+            flat = array("f")
+            for key in kept:
+                owner = self if key in self.index else fresh
+                row = owner.index[key] * dim
+                flat.extend((owner._flat or array("f"))[row : row + dim])
+            matrix._flat = flat
+        return matrix
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def uses_numpy(self) -> bool:
+        return self._rows is not None
+
+    @property
+    def nbytes(self) -> int:
+        if self._rows is not None:
+            return int(self._rows.nbytes)
+        return len(self._flat or ()) * 4
+
+    def similarities(self, query: Sequence[float]):
+        """Cosine similarity of ``query`` against every row (array-like of length n)."""
+
+        if len(query) != self.dim:
+            raise ValueError(f"query dimension {len(query)} does not match matrix dimension {self.dim}")
+        if self._rows is not None:
+            vector = np.asarray(query, dtype=np.float32)
+            norm = float(np.linalg.norm(vector))
+            if norm == 0.0:
+                return np.zeros(len(self.keys), dtype=np.float32)
+            return self._rows @ (vector / norm)
+        unit = _unit([float(value) for value in query])
+        flat = self._flat or array("f")
+        dim = self.dim
+        view = memoryview(flat)
+        return [sum(map(mul, view[offset : offset + dim], unit)) for offset in range(0, len(flat), dim)]
+
+    def similarities_many(self, queries: Sequence[Sequence[float]]) -> list:
+        """Similarities for several queries; with NumPy one ``(n, dim) @ (dim, q)`` product."""
+
+        if self._rows is None or not queries:
+            return [self.similarities(query) for query in queries]
+        block = self._unit_queries(queries)
+        scores = self._rows @ block.T
+        return [scores[:, column] for column in range(len(queries))]
+
+    def _unit_queries(self, queries: Sequence[Sequence[float]]):
+        for query in queries:
+            if len(query) != self.dim:
+                raise ValueError(f"query dimension {len(query)} does not match matrix dimension {self.dim}")
+        block = np.asarray(queries, dtype=np.float32).reshape(len(queries), self.dim)
+        norms = np.linalg.norm(block, axis=1, keepdims=True)
+        norms[norms == 0.0] = 1.0
+        return block / norms
+
+    def rows_at(self, indices):
+        """Unit float32 rows at ``indices`` as a ``(len(indices), dim)`` array (NumPy-backed matrices only)."""
+
+        return self._rows[indices]
+
+    def top_indices(self, scores, k: int) -> list[int]:
+        """Indices of the ``k`` highest scores, best first."""
+
+        count = len(self.keys)
+        if k <= 0 or count == 0:
+            return []
+        k = min(k, count)
+        if self.uses_numpy:
+            if k < count:
+                picked = np.argpartition(scores, count - k)[count - k :]
+            else:
+                picked = np.arange(count)
+            return [int(index) for index in picked[np.argsort(-scores[picked], kind="stable")]]
+        return sorted(range(count), key=scores.__getitem__, reverse=True)[:k]
+
+    def select(self, scores, indices: Iterable[int]) -> dict[str, float]:
+        """Map ``indices`` to keys with similarities rescaled from [-1, 1] to [0, 1]."""
+
+        selected: dict[str, float] = {}
+        for index in indices:
+            normalized = (float(scores[index]) + 1.0) / 2.0
+            selected[self.keys[index]] = max(0.0, min(1.0, normalized))
+        return selected
+
+
+class QuantizedEmbeddingMatrix(EmbeddingMatrix):
+    """Int8 rows with a float32 scale per row: a quarter of the float32 footprint.
+
+    Similarities are approximate (about 1e-2 absolute error for unit vectors);
+    callers re-rank the top candidates with full-precision vectors when they
+    have them. With NumPy, rows are widened to float32 one block at a time so
+    the temporary stays bounded.
+    """
+
+    __slots__ = ("_codes", "_scales")
+
+    def __init__(self, rows: Mapping[str, tuple[float, bytes]]) -> None:
+        super().__init__({})
+        self._codes = None
+        self._scales = None
+        kept: list[tuple[float, bytes]] = []
+        for key, (scale, codes) in rows.items():
+            if not codes:
+                continue
+            if not self.dim:
+                self.dim = len(codes)
+            if len(codes) != self.dim:
+                continue
+            self.index[key] = len(self.keys)
+            self.keys.append(key)
+            kept.append((float(scale), codes))
+        if not kept:
+            return
+        joined = b"".join(codes for _, codes in kept)
+        if np is not None:
+            self._codes = np.frombuffer(joined, dtype=np.int8).reshape(len(kept), self.dim)
+            self._scales = np.asarray([scale for scale, _ in kept], dtype=np.float32)
+        else:
+            self._codes = array("b", joined)
+            self._scales = array("f", (scale for scale, _ in kept))
+
+    @classmethod
+    def quantize(cls, vectors: Mapping[str, Sequence[float]]) -> "QuantizedEmbeddingMatrix":
+        if np is None:
+            return cls({key: quantize_int8(vector) for key, vector in vectors.items() if len(vector) > 0})
+        # Same encoding as quantize_int8, vectorized: reuse the float32 matrix's row filtering.
+        unit = EmbeddingMatrix(vectors)
+        matrix = cls({})
+        matrix.keys, matrix.index, matrix.dim = unit.keys, unit.index, unit.dim
+        if unit._rows is None:
+            return matrix
+        peaks = np.abs(unit._rows).max(axis=1)
+        scales = np.where(peaks > 0, peaks / 127.0, 1.0).astype(np.float32)
+        matrix._codes = np.clip(np.rint(unit._rows / scales[:, None]), -127, 127).astype(np.int8)
+        matrix._scales = scales
+        return matrix
+
+    @property
+    def uses_numpy(self) -> bool:
+        return np is not None and self._codes is not None
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.keys) * (self.dim + 4)
+
+    def row(self, key: str) -> tuple[float, bytes]:
+        position = self.index[key]
+        if np is not None:
+            return float(self._scales[position]), self._codes[position].tobytes()
+        start = position * self.dim
+        return self._scales[position], self._codes[start : start + self.dim].tobytes()
+
+    def similarities(self, query: Sequence[float]):
+        if len(query) != self.dim:
+            raise ValueError(f"query dimension {len(query)} does not match matrix dimension {self.dim}")
+        if self._codes is None:
+            return np.zeros(0, dtype=np.float32) if np is not None else []
+        if np is not None:
+            vector = np.asarray(query, dtype=np.float32)
+            norm = float(np.linalg.norm(vector))
+            if norm == 0.0:
+                return np.zeros(len(self.keys), dtype=np.float32)
+            vector = vector / norm
+            scores = np.empty(len(self.keys), dtype=np.float32)
+            for start in range(0, len(self.keys), _BLOCK_ROWS):
+                block = self._codes[start : start + _BLOCK_ROWS].astype(np.float32)
+                scores[start : start + _BLOCK_ROWS] = block @ vector
+            return scores * self._scales
+        unit = _unit([float(value) for value in query])
+        dim = self.dim
+        view = memoryview(self._codes)
+        return [
+            sum(map(mul, view[position * dim : (position + 1) * dim], unit)) * scale
+            for position, scale in enumerate(self._scales)
+        ]
+
+    def similarities_many(self, queries: Sequence[Sequence[float]]) -> list:
+        if np is None or self._codes is None or not queries:
+            return [self.similarities(query) for query in queries]
+        block_t = self._unit_queries(queries).T
+        scores = np.empty((len(self.keys), len(queries)), dtype=np.float32)
+        for start in range(0, len(self.keys), _BLOCK_ROWS):
+            scores[start : start + _BLOCK_ROWS] = self._codes[start : start + _BLOCK_ROWS].astype(np.float32) @ block_t
+        scores *= self._scales[:, None]
+        return [scores[:, column] for column in range(len(queries))]
+
+    def rows_at(self, indices):
+        return self._codes[indices].astype(np.float32) * self._scales[indices, None]
+
+    def reindexed(self, keys: Iterable[str], vectors: Mapping[str, Sequence[float]]) -> "QuantizedEmbeddingMatrix":
+        wanted = list(keys)
+        if wanted == self.keys:
+            return self
+        return QuantizedEmbeddingMatrix(
+            {
+                key: self.row(key) if key in self.index else quantize_int8(vectors[key])
+                for key in wanted
+                if key in self.index or len(vectors.get(key, ())) > 0
+            }
+        )
+
+
+__all__ = ["EmbeddingMatrix", "QuantizedEmbeddingMatrix", "dequantize_int8", "quantize_int8"]
@@ -0,0 +1,472 @@
+"""Shared background sink for JSONL telemetry.
+
+Emitting costs the caller a clock read and one bounded ``put_nowait``; a
+daemon writer thread masks, serializes, and appends whole batches through a
+single long-lived handle. Every component writing to the same file shares
+one sink (see :meth:`TelemetrySink.acquire`), so lines from ``SkillManager``
+and ``SkillExecutionGuard`` never interleave mid-line and the file is opened
+once per process.
+
+When the queue is full the event is dropped and counted; the writer records
+the running total as a ``telemetry_dropped`` line with its next batch. The
+handle is reopened when the file is rotated or removed underneath it. Sinks
+are flushed and closed at interpreter exit.
+
+An optional :class:`TelemetryPolicy` thins high-volume events in the writer:
+each event type has a sample rate, errors and blocks are always kept, and
+every event (sampled out or not) feeds per-skill counters and histograms that
+are written as one ``telemetry_aggregate`` record per interval.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import queue
+import random
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, ClassVar, Iterator, Mapping, Optional, Sequence, TextIO
+
+from .redaction import mask_sensitive
+
+DEFAULT_QUEUE_SIZE = 10000
+DEFAULT_BATCH_SIZE = 512
+DEFAULT_AGGREGATE_INTERVAL_SEC = 60.0
+# Never sampled: statuses that mean something went wrong, and rare diagnostic events.
+DEFAULT_KEEP_STATUSES = frozenset({"blocked", "failed", "error", "timeout"})
+DEFAULT_KEEP_EVENTS = frozenset(
+    {"skill_embedding_fallback", "skill_ann_fallback", "skills_reloaded", "telemetry_dropped"}
+)
+# Histogram bucket upper bounds: a 1-2-5 series from 1 to 5e6.
+_BUCKETS = tuple(float(step * 10**power) for power in range(7) for step in (1, 2, 5))
+
+# Queue items are (epoch seconds, event, batch); a ``None`` timestamp marks a
+# control item: a flush (threading.Event in the event slot) or stop (None).
+_Item = tuple[Optional[float], Any, Sequence[Mapping[str, Any]]]
+
+
+def _timestamp(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, UTC).isoformat().replace("+00:00", "Z")
+
+
+# ---------------------------------------------------------------------- #
+# Sampling and pre-aggregation
+# ---------------------------------------------------------------------- #
+@dataclass(frozen=True, slots=True)
+class TelemetryPolicy:
+    """Which events a sink writes in full, and how often it writes aggregates.
+
+    ``sample_rates`` maps event names to the fraction written (0 to 1); other
+    events use ``default_rate``. Events in ``keep_events`` or whose ``status``
+    is in ``keep_statuses`` are always written. Sampled lines carry their
+    ``sample_rate`` so counts can be re-weighted. ``aggregate_interval_sec``
+    of 0 disables aggregate records.
+    """
+
+    sample_rates: Mapping[str, float] = field(default_factory=dict)
+    default_rate: float = 1.0
+    keep_statuses: frozenset[str] = DEFAULT_KEEP_STATUSES
+    keep_events: frozenset[str] = DEFAULT_KEEP_EVENTS
+    aggregate_interval_sec: float = DEFAULT_AGGREGATE_INTERVAL_SEC
+    seed: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        rates = [self.default_rate, *self.sample_rates.values()]
+        if any(not 0.0 <= rate <= 1.0 for rate in rates):
+            raise ValueError("sample rates must be between 0 and 1")
+        if self.aggregate_interval_sec < 0:
+            raise ValueError("aggregate_interval_sec must not be negative")
+
+    def rate(self, event: str, data: Mapping[str, Any]) -> float:
+        if event in self.keep_events or data.get("status") in self.keep_statuses:
+            return 1.0
+        return self.sample_rates.get(event, self.default_rate)
+
+
+class _Histogram:
+    """Count, sum, extremes and 1-2-5 bucket counts of non-negative values."""
+
+    __slots__ = ("count", "total", "low", "high", "buckets")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.low = float("inf")
+        self.high = 0.0
+        self.buckets = [0] * (len(_BUCKETS) + 1)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.low = min(self.low, value)
+        self.high = max(self.high, value)
+        self.buckets[bisect_left(_BUCKETS, value)] += 1
+
+    def quantile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the ``fraction`` quantile, capped at the maximum."""
+
+        rank = fraction * self.count
+        seen = 0
+        for slot, hits in enumerate(self.buckets):
+            seen += hits
+            if hits and seen >= rank:
+                return min(self.high, _BUCKETS[slot]) if slot < len(_BUCKETS) else self.high
+        return self.high
+
+    def to_dict(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "sum": round(self.total, 3),
+            "min": round(self.low, 3),
+            "max": round(self.high, 3),
+            "p50": round(self.quantile(0.5), 3),
+            "p95": round(self.quantile(0.95), 3),
+        }
+
+
+def _metric_points(event: str, data: Mapping[str, Any]) -> Iterator[tuple[str, str, Optional[float]]]:
+    """``(metric, key, value)`` points of one event; ``value`` is ``None`` for plain counts."""
+
+    if event == "skill_selected":
+        for item in data.get("selected") or ():
+            if isinstance(item, Mapping):
+                yield "selections", str(item.get("name") or item.get("path")), None
+    elif event == "skill_loaded":
+        tokens = data.get("tokens")
+        if isinstance(tokens, (int, float)):
+            yield "load_tokens", str(data.get("path")), float(tokens)
+    elif event == "skill_exec_attempt":
+        yield "exec_attempts", str(data.get("script") or data.get("path")), None
+    elif event == "skill_exec_result":
+        script = str(data.get("script") or data.get("path"))
+        yield f"exec_{data.get('status') or 'unknown'}", script, None
+        latency = data.get("duration_ms")
+        if isinstance(latency, (int, float)):
+            yield "exec_latency_ms", script, float(latency)
+
+
+class _Aggregator:
+    """Per-window event tallies, counters and histograms, owned by the writer thread."""
+
+    def __init__(self) -> None:
+        self.started = time.time()
+        self.seen: dict[str, int] = {}
+        self.written: dict[str, int] = {}
+        self.counters: dict[str, dict[str, int]] = {}
+        self.histograms: dict[str, dict[str, _Histogram]] = {}
+
+    def add(self, event: str, data: Mapping[str, Any], *, written: bool) -> None:
+        self.seen[event] = self.seen.get(event, 0) + 1
+        if written:
+            self.written[event] = self.written.get(event, 0) + 1
+        for metric, key, value in _metric_points(event, data):
+            if value is None:
+                bucket = self.counters.setdefault(metric, {})
+                bucket[key] = bucket.get(key, 0) + 1
+            else:
+                histograms = self.histograms.setdefault(metric, {})
+                histogram = histograms.get(key)
+                if histogram is None:
+                    histogram = histograms[key] = _Histogram()
+                histogram.add(value)
+
+    def record(self, now: float) -> Optional[dict[str, Any]]:
+        """The window as a ``telemetry_aggregate`` payload, or ``None`` if nothing was seen."""
+
+        if not self.seen:
+            return None
+        return {
+            "window_start": _timestamp(self.started),
+            "window_sec": round(now - self.started, 3),
+            "events": {
+                event: {"seen": seen, "written": self.written.get(event, 0)} for event, seen in sorted(self.seen.items())
+            },
+            "counters": {metric: dict(sorted(keys.items())) for metric, keys in sorted(self.counters.items())},
+            "histograms": {
+                metric: {key: histogram.to_dict() for key, histogram in sorted(keys.items())}
+                for metric, keys in sorted(self.histograms.items())
+            },
+        }
+
+
+class TelemetrySink:
+    """Bounded, batched, single-handle JSONL appender running in a daemon thread."""
+
+    _registry: ClassVar[dict[Path, "TelemetrySink"]] = {}
+    _registry_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        policy: Optional[TelemetryPolicy] = None,
+    ) -> None:
+        if queue_size <= 0:
+            raise ValueError("queue_size must be positive")
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        self._path = path
+        self._queue: queue.Queue[_Item] = queue.Queue(maxsize=queue_size)
+        self._batch_size = batch_size
+        self._handle: Optional[TextIO] = None
+        self._inode: Optional[int] = None
+        self._written = 0
+        self._dropped = 0
+        self._reported_drops = 0
+        self._drop_lock = threading.Lock()
+        self._failed_writes = 0
+        self._refs = 0
+        self._closed = False
+        # (policy, rng) swapped as one reference so the writer never sees a mix.
+        self._policy: Optional[tuple[TelemetryPolicy, random.Random]] = None
+        self._aggregator = _Aggregator()
+        self.configure(policy)
+        self._thread = threading.Thread(target=self._run, name="telemetry-sink", daemon=True)
+        self._thread.start()
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def configure(self, policy: Optional[TelemetryPolicy]) -> None:
+        """Apply ``policy`` to events the writer has not handled yet; ``None`` writes everything."""
+
+        self._policy = (policy, random.Random(policy.seed)) if policy is not None else None
+
+    # ------------------------------------------------------------------ #
+    # Shared instances
+    # ------------------------------------------------------------------ #
+    @classmethod
+    def acquire(cls, path: Path, *, policy: Optional[TelemetryPolicy] = None, **kwargs: Any) -> "TelemetrySink":
+        """Return the process-wide sink for ``path``, starting it if needed.
+
+        Pair every call with :meth:`release`. ``kwargs`` only apply when the
+        sink is created; a ``policy`` replaces the shared sink's policy.
+        """
+
+        key = Path(path).resolve()
+        with cls._registry_lock:
+            sink = cls._registry.get(key)
+            if sink is None or sink._closed:
+                sink = cls(key, policy=policy, **kwargs)
+                cls._registry[key] = sink
+            elif policy is not None:
+                sink.configure(policy)
+            sink._refs += 1
+            return sink
+
+    def release(self) -> None:
+        """Drop one reference; the last one flushes and closes the sink."""
+
+        with self._registry_lock:
+            self._refs = max(0, self._refs - 1)
+            if self._refs:
+                return
+            if self._registry.get(self._path) is self:
+                del self._registry[self._path]
+        self.close()
+
+    @classmethod
+    def close_all(cls) -> None:
+        """Flush and close every shared sink (registered with ``atexit``)."""
+
+        with cls._registry_lock:
+            sinks = list(cls._registry.values())
+            cls._registry.clear()
+        for sink in sinks:
+            sink.close()
+
+    # ------------------------------------------------------------------ #
+    # Producer side
+    # ------------------------------------------------------------------ #
+    def emit(self, event: str, data: Mapping[str, Any]) -> bool:
+        return self.emit_many(event, (data,))
+
+    def emit_many(self, event: str, batch: Sequence[Mapping[str, Any]]) -> bool:
+        """Queue ``batch`` as lines of ``event``; ``False`` if it was dropped.
+
+        The writer serializes later, so callers must not mutate ``batch``
+        after handing it over.
+        """
+
+        if not batch or self._closed:
+            return False
+        try:
+            self._queue.put_nowait((time.time(), event, batch))
+        except queue.Full:
+            with self._drop_lock:
+                self._dropped += len(batch)
+            return False
+        return True
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """Block until everything queued so far is on disk; ``False`` on timeout."""
+
+        if self._closed or not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        try:
+            self._queue.put((None, done, ()), timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """Write what is queued and the pending aggregate, stop the writer, and close the handle."""
+
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread.is_alive():
+            try:
+                self._queue.put((None, None, ()), timeout=timeout)
+            except queue.Full:
+                return
+            self._thread.join(timeout)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "path": str(self._path),
+            "queued": self._queue.qsize(),
+            "written": self._written,
+            "dropped": self._dropped,
+            "failed_writes": self._failed_writes,
+        }
+
+    # ------------------------------------------------------------------ #
+    # Writer thread
+    # ------------------------------------------------------------------ #
+    def _run(self) -> None:
+        try:
+            while True:
+                try:
+                    items = [self._queue.get(timeout=self._until_aggregate())]
+                except queue.Empty:
+                    self._write([])
+                    continue
+                lines = len(items[0][2])
+                while lines < self._batch_size:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    items.append(item)
+                    lines += len(item[2])
+                if not self._drain(items):
+                    return
+        finally:
+            self._close_handle()
+
+    def _drain(self, items: list[_Item]) -> bool:
+        """Write ``items`` up to any control marker, then honour it; ``False`` to stop."""
+
+        pending: list[str] = []
+        for epoch, event, batch in items:
+            if epoch is not None:
+                ts = _timestamp(epoch)
+                state = self._policy
+                for data in batch:
+                    if state is None:
+                        pending.append(self._serialize(ts, event, data))
+                        continue
+                    policy, rng = state
+                    rate = policy.rate(event, data)
+                    written = rate >= 1.0 or rng.random() < rate
+                    if policy.aggregate_interval_sec > 0:
+                        self._aggregator.add(event, data, written=written)
+                    if written:
+                        pending.append(self._serialize(ts, event, data, sample_rate=rate))
+                continue
+            self._write(pending)
+            pending = []
+            if event is None:
+                self._write([], final=True)
+                return False
+            event.set()
+        self._write(pending)
+        return True
+
+    def _until_aggregate(self) -> Optional[float]:
+        """Seconds until the next aggregate record is due; ``None`` when aggregation is off."""
+
+        state = self._policy
+        if state is None or state[0].aggregate_interval_sec <= 0:
+            return None
+        return max(0.0, self._aggregator.started + state[0].aggregate_interval_sec - time.time())
+
+    @staticmethod
+    def _serialize(ts: str, event: str, data: Mapping[str, Any], *, sample_rate: float = 1.0) -> str:
+        body: dict[str, Any] = {"ts": ts, "event": event, "data": mask_sensitive(dict(data))}
+        if sample_rate < 1.0:
+            body["sample_rate"] = sample_rate
+        return json.dumps(body, ensure_ascii=False, default=str) + "\n"
+
+    def _write(self, lines: list[str], *, final: bool = False) -> None:
+        now = time.time()
+        dropped = self._dropped
+        if dropped != self._reported_drops:
+            lines.append(self._serialize(_timestamp(now), "telemetry_dropped", {"count": dropped}))
+            self._reported_drops = dropped
+        due = self._until_aggregate()
+        if final or (due is not None and due <= 0):
+            record = self._aggregator.record(now)
+            self._aggregator = _Aggregator()
+            if record is not None:
+                lines.append(self._serialize(_timestamp(now), "telemetry_aggregate", record))
+        if not lines:
+            return
+        try:
+            handle = self._open()
+            handle.write("".join(lines))
+            handle.flush()
+        except OSError:
+            self._failed_writes += 1
+            self._close_handle()
+            return
+        self._written += len(lines)
+
+    def _open(self) -> TextIO:
+        try:
+            inode: Optional[int] = os.stat(self._path).st_ino
+        except FileNotFoundError:
+            inode = None
+        if self._handle is not None and inode is not None and inode == self._inode:
+            return self._handle
+        # First write, or the file was rotated or removed: start a fresh handle.
+        self._close_handle()
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        handle = self._path.open("a", encoding="utf-8")
+        self._handle = handle
+        self._inode = os.fstat(handle.fileno()).st_ino
+        return handle
+
+    def _close_handle(self) -> None:
+        handle, self._handle = self._handle, None
+        self._inode = None
+        if handle is not None:
+            try:
+                handle.close()
+            except OSError:
+                pass
+
+
+atexit.register(TelemetrySink.close_all)
+
+
+__all__ = [
+    "DEFAULT_AGGREGATE_INTERVAL_SEC",
+    "DEFAULT_BATCH_SIZE",
+    "DEFAULT_KEEP_EVENTS",
+    "DEFAULT_KEEP_STATUSES",
+    "DEFAULT_QUEUE_SIZE",
+    "TelemetryPolicy",
+    "TelemetrySink",
+]
@@ -0,0 +1,310 @@
+"""Daily compressed partitions, incremental rollups and queries for telemetry JSONL.
+
+:func:`compact` rotates the live log (``telemetry/skills/events.jsonl``) out of
+the way and writes its lines as one immutable gzip segment per UTC day::
+
+    archive/date=2025-10-19/events-20251019T051829Z.jsonl.gz
+    archive/index.json      # per segment: date, first/last ts, lines, counts per event
+    archive/rollup.json     # cumulative totals plus the segments already folded in
+
+Writers need no coordination: :class:`~mcp_router.telemetry.TelemetrySink`
+reopens the log when its inode changes. :func:`rollup` only reads segments
+that are not yet in ``rollup.json``, and :func:`query` skips segments whose
+time range or event counts cannot match.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, Sequence
+
+ARCHIVE_VERSION = 1
+INDEX_NAME = "index.json"
+ROLLUP_NAME = "rollup.json"
+_ROTATED_SUFFIX = ".compacting"
+_INVALID = "_invalid"
+
+
+def _timestamp(moment: datetime) -> str:
+    return moment.astimezone(UTC).isoformat().replace("+00:00", "Z")
+
+
+def parse_timestamp(value: str) -> Optional[datetime]:
+    """Parse an ISO-8601 timestamp (``Z`` or offset; naive means UTC); ``None`` if invalid."""
+
+    try:
+        moment = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        return None
+    return moment if moment.tzinfo is not None else moment.replace(tzinfo=UTC)
+
+
+def _write_json(path: Path, payload: Any) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def _read_json(path: Path, *, key: str) -> dict[str, Any]:
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {"version": ARCHIVE_VERSION, key: []}
+    if not isinstance(payload, dict) or payload.get("version") != ARCHIVE_VERSION:
+        return {"version": ARCHIVE_VERSION, key: []}
+    return payload
+
+
+def load_index(archive_dir: Path) -> list[dict[str, Any]]:
+    """Segment entries of ``archive_dir``, oldest first."""
+
+    segments = _read_json(archive_dir / INDEX_NAME, key="segments").get("segments")
+    return [entry for entry in segments or [] if isinstance(entry, dict) and "path" in entry]
+
+
+# ---------------------------------------------------------------------- #
+# Compaction
+# ---------------------------------------------------------------------- #
+def _rotate(events_path: Path, stamp: str) -> Optional[Path]:
+    if not events_path.exists() or events_path.stat().st_size == 0:
+        return None
+    rotated = events_path.with_name(f"{events_path.name}.{stamp}{_ROTATED_SUFFIX}")
+    os.replace(events_path, rotated)
+    return rotated
+
+
+def _read_rotated(path: Path) -> list[str]:
+    """All lines of a rotated log, including any a writer appended before it noticed the rotation."""
+
+    data = bytearray()
+    with path.open("rb") as handle:
+        while True:
+            data += handle.read()
+            if os.stat(path).st_size <= len(data):
+                return data.decode("utf-8", errors="replace").splitlines()
+
+
+def compact(events_path: Path, archive_dir: Path, *, now: Optional[datetime] = None) -> list[dict[str, Any]]:
+    """Move the lines of ``events_path`` into daily gzip segments under ``archive_dir``.
+
+    Returns the new index entries. Lines without a parseable ``ts`` go to the
+    compaction day and are counted as ``_invalid``. Rotated logs left by an
+    interrupted run are compacted first.
+    """
+
+    moment = now or datetime.now(UTC)
+    stamp = moment.astimezone(UTC).strftime("%Y%m%dT%H%M%S%fZ")
+    pending = sorted(events_path.parent.glob(f"{events_path.name}.*{_ROTATED_SUFFIX}"))
+    rotated = _rotate(events_path, stamp)
+    if rotated is not None:
+        pending.append(rotated)
+    if not pending:
+        return []
+
+    by_day: dict[str, list[tuple[Optional[datetime], str, str]]] = {}
+    for path in pending:
+        for line in _read_rotated(path):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                record = None
+            ts = parse_timestamp(record.get("ts", "")) if isinstance(record, dict) else None
+            event = str(record.get("event")) if ts is not None else _INVALID
+            day = (ts or moment).astimezone(UTC).date().isoformat()
+            by_day.setdefault(day, []).append((ts, event, line))
+
+    index = _read_json(archive_dir / INDEX_NAME, key="segments")
+    known = {entry.get("path") for entry in index["segments"]}
+    created: list[dict[str, Any]] = []
+    for day, rows in sorted(by_day.items()):
+        rel_path = f"date={day}/events-{stamp}.jsonl.gz"
+        serial = 1
+        while rel_path in known:
+            serial += 1
+            rel_path = f"date={day}/events-{stamp}-{serial}.jsonl.gz"
+        segment = archive_dir / rel_path
+        segment.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = segment.with_suffix(".tmp")
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as handle:
+            handle.write("\n".join(line for _, _, line in rows) + "\n")
+        os.replace(tmp_path, segment)
+        stamps = [ts for ts, _, _ in rows if ts is not None]
+        counts: dict[str, int] = {}
+        for _, event, _ in rows:
+            counts[event] = counts.get(event, 0) + 1
+        entry = {
+            "path": rel_path,
+            "date": day,
+            "start": _timestamp(min(stamps)) if stamps else None,
+            "end": _timestamp(max(stamps)) if stamps else None,
+            "lines": len(rows),
+            "bytes": segment.stat().st_size,
+            "events": dict(sorted(counts.items())),
+        }
+        created.append(entry)
+        known.add(rel_path)
+    index["segments"] = sorted([*index["segments"], *created], key=lambda entry: (entry["date"], entry["path"]))
+    _write_json(archive_dir / INDEX_NAME, index)
+    # Only drop the rotated logs once their segments and index entries are durable.
+    for path in pending:
+        path.unlink(missing_ok=True)
+    return created
+
+
+# ---------------------------------------------------------------------- #
+# Reading
+# ---------------------------------------------------------------------- #
+def _segment_matches(
+    entry: dict[str, Any], since: Optional[datetime], until: Optional[datetime], events: Optional[set[str]]
+) -> bool:
+    if events is not None and not events.intersection(entry.get("events") or {}):
+        return False
+    start = parse_timestamp(entry.get("start") or "")
+    end = parse_timestamp(entry.get("end") or "")
+    if since is not None and end is not None and end < since:
+        return False
+    if until is not None and start is not None and start >= until:
+        return False
+    return True
+
+
+def _iter_records(lines: Iterable[str]) -> Iterator[dict[str, Any]]:
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(record, dict):
+            yield record
+
+
+def iter_segment(archive_dir: Path, entry: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    with gzip.open(archive_dir / entry["path"], "rt", encoding="utf-8") as handle:
+        yield from _iter_records(handle)
+
+
+def query(
+    archive_dir: Path,
+    *,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    events: Optional[Sequence[str]] = None,
+    live_path: Optional[Path] = None,
+) -> Iterator[dict[str, Any]]:
+    """Records with ``since <= ts < until`` and an event in ``events`` (``None`` means any).
+
+    Segments that cannot match are not opened. ``live_path`` also scans the
+    not-yet-compacted log.
+    """
+
+    wanted = set(events) if events else None
+
+    def keep(record: dict[str, Any]) -> bool:
+        if wanted is not None and record.get("event") not in wanted:
+            return False
+        if since is None and until is None:
+            return True
+        ts = parse_timestamp(str(record.get("ts", "")))
+        if ts is None:
+            return False
+        return (since is None or ts >= since) and (until is None or ts < until)
+
+    for entry in load_index(archive_dir):
+        if _segment_matches(entry, since, until, wanted):
+            yield from filter(keep, iter_segment(archive_dir, entry))
+    if live_path is not None and live_path.exists():
+        with live_path.open("r", encoding="utf-8") as handle:
+            yield from filter(keep, _iter_records(handle))
+
+
+# ---------------------------------------------------------------------- #
+# Rollups
+# ---------------------------------------------------------------------- #
+def _empty_totals() -> dict[str, Any]:
+    return {"days": {}, "selections": {}, "load_tokens": {}, "exec": {}}
+
+
+def _add_stat(bucket: dict[str, Any], value: float, weight: float) -> None:
+    bucket["count"] = bucket.get("count", 0) + weight
+    bucket["sum"] = round(bucket.get("sum", 0.0) + value * weight, 3)
+    bucket["min"] = min(bucket.get("min", value), value)
+    bucket["max"] = max(bucket.get("max", value), value)
+
+
+def _fold(totals: dict[str, Any], record: dict[str, Any]) -> None:
+    """Add one event to ``totals``; sampled events count ``1 / sample_rate`` times."""
+
+    event = str(record.get("event"))
+    data = record.get("data") if isinstance(record.get("data"), dict) else {}
+    rate = record.get("sample_rate")
+    weight = 1.0 / rate if isinstance(rate, (int, float)) and 0 < rate < 1 else 1
+    ts = parse_timestamp(str(record.get("ts", "")))
+    day = ts.date().isoformat() if ts is not None else "unknown"
+    per_day = totals["days"].setdefault(day, {})
+    per_day[event] = per_day.get(event, 0) + weight
+    if event == "skill_selected":
+        for item in data.get("selected") or ():
+            if isinstance(item, dict):
+                name = str(item.get("name") or item.get("path"))
+                totals["selections"][name] = totals["selections"].get(name, 0) + weight
+    elif event == "skill_loaded" and isinstance(data.get("tokens"), (int, float)):
+        _add_stat(totals["load_tokens"].setdefault(str(data.get("path")), {}), float(data["tokens"]), weight)
+    elif event in {"skill_exec_attempt", "skill_exec_result"}:
+        script = totals["exec"].setdefault(str(data.get("script") or data.get("path")), {})
+        if event == "skill_exec_attempt":
+            script["attempts"] = script.get("attempts", 0) + weight
+        else:
+            statuses = script.setdefault("statuses", {})
+            status = str(data.get("status") or "unknown")
+            statuses[status] = statuses.get(status, 0) + weight
+            if isinstance(data.get("duration_ms"), (int, float)):
+                _add_stat(script.setdefault("latency_ms", {}), float(data["duration_ms"]), weight)
+
+
+def rollup(archive_dir: Path) -> dict[str, Any]:
+    """Fold segments not yet in ``rollup.json`` into its totals and save it.
+
+    Returns the state: ``segments`` (folded paths), ``processed`` (paths read
+    by this call) and ``totals`` (events per day and type, selections per
+    skill, load-token and exec-latency stats, exec outcomes per script).
+    """
+
+    path = archive_dir / ROLLUP_NAME
+    state = _read_json(path, key="segments")
+    if not isinstance(state.get("totals"), dict):
+        state = {"version": ARCHIVE_VERSION, "segments": [], "totals": _empty_totals()}
+    done = set(state["segments"])
+    processed: list[str] = []
+    for entry in load_index(archive_dir):
+        if entry["path"] in done:
+            continue
+        for record in iter_segment(archive_dir, entry):
+            _fold(state["totals"], record)
+        processed.append(entry["path"])
+    if processed:
+        state["segments"] = sorted(done.union(processed))
+        state["updated_at"] = _timestamp(datetime.now(UTC))
+        _write_json(path, state)
+    return {**state, "processed": processed}
+
+
+__all__ = [
+    "ARCHIVE_VERSION",
+    "INDEX_NAME",
+    "ROLLUP_NAME",
+    "compact",
+    "iter_segment",
+    "load_index",
+    "parse_timestamp",
+    "query",
+    "rollup",
+]
@@ -0,0 +1,238 @@
+"""Shared token counting: a cheap estimate first, exact tiktoken counts only near a limit.
+
+:func:`estimate_tokens` is the router's character heuristic (four ASCII
+characters or two other characters per token) computed with C-level string
+methods instead of a Python loop. The heuristic can undercount CJK text, code
+and JSON several times over, so :meth:`TokenService.check` only accepts text
+without a tiktoken encode when its UTF-8 length, an upper bound for byte-level
+BPE encodings, fits the limit, or when the estimate is more than
+``exact_margin`` over it. Exact counts are memoized by text digest and
+encoding.
+
+Offline hosts point ``encoding_dir`` (or ``MCP_TOKENIZER_DIR``, default
+``.mcp/cache/tiktoken`` when present) at a preloaded tiktoken cache; it is
+used as ``TIKTOKEN_CACHE_DIR`` unless that is already set. Populate it once on
+a connected host with ``make tokenizer-cache``. Without tiktoken, or when the
+encoding cannot be loaded, every count is the estimate.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from hashlib import blake2b
+from pathlib import Path
+from typing import Any, Optional
+
+DEFAULT_ENCODING = "cl100k_base"
+DEFAULT_MEMO_SIZE = 4096
+# Estimates within this fraction of a limit are confirmed with an exact count.
+DEFAULT_EXACT_MARGIN = 0.2
+ENCODING_DIR_ENV = "MCP_TOKENIZER_DIR"
+DEFAULT_ENCODING_DIR = Path(".mcp/cache/tiktoken")
+
+
+def estimate_tokens(text: str) -> int:
+    """Heuristic token count, 0 for empty text; ASCII text takes a single ``len``."""
+
+    if not text:
+        return 0
+    if text.isascii():
+        return (len(text) + 3) // 4
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    other_chars = len(text) - ascii_chars
+    return (ascii_chars + 3) // 4 + (other_chars * 2 + 3) // 4
+
+
+@dataclass(frozen=True, slots=True)
+class TokenCount:
+    """A token count and whether it came from the tokenizer rather than the estimate."""
+
+    tokens: int
+    exact: bool
+
+
+class TokenService:
+    """Estimate-first token counting with a memoized, lazily loaded tiktoken encoding."""
+
+    def __init__(
+        self,
+        *,
+        encoding: str = DEFAULT_ENCODING,
+        encoding_dir: Optional[Path | str] = None,
+        memo_size: int = DEFAULT_MEMO_SIZE,
+        exact_margin: float = DEFAULT_EXACT_MARGIN,
+    ) -> None:
+        if exact_margin < 0:
+            raise ValueError("exact_margin must not be negative")
+        self._encoding = encoding
+        self._encoding_dir = self._resolve_dir(encoding_dir)
+        self._memo_size = max(0, memo_size)
+        self._exact_margin = exact_margin
+        self._memo: OrderedDict[tuple[str, bytes], int] = OrderedDict()
+        self._memo_lock = threading.Lock()
+        # encoding name -> codec, or None when tiktoken or the encoding is unavailable
+        self._codecs: dict[str, Any] = {}
+        self._models: dict[str, str] = {}
+        self._load_lock = threading.Lock()
+        self._warm_thread: Optional[threading.Thread] = None
+        self._stats = {"estimates": 0, "exact": 0, "memo_hits": 0, "load_ms": 0.0}
+
+    @staticmethod
+    def _resolve_dir(value: Optional[Path | str]) -> Optional[Path]:
+        candidate = value or os.getenv(ENCODING_DIR_ENV)
+        if candidate:
+            return Path(candidate).expanduser()
+        return DEFAULT_ENCODING_DIR if DEFAULT_ENCODING_DIR.is_dir() else None
+
+    @property
+    def encoding_dir(self) -> Optional[Path]:
+        return self._encoding_dir
+
+    # ------------------------------------------------------------------ #
+    # Encodings
+    # ------------------------------------------------------------------ #
+    def warm_up(self, *, background: bool = True) -> None:
+        """Load the default encoding now, in a daemon thread unless ``background`` is false."""
+
+        if not background:
+            self._codec(None)
+            return
+        with self._load_lock:
+            if self._warm_thread is not None or self._encoding in self._codecs:
+                return
+            self._warm_thread = threading.Thread(
+                target=self._codec, args=(None,), name="token-service-warm-up", daemon=True
+            )
+            self._warm_thread.start()
+
+    @property
+    def exact_available(self) -> bool:
+        """Whether exact counts are possible (loads the default encoding if needed)."""
+
+        return self._codec(None) is not None
+
+    def _encoding_name(self, model: Optional[str]) -> str:
+        if not model:
+            return self._encoding
+        name = self._models.get(model)
+        if name is None:
+            try:
+                import tiktoken  # type: ignore[import]
+
+                name = tiktoken.encoding_name_for_model(model)
+            except Exception:  # pylint: disable=broad-except
+                name = self._encoding
+            self._models[model] = name
+        return name
+
+    def _codec(self, model: Optional[str]) -> Any:
+        name = self._encoding_name(model)
+        try:
+            return self._codecs[name]
+        except KeyError:
+            pass
+        with self._load_lock:
+            if name in self._codecs:
+                return self._codecs[name]
+            start = time.perf_counter()
+            if self._encoding_dir is not None:
+                os.environ.setdefault("TIKTOKEN_CACHE_DIR", str(self._encoding_dir))
+            try:
+                import tiktoken  # type: ignore[import]
+
+                codec = tiktoken.get_encoding(name)
+            except Exception:  # pylint: disable=broad-except
+                codec = None
+            self._stats["load_ms"] += (time.perf_counter() - start) * 1000
+            self._codecs[name] = codec
+            return codec
+
+    # ------------------------------------------------------------------ #
+    # Counting
+    # ------------------------------------------------------------------ #
+    def estimate(self, text: str) -> int:
+        self._stats["estimates"] += 1
+        return estimate_tokens(text)
+
+    def count(self, text: str, *, model: Optional[str] = None) -> int:
+        """Exact count when the encoding is available (memoized), else the estimate."""
+
+        return self._exact(text, model).tokens
+
+    def check(self, text: str, limit: int, *, model: Optional[str] = None) -> TokenCount:
+        """Count ``text`` for a comparison against ``limit``.
+
+        Returns the estimate when the text provably fits (its UTF-8 length is
+        at most ``limit``) or the estimate exceeds the limit by more than
+        ``exact_margin``, and the exact count otherwise.
+        """
+
+        estimate = self.estimate(text)
+        upper_bound = len(text) if text.isascii() else len(text.encode("utf-8", "surrogatepass"))
+        if upper_bound <= limit or estimate - limit > self._exact_margin * max(limit, 1):
+            return TokenCount(estimate, False)
+        return self._exact(text, model)
+
+    def _exact(self, text: str, model: Optional[str]) -> TokenCount:
+        if not text:
+            return TokenCount(0, True)
+        codec = self._codec(model)
+        if codec is None:
+            return TokenCount(self.estimate(text), False)
+        key = (codec.name, blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest())
+        with self._memo_lock:
+            cached = self._memo.get(key)
+            if cached is not None:
+                self._memo.move_to_end(key)
+                self._stats["memo_hits"] += 1
+                return TokenCount(cached, True)
+        tokens = len(codec.encode(text, disallowed_special=()))
+        self._stats["exact"] += 1
+        if self._memo_size:
+            with self._memo_lock:
+                self._memo[key] = tokens
+                while len(self._memo) > self._memo_size:
+                    self._memo.popitem(last=False)
+        return TokenCount(tokens, True)
+
+    def stats(self) -> dict[str, Any]:
+        """Estimates, exact encodes, memo hits, encoding load time and availability."""
+
+        return {
+            **self._stats,
+            "load_ms": round(self._stats["load_ms"], 3),
+            "memo_size": len(self._memo),
+            "encodings": {name: codec is not None for name, codec in self._codecs.items()},
+        }
+
+
+_default: Optional[TokenService] = None
+_default_lock = threading.Lock()
+
+
+def default_token_service() -> TokenService:
+    """The process-wide service (cl100k_base, ``MCP_TOKENIZER_DIR``), created on first use."""
+
+    global _default  # pylint: disable=global-statement
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = TokenService()
+    return _default
+
+
+__all__ = [
+    "DEFAULT_ENCODING",
+    "DEFAULT_ENCODING_DIR",
+    "DEFAULT_EXACT_MARGIN",
+    "DEFAULT_MEMO_SIZE",
+    "ENCODING_DIR_ENV",
+    "TokenCount",
+    "TokenService",
+    "default_token_service",
+    "estimate_tokens",
+]
@@ -1,5 +1,7 @@
 import asyncio
 import json
+import os
+import re
 
 import httpx
 import pytest
@@ -84,3 +86,283 @@ async def test_github_provider_graphql_support() -> None:
         assert response.meta["status_code"] == 200
         assert response.content[0]["data"]["data"]["viewer"]["login"] == "octocat"
         await provider.aclose()
+
+
+def _rest_payload(tmp_path=None, **config) -> ProviderRequest:
+    return ProviderRequest(
+        prompt="/repos/octo/repo/git/trees/main",
+        model="github",
+        sandbox="read-only",
+        approval_policy="never",
+        config=config,
+        timeout_sec=5.0,
+        artifacts_dir=tmp_path,
+    )
+
+
+@pytest.mark.asyncio
+async def test_github_provider_lazy_mode_keeps_single_raw_copy() -> None:
+    async def handler(_: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"tree": [{"path": "README.md"}]})
+
+    transport = httpx.MockTransport(handler)
+    async with httpx.AsyncClient(transport=transport, base_url="https://api.github.com") as client:
+        provider = GitHubProvider("ghp_test", client=client)
+        response = await provider.agenerate(_rest_payload(response_mode="lazy"))
+        assert response.text == ""
+        assert response.content == []
+        assert response.body is not None and not response.body.spilled
+        assert response.meta["body_bytes"] == response.body.size
+        assert response.body.json()["tree"][0]["path"] == "README.md"
+        assert response.body.json() is response.body.json()
+
+
+@pytest.mark.asyncio
+async def test_github_provider_spills_large_bodies(tmp_path) -> None:
+    entries = [{"path": f"file_{idx}.py", "sha": "0" * 40} for idx in range(200)]
+
+    async def handler(_: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"tree": entries})
+
+    transport = httpx.MockTransport(handler)
+    async with httpx.AsyncClient(transport=transport, base_url="https://api.github.com") as client:
+        provider = GitHubProvider("ghp_test", client=client, spill_threshold_bytes=1024)
+        lazy = await provider.agenerate(_rest_payload(tmp_path, response_mode="lazy"))
+        assert lazy.body is not None and lazy.body.spilled
+        assert lazy.body.path.parent == tmp_path / "github"
+        assert lazy.meta["body_path"] == str(lazy.body.path)
+        assert len(lazy.body.json()["tree"]) == 200
+
+        json_only = await provider.agenerate(_rest_payload(tmp_path, response_mode="json"))
+        assert json_only.text == ""
+        assert len(json_only.content[0]["data"]["tree"]) == 200
+
+        text_only = await provider.agenerate(_rest_payload(response_mode="text", spill_threshold_bytes=None))
+        assert text_only.content == []
+        assert text_only.body is None
+        assert json.loads(text_only.text)["tree"][0]["path"] == "file_0.py"
+
+        full = await provider.agenerate(_rest_payload(spill_threshold_bytes=None))
+        assert full.text and full.content
+        assert full.body is None
+
+
+@pytest.mark.asyncio
+async def test_github_provider_rejects_unknown_response_mode() -> None:
+    async def handler(_: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={})
+
+    transport = httpx.MockTransport(handler)
+    async with httpx.AsyncClient(transport=transport, base_url="https://api.github.com") as client:
+        provider = GitHubProvider("ghp_test", client=client)
+        with pytest.raises(ProviderError):
+            await provider.agenerate(_rest_payload(response_mode="xml"))
+
+
+@pytest.mark.asyncio
+async def test_github_provider_conditional_cache_serves_304(tmp_path) -> None:
+    from mcp_router.providers.github_cache import ConditionalRequestCache
+
+    seen_validators: list[tuple[str | None, str | None]] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        seen_validators.append(
+            (request.headers.get("If-None-Match"), request.headers.get("If-Modified-Since"))
+        )
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304, headers={"ETag": '"v1"', "X-RateLimit-Remaining": "4999"})
+        return httpx.Response(
+            200,
+            json={"login": "octocat"},
+            headers={
+                "ETag": '"v1"',
+                "Last-Modified": "Mon, 19 Oct 2026 00:00:00 GMT",
+                "X-RateLimit-Remaining": "4998",
+            },
+        )
+
+    transport = httpx.MockTransport(handler)
+    cache_dir = tmp_path / "github-cache"
+    async with httpx.AsyncClient(transport=transport, base_url="https://api.github.com") as client:
+        provider = GitHubProvider("ghp_test", client=client, cache=ConditionalRequestCache(cache_dir=cache_dir))
+        first = await provider.agenerate(_rest_payload())
+        second = await provider.agenerate(_rest_payload())
+        assert first.meta["cache"]["status"] == "miss"
+        assert second.meta["cache"]["status"] == "hit"
+        assert second.meta["status_code"] == 200
+        assert second.meta["rate_limit_units_saved"] == 1
+        assert second.meta["cache"]["rate_limit_units_saved"] == 1
+        assert second.content == first.content
+        assert "If-None-Match" not in second.meta.get("request_headers", {})
+
+        # A fresh provider revalidates against the on-disk entry.
+        restarted = GitHubProvider("ghp_test", client=client, cache=ConditionalRequestCache(cache_dir=cache_dir))
+        third = await restarted.agenerate(_rest_payload())
+        assert third.meta["cache"]["status"] == "hit"
+        assert third.content[0]["data"] == {"login": "octocat"}
+
+    assert seen_validators[0] == (None, None)
+    assert seen_validators[1] == ('"v1"', "Mon, 19 Oct 2026 00:00:00 GMT")
+    assert len(seen_validators) == 3
+
+
+@pytest.mark.asyncio
+async def test_conditional_cache_bounds_entries_on_disk(tmp_path) -> None:
+    from mcp_router.providers.github_cache import ConditionalRequestCache
+    from mcp_router.schemas import ResponseBody
+
+    cache_dir = tmp_path / "github-cache"
+    cache = ConditionalRequestCache(cache_dir=cache_dir, max_entries=2)
+    for key in ("a", "b", "c"):
+        await cache.store(key, etag=f'"{key}"', last_modified=None, status_code=200,
+                          content_type="application/json", body=ResponseBody(b"{}"))
+
+    assert sorted(path.name for path in cache_dir.iterdir()) == ["b.body", "b.json", "c.body", "c.json"]
+    assert await cache.lookup("a") is None
+    assert (await cache.lookup("b")).etag == '"b"'
+
+    # A restart with a smaller bound prunes the oldest leftovers before serving.
+    os.utime(cache_dir / "c.json", (1_000, 1_000))
+    os.utime(cache_dir / "b.json", (2_000, 2_000))
+    restarted = ConditionalRequestCache(cache_dir=cache_dir, max_entries=1)
+    assert await restarted.lookup("c") is None
+    assert (await restarted.lookup("b")).etag == '"b"'
+    assert sorted(path.name for path in cache_dir.iterdir()) == ["b.body", "b.json"]
+
+
+@pytest.mark.asyncio
+async def test_github_provider_paginates_concurrently_with_caps() -> None:
+    in_flight = 0
+    peak = 0
+    requested_pages: list[int] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        page = int(request.url.params.get("page", "1"))
+        requested_pages.append(page)
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        base = "https://api.github.com/repos/octo/repo/issues?per_page=2"
+        link = f'<{base}&page={min(page + 1, 6)}>; rel="next", <{base}&page=6>; rel="last"'
+        return httpx.Response(200, json=[{"n": page * 10 + i} for i in range(2)], headers={"Link": link})
+
+    transport = httpx.MockTransport(handler)
+    async with httpx.AsyncClient(transport=transport, base_url="https://api.github.com") as client:
+        provider = GitHubProvider("ghp_test", client=client)
+        response = await provider.agenerate(
+            _rest_payload(path="/repos/octo/repo/issues", paginate=True, per_page=2, page_concurrency=3)
+        )
+        items = response.content[0]["data"]
+        assert [item["n"] for item in items] == [10, 11, 20, 21, 30, 31, 40, 41, 50, 51, 60, 61]
+        assert response.meta["pagination"]["pages"] == 6
+        assert response.meta["status_code"] == 200
+        assert response.meta["url"].endswith("page=6")
+        assert 1 < peak <= 3
+
+        capped = await provider.agenerate(
+            _rest_payload(path="/repos/octo/repo/issues", paginate=True, per_page=2, max_items=5)
+        )
+        assert [item["n"] for item in capped.content[0]["data"]] == [10, 11, 20, 21, 30]
+        assert capped.meta["pagination"]["items"] == 5
+        assert capped.meta["url"].endswith("page=3")
+
+        # max_bytes is soft: the page that crosses it is kept whole and nothing more is fetched.
+        soft = await provider.agenerate(
+            _rest_payload(path="/repos/octo/repo/issues", paginate=True, per_page=2, max_bytes=1)
+        )
+        assert [item["n"] for item in soft.content[0]["data"]] == [10, 11]
+        assert soft.meta["pagination"]["pages"] == 1
+
+        pages = [page.number async for page in provider.aiter_pages("/repos/octo/repo/issues", params={"per_page": 2})]
+        assert pages == [1, 2, 3, 4, 5, 6]
+
+
+@pytest.mark.asyncio
+async def test_github_provider_batches_graphql_queries() -> None:
+    sent: list[dict] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        sent.append(payload)
+        assert "b0_viewer: viewer" in payload["query"]
+        assert payload["variables"] == {"b1_owner": "octo", "b1_name": "repo"}
+        return httpx.Response(
+            200,
+            json={
+                "data": {"b0_viewer": {"login": "octocat"}, "b1_repository": None},
+                "errors": [{"path": ["b1_repository"], "message": "Could not resolve"}],
+            },
+        )
+
+    def _graphql(query: str, variables: dict | None = None) -> ProviderRequest:
+        return ProviderRequest(
+            prompt=query,
+            model="github",
+            sandbox="read-only",
+            approval_policy="never",
+            config={"graphql": True, "variables": variables},
+            timeout_sec=5.0,
+        )
+
+    transport = httpx.MockTransport(handler)
+    async with httpx.AsyncClient(transport=transport, base_url="https://api.github.com") as client:
+        provider = GitHubProvider("ghp_test", client=client, graphql_batch_window_ms=20)
+        viewer, repo = await asyncio.gather(
+            provider.agenerate(_graphql("query { viewer { login } }")),
+            provider.agenerate(
+                _graphql(
+                    "query($owner: String!, $name: String!) { repository(owner: $owner, name: $name) { id } }",
+                    {"owner": "octo", "name": "repo"},
+                )
+            ),
+        )
+        await provider.aclose()
+
+    assert len(sent) == 1
+    assert viewer.content[0]["data"] == {"data": {"viewer": {"login": "octocat"}}}
+    assert repo.content[0]["data"]["errors"][0]["path"] == ["repository"]
+    assert viewer.meta["graphql_batch"]["size"] == 2
+
+
+@pytest.mark.asyncio
+async def test_github_provider_retries_rejected_graphql_batch_in_halves() -> None:
+    sent: list[str] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        query = json.loads(request.content)["query"]
+        sent.append(query)
+        if "nope" in query:
+            return httpx.Response(200, json={"data": None, "errors": [{"message": "Field 'nope' doesn't exist"}]})
+        aliases = re.findall(r"(\w+): (viewer|rateLimit)", query) or re.findall(r"()(viewer|rateLimit)", query)
+        answers = {"viewer": {"login": "octocat"}, "rateLimit": {"remaining": 10}}
+        data = {(alias or field): answers[field] for alias, field in aliases}
+        return httpx.Response(200, json={"data": data})
+
+    def _graphql(query: str) -> ProviderRequest:
+        return ProviderRequest(
+            prompt=query,
+            model="github",
+            sandbox="read-only",
+            approval_policy="never",
+            config={"graphql": True},
+            timeout_sec=5.0,
+        )
+
+    transport = httpx.MockTransport(handler)
+    async with httpx.AsyncClient(transport=transport, base_url="https://api.github.com") as client:
+        provider = GitHubProvider("ghp_test", client=client, graphql_batch_window_ms=20)
+        viewer, limit, invalid = await asyncio.gather(
+            provider.agenerate(_graphql("query { viewer { login } }")),
+            provider.agenerate(_graphql("query { rateLimit { remaining } }")),
+            provider.agenerate(_graphql("query { viewer { nope } }")),
+        )
+        await provider.aclose()
+
+    assert viewer.content[0]["data"] == {"data": {"viewer": {"login": "octocat"}}}
+    assert limit.content[0]["data"] == {"data": {"rateLimit": {"remaining": 10}}}
+    assert invalid.content[0]["data"]["data"] is None
+    assert "nope" in invalid.content[0]["data"]["errors"][0]["message"]
+    # The merged batch, then the first operation alone, then the other two, then those two alone.
+    assert len(sent) == 5
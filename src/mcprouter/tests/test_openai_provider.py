@@ -0,0 +1,130 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+
+import pytest
+
+from mcp_router.providers.base import ProviderError
+from mcp_router.providers.openai_provider import OpenAIProvider
+from mcp_router.router import MCPRouter
+from mcp_router.schemas import ProviderRequest
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """Minimal chat-completions stand-in; the path selects the behaviour."""
+
+    calls: dict[str, int] = {}
+    peers: set[int] = set()
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server naming
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        type(self).calls[self.path] = type(self).calls.get(self.path, 0) + 1
+        type(self).peers.add(self.client_address[1])
+        assert self.headers.get("Authorization") == "Bearer sk-test"
+        if self.path == "/bad-request":
+            self._reply(400, {"error": {"message": "bad"}})
+        elif self.path == "/throttled" and type(self).calls[self.path] == 1:
+            self._reply(429, {"error": {"message": "slow down"}}, {"Retry-After": "0"})
+        elif self.path == "/unavailable":
+            self._reply(503, {"error": {"message": "down"}}, {"retry-after-ms": "1500"})
+        else:
+            message = {"role": "assistant", "content": f"echo:{body['messages'][0]['content']}"}
+            self._reply(200, {"choices": [{"message": message}], "usage": {"total_tokens": 3}})
+
+    def _reply(self, status: int, payload: dict, headers: dict[str, str] | None = None) -> None:
+        encoded = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def log_message(self, *_: object) -> None:
+        return
+
+
+@pytest.fixture()
+def stand_in() -> Iterator[str]:
+    _StandInHandler.calls = {}
+    _StandInHandler.peers = set()
+    _StandInHandler.protocol_version = "HTTP/1.1"
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StandInHandler)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _payload(prompt: str = "hi") -> ProviderRequest:
+    return ProviderRequest(
+        prompt=prompt,
+        model="gpt-test",
+        sandbox="read-only",
+        approval_policy="never",
+        config={},
+        timeout_sec=5.0,
+    )
+
+
+@pytest.mark.asyncio
+async def test_openai_provider_splits_client_and_server_errors(stand_in: str) -> None:
+    bad = OpenAIProvider("sk-test", endpoint=f"{stand_in}/bad-request")
+    with pytest.raises(ProviderError) as bad_error:
+        await bad.agenerate(_payload())
+    assert bad_error.value.retriable is False
+    assert bad_error.value.retry_after is None
+    await bad.aclose()
+
+    down = OpenAIProvider("sk-test", endpoint=f"{stand_in}/unavailable")
+    with pytest.raises(ProviderError) as down_error:
+        await down.agenerate(_payload())
+    assert down_error.value.retriable is True
+    assert down_error.value.retry_after == pytest.approx(1.5)
+    await down.aclose()
+
+
+@pytest.mark.asyncio
+async def test_openai_provider_bounds_the_read_phase_by_request_and_config() -> None:
+    provider = OpenAIProvider("sk-test", read_timeout=3.0)
+    # pylint: disable=protected-access
+    assert provider._timeout_for(5.0).read == 3.0
+    assert provider._timeout_for(1.5).read == 1.5
+    assert provider._timeout_for(1.5).connect == provider._timeout_for(5.0).connect
+    await provider.aclose()
+
+
+@pytest.mark.asyncio
+async def test_openai_provider_reuses_pooled_connection(stand_in: str) -> None:
+    provider = OpenAIProvider("sk-test", endpoint=f"{stand_in}/ok", max_connections=2, keepalive_expiry=5.0)
+    for index in range(3):
+        response = await provider.agenerate(_payload(f"p{index}"))
+        assert response.text == f"echo:p{index}"
+    await provider.aclose()
+    assert _StandInHandler.calls["/ok"] == 3
+    assert len(_StandInHandler.peers) == 1
+
+
+def test_router_uses_retry_after_instead_of_backoff(stand_in: str, tmp_path) -> None:
+    provider = OpenAIProvider("sk-test", endpoint=f"{stand_in}/throttled")
+    # A 30s exponential backoff would time the test out; Retry-After: 0 retries at once.
+    with MCPRouter(provider, max_retries=1, backoff_base=30.0, log_dir=tmp_path) as router:
+        started = time.perf_counter()
+        result = router.generate(
+            prompt="again",
+            model="gpt-test",
+            prompt_limit=4096,
+            prompt_buffer=256,
+            sandbox="read-only",
+            approval_policy="never",
+        )
+    assert result.text == "echo:again"
+    assert time.perf_counter() - started < 5.0
+    assert _StandInHandler.calls["/throttled"] == 2
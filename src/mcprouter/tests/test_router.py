@@ -8,6 +8,7 @@ import pytest
 from mcp_router.providers.base import BaseProvider, ProviderError
 from mcp_router.router import MCPRouter, PromptLimitExceeded
 from mcp_router.schemas import ProviderRequest, ProviderResponse
+from mcp_router.tokens import TokenCount, TokenService
 
 
 class FlakyProvider(BaseProvider):
@@ -82,6 +83,20 @@ def test_prompt_limit_enforced(tmp_path: Path) -> None:
     assert any(entry["status"] == "prompt_limit_exceeded" for entry in log_entries)
 
 
+def test_prompt_limit_counts_with_the_request_model(tmp_path: Path) -> None:
+    seen_models: list[str | None] = []
+
+    class RecordingTokens(TokenService):
+        def check(self, text: str, limit: int, *, model: str | None = None) -> TokenCount:
+            seen_models.append(model)
+            return super().check(text, limit, model=model)
+
+    router = MCPRouter(FlakyProvider(), max_retries=2, backoff_base=0.01, log_dir=tmp_path, tokens=RecordingTokens())
+    with router:
+        router.generate(**{**_default_kwargs(), "model": "gpt-4o"})
+    assert seen_models == ["gpt-4o"]
+
+
 def test_retry_and_success(tmp_path: Path) -> None:
     provider = FlakyProvider()
     router = MCPRouter(
@@ -148,3 +163,186 @@ def test_router_builds_github_provider(monkeypatch: pytest.MonkeyPatch) -> None:
     assert provider._base_url.endswith("/api/v3")
     assert provider._client.timeout == httpx.Timeout(20)
     assert provider._api_version == "2023-07-01"
+
+
+def test_audit_lines_match_schema_and_meta_is_masked(tmp_path: Path) -> None:
+    from mcp_router.schemas import AuditRecord
+
+    router = MCPRouter.from_env(log_dir=tmp_path)
+    kwargs = _default_kwargs()
+    kwargs["config"] = {"temperature": 0.0, "api_key": "sk-live"}
+    with router:
+        result = router.generate(**kwargs)
+    assert result.meta["config"]["api_key"] == "***"
+    assert kwargs["config"]["api_key"] == "sk-live"
+    entries = _read_json_lines(tmp_path / "mcp_calls.jsonl")
+    assert list(entries[-1]) == list(AuditRecord.model_fields)
+    record = AuditRecord.model_validate(entries[-1])
+    assert record.status == "ok"
+    assert record.worker == "worker-0"
+
+
+def test_shadow_traffic_is_logged_without_blocking_primary(tmp_path: Path) -> None:
+    import asyncio
+    import time
+
+    from mcp_router.providers.dummy_provider import DummyProvider
+    from mcp_router.router import ShadowConfig
+
+    class SlowFailingShadow(BaseProvider):
+        name = "shadow"
+
+        def __init__(self) -> None:
+            self.models: list[str] = []
+
+        async def agenerate(self, payload: ProviderRequest) -> ProviderResponse:
+            self.models.append(payload.model)
+            await asyncio.sleep(0.3)
+            raise ProviderError("shadow exploded")
+
+    shadow_provider = SlowFailingShadow()
+    shadow = ShadowConfig(model="candidate-model", provider=shadow_provider, sample_rate=1.0, max_concurrency=1)
+    router = MCPRouter(DummyProvider(), log_dir=tmp_path, shadow=shadow)
+    with router:
+        started = time.perf_counter()
+        first = router.generate(**_default_kwargs())
+        second = router.generate(**_default_kwargs())
+        elapsed = time.perf_counter() - started
+        time.sleep(0.4)
+    assert first.text and second.text
+    assert elapsed < 0.3
+    assert shadow_provider.models == ["candidate-model"]
+    entries = _read_json_lines(tmp_path / "mcp_shadow.jsonl")
+    assert sorted(entry["status"] for entry in entries) == ["dropped", "error"]
+    mirrored = next(entry for entry in entries if entry["status"] == "error")
+    assert mirrored["shadow_model"] == "candidate-model"
+    assert mirrored["primary"]["status"] == "ok"
+    assert mirrored["shadow"]["latency_ms"] >= 300
+
+
+def test_shadow_traffic_never_mirrors_mutating_requests(tmp_path: Path) -> None:
+    import time
+
+    from mcp_router.router import ShadowConfig
+
+    class Recording(BaseProvider):
+        name = "recording"
+
+        def __init__(self) -> None:
+            self.methods: list[str] = []
+
+        async def agenerate(self, payload: ProviderRequest) -> ProviderResponse:
+            config = payload.config or {}
+            self.methods.append("mutation" if config.get("graphql") else config.get("method", "GET"))
+            return ProviderResponse(text="ok", meta={})
+
+    primary = Recording()
+    router = MCPRouter(primary, log_dir=tmp_path, shadow=ShadowConfig(model="candidate-model", sample_rate=1.0))
+    with router:
+        for config in (
+            {"method": "POST", "json": {"title": "bug"}},
+            {"method": "delete"},
+            {"graphql": True, "query": "mutation { addStar(input: {}) { clientMutationId } }"},
+            {"method": "GET"},
+        ):
+            router.generate(**{**_default_kwargs(), "config": config})
+        time.sleep(0.1)
+    assert primary.methods == ["POST", "delete", "mutation", "GET", "GET"]
+    assert len(_read_json_lines(tmp_path / "mcp_shadow.jsonl")) == 1
+
+
+def test_adaptive_timeout_cuts_hung_attempts(tmp_path: Path) -> None:
+    import asyncio
+    import time
+
+    from mcp_router.router import AdaptiveTimeoutConfig
+
+    class EventuallyHangs(BaseProvider):
+        name = "hangs"
+
+        def __init__(self) -> None:
+            self.calls = 0
+
+        async def agenerate(self, payload: ProviderRequest) -> ProviderResponse:
+            self.calls += 1
+            await asyncio.sleep(0.01 if self.calls <= 5 else 5.0)
+            return ProviderResponse(text="ok", meta={})
+
+    adaptive = AdaptiveTimeoutConfig(multiplier=2.0, floor_sec=0.05, ceiling_sec=1.0, min_samples=5, window=16)
+    router = MCPRouter(EventuallyHangs(), log_dir=tmp_path, max_retries=0, adaptive_timeout=adaptive)
+    with router:
+        for _ in range(5):
+            router.generate(**_default_kwargs())
+        started = time.perf_counter()
+        with pytest.raises(ProviderError, match="adaptive timeout"):
+            router.generate(**_default_kwargs())
+        assert time.perf_counter() - started < 1.0
+    entries = _read_json_lines(tmp_path / "mcp_calls.jsonl")
+    assert entries[0]["timeout_sec"] == 30.0
+    assert entries[-1]["status"] == "error"
+    assert entries[-1]["timeout_sec"] == pytest.approx(0.05, abs=0.02)
+
+
+def test_adaptive_timeout_widens_after_latency_rises(tmp_path: Path) -> None:
+    import asyncio
+
+    from mcp_router.router import AdaptiveTimeoutConfig
+
+    class SlowsDown(BaseProvider):
+        name = "slows-down"
+
+        def __init__(self) -> None:
+            self.calls = 0
+
+        async def agenerate(self, payload: ProviderRequest) -> ProviderResponse:
+            self.calls += 1
+            await asyncio.sleep(0.01 if self.calls <= 5 else 0.15)
+            return ProviderResponse(text="ok", meta={})
+
+    adaptive = AdaptiveTimeoutConfig(multiplier=2.0, floor_sec=0.05, ceiling_sec=1.0, min_samples=5, window=16)
+    router = MCPRouter(SlowsDown(), log_dir=tmp_path, max_retries=3, backoff_base=0.001, adaptive_timeout=adaptive)
+    with router:
+        for _ in range(5):
+            router.generate(**_default_kwargs())
+        for _ in range(3):
+            assert router.generate(**_default_kwargs()).text == "ok"
+    entries = _read_json_lines(tmp_path / "mcp_calls.jsonl")[5:]
+    # The cut-off attempt is recorded at its 0.05s bound and the retry gets 2x more headroom.
+    assert [entry["status"] for entry in entries] == ["error", "ok", "ok", "ok"]
+    assert [entry["timeout_sec"] for entry in entries[:2]] == pytest.approx([0.05, 0.2], abs=0.02)
+    assert all(entry["timeout_sec"] >= 0.15 for entry in entries[2:])
+
+
+def test_adaptive_timeout_respects_explicit_timeouts_and_skips_static_cutoffs(tmp_path: Path) -> None:
+    import asyncio
+    import time
+
+    from mcp_router.router import AdaptiveTimeoutConfig
+
+    class HangsFirstAndLast(BaseProvider):
+        name = "hangs-first-and-last"
+
+        def __init__(self) -> None:
+            self.calls = 0
+
+        async def agenerate(self, payload: ProviderRequest) -> ProviderResponse:
+            self.calls += 1
+            await asyncio.sleep(5.0 if self.calls in (1, 7) else 0.01)
+            return ProviderResponse(text="ok", meta={})
+
+    adaptive = AdaptiveTimeoutConfig(multiplier=2.0, floor_sec=2.0, ceiling_sec=10.0, min_samples=5, window=16)
+    router = MCPRouter(HangsFirstAndLast(), log_dir=tmp_path, max_retries=0, adaptive_timeout=adaptive)
+    with router:
+        with pytest.raises(ProviderError, match="exceeded timeout"):
+            router.generate(**_default_kwargs(), timeout_sec=0.05)
+        for _ in range(5):
+            router.generate(**_default_kwargs())
+        started = time.perf_counter()
+        # The 2s adaptive floor would outlast the caller's own 0.1s budget.
+        with pytest.raises(ProviderError, match="exceeded timeout"):
+            router.generate(**_default_kwargs(), timeout_sec=0.1)
+        assert time.perf_counter() - started < 1.0
+        window = router._latency_windows[("hangs-first-and-last", "test-model")]  # pylint: disable=protected-access
+        assert len(window) == 5 and window.escalation == 0
+    entries = _read_json_lines(tmp_path / "mcp_calls.jsonl")
+    assert [entry["timeout_sec"] for entry in (entries[0], entries[-1])] == [0.05, 0.1]
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
 import json
+import time
 from pathlib import Path
 
+import pytest
 from mcp_router.providers.dummy_provider import DummyProvider
 from mcp_router.router import MCPRouter
 from mcp_router.skills import SkillManager
@@ -52,6 +54,7 @@ def test_skill_manager_prepare_payload_logs_telemetry(tmp_path: Path) -> None:
     manager = SkillManager(root=tmp_path, feature_flags={"skills_v1": True})
     payload = manager.prepare_payload("Need API governance guidance")
     assert payload, "expected at least one skill match"
+    assert manager.flush_telemetry()
     event_path = tmp_path / "telemetry/skills/events.jsonl"
     assert event_path.exists()
     events = [json.loads(line) for line in event_path.read_text(encoding="utf-8").splitlines() if line.strip()]
@@ -106,3 +109,583 @@ def test_router_builds_skills_manager_when_flag_true(tmp_path: Path) -> None:
     manager = MCPRouter._build_skills_manager(settings)
     assert isinstance(manager, SkillManager)
     assert manager.enabled is True
+
+
+def test_bm25_index_matches_reference_scoring() -> None:
+    import math
+
+    from mcp_router.skills.bm25 import BM25Index
+
+    documents = {
+        "a": "api governance review for api changes".split(),
+        "b": "browser automation with playwright".split(),
+        "c": "governance audit of changelog and plans".split(),
+        "d": [],
+    }
+    index = BM25Index(documents)
+    query = ["api", "governance", "api", "unknown"]
+    scores = {index.doc_ids[doc]: value for doc, value in index.score(query).items()}
+
+    avg_len = sum(len(tokens) for tokens in documents.values()) / len(documents)
+    expected: dict[str, float] = {}
+    for doc_id, tokens in documents.items():
+        total = 0.0
+        for token in query:
+            df = sum(1 for other in documents.values() if token in other)
+            if df == 0:
+                continue
+            tf = tokens.count(token)
+            idf = math.log((len(documents) - df + 0.5) / (df + 0.5) + 1)
+            total += idf * (tf * 2.5) / (tf + 1.5 * (0.25 + 0.75 * len(tokens) / avg_len))
+        if total:
+            expected[doc_id] = total
+    assert scores.keys() == expected.keys()
+    for doc_id, value in expected.items():
+        assert abs(scores[doc_id] - value) < 1e-9
+    assert set(index.score(query, allowed={2})) == {2}
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_embedding_matrix_matches_cosine(monkeypatch: pytest.MonkeyPatch, use_numpy: bool) -> None:
+    import math
+
+    from mcp_router.skills import vectors
+
+    if not use_numpy:
+        monkeypatch.setattr(vectors, "np", None)
+    elif vectors.np is None:
+        pytest.skip("numpy not installed")
+    matrix = vectors.EmbeddingMatrix(
+        {"a": [1.0, 0.0, 0.0], "b": [0.0, 2.0, 0.0], "c": [1.0, 1.0, 0.0], "z": [0.0, 0.0, 0.0], "bad": [1.0, 2.0]}
+    )
+    assert matrix.keys == ["a", "b", "c", "z"]
+    assert matrix.uses_numpy is use_numpy
+    similarities = matrix.similarities([2.0, 0.0, 0.0])
+    top = matrix.top_indices(similarities, 2)
+    assert top == [0, 2]
+    selected = matrix.select(similarities, top)
+    assert selected["a"] == pytest.approx(1.0)
+    assert selected["c"] == pytest.approx((1 / math.sqrt(2) + 1) / 2, rel=1e-6)
+    assert matrix.select(similarities, [3]) == {"z": 0.5}
+
+
+def test_skill_manager_rebuilds_embeddings_when_cache_changes(tmp_path: Path) -> None:
+    _write_skill(tmp_path)
+    cache_path = tmp_path / ".mcp/cache/skills_embeddings.json"
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    cache_path.write_text(json.dumps({"embeddings": {"skills/sample-skill/SKILL.md": [1.0, 0.0]}}), encoding="utf-8")
+    manager = SkillManager(
+        root=tmp_path,
+        feature_flags={"skills_v1": True},
+        embedder=lambda texts: [[1.0, 0.0] for _ in texts],
+        threshold=0.1,
+    )
+    first = manager.match("api governance")
+    assert first[0].embedding_score == pytest.approx(1.0)
+
+    cache_path.write_text(
+        json.dumps({"embeddings": {"skills/sample-skill/SKILL.md": [-1.0, 0.0]}, "model": "refreshed"}),
+        encoding="utf-8",
+    )
+    second = manager.match("api governance")
+    assert second[0].embedding_score == pytest.approx(0.0)
+
+
+def test_skill_manager_loads_fresh_pack_and_rescans_when_stale(tmp_path: Path) -> None:
+    skill_file = _write_skill(tmp_path)
+    cache_path = tmp_path / ".mcp/cache/skills_embeddings.json"
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    cache_path.write_text(json.dumps({"embeddings": {"skills/sample-skill/SKILL.md": [3.0, 4.0]}}), encoding="utf-8")
+    options = {
+        "root": tmp_path,
+        "feature_flags": {"skills_v1": True},
+        "embedder": lambda texts: [[3.0, 4.0] for _ in texts],
+        "threshold": 0.1,
+    }
+    scanned = SkillManager(**options)
+    assert not scanned.loaded_from_pack
+    scanned.build_pack()
+    expected = [(item.metadata.rel_path, item.score, item.embedding_score) for item in scanned.match("api governance")]
+
+    packed = SkillManager(**options)
+    assert packed.loaded_from_pack
+    assert packed.list_all() == scanned.list_all()
+    matches = packed.match("api governance")
+    assert [(item.metadata.rel_path, item.score) for item in matches] == [row[:2] for row in expected]
+    assert matches[0].embedding_score == pytest.approx(1.0)
+    body, _, _ = packed.load_body(matches[0].metadata)
+    assert body == scanned.load_body(matches[0].metadata)[0]
+    assert body.startswith("# Sample Skill")
+
+    skill_file.write_text(skill_file.read_text(encoding="utf-8").replace("api discovery", "api review"), encoding="utf-8")
+    rescanned = SkillManager(**options)
+    assert not rescanned.loaded_from_pack
+    assert "api review" in rescanned.list_all()[0].description
+
+
+def test_bm25_index_update_matches_rebuild() -> None:
+    from mcp_router.skills.bm25 import BM25Index
+
+    documents = {
+        "a": "api governance review for api changes".split(),
+        "b": "browser automation with playwright".split(),
+    }
+    original = BM25Index(documents)
+    updated = original.updated(
+        {"b": "browser governance checks".split(), "c": "api audit".split()},
+        {"b": documents["b"]},
+    )
+    rebuilt = BM25Index({**documents, "b": "browser governance checks".split(), "c": "api audit".split()})
+    query = ["api", "governance", "playwright"]
+    assert updated.doc_ids == rebuilt.doc_ids
+    assert updated.score(query) == pytest.approx(rebuilt.score(query))
+    assert "playwright" not in updated.postings
+    assert set(original.score(["playwright"])) == {1}
+
+
+def test_skill_manager_refresh_is_incremental_and_watcher_reloads(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    skill_file = _write_skill(tmp_path)
+    manager = SkillManager(root=tmp_path, feature_flags={"skills_v1": True}, threshold=0.1)
+    parsed: list[str] = []
+    original_read = SkillManager._read_skill
+    monkeypatch.setattr(
+        SkillManager, "_read_skill", lambda self, path: parsed.append(path.parent.name) or original_read(self, path)
+    )
+    cache_path = tmp_path / ".mcp/cache/skills_metadata.json"
+    cache_stamp = cache_path.stat().st_mtime_ns
+    assert manager.refresh_metadata() is False
+    assert parsed == []
+    assert cache_path.stat().st_mtime_ns == cache_stamp
+
+    # A new manager trusts the metadata cache for unchanged files.
+    assert SkillManager(root=tmp_path, feature_flags={"skills_v1": True}).list_all() == manager.list_all()
+    assert parsed == []
+
+    registry_path = tmp_path / "skills/registry.json"
+    registry = json.loads(registry_path.read_text(encoding="utf-8"))
+    registry["skills"].append({"name": "other", "path": "skills/other/SKILL.md", "enabled": True})
+    registry_path.write_text(json.dumps(registry), encoding="utf-8")
+    (tmp_path / "skills/other").mkdir()
+    (tmp_path / "skills/other/SKILL.md").write_text(
+        "---\nname: other\ndescription: Playwright browser automation.\n---\n\nBody\n", encoding="utf-8"
+    )
+    held = manager.match("playwright")
+    manager.start_watcher(0.05)
+    try:
+        deadline = time.monotonic() + 5
+        while not manager.match("playwright") and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert held == []
+        assert [item.metadata.name for item in manager.match("playwright")] == ["other"]
+        assert parsed == ["other"]
+
+        skill_file.write_text(skill_file.read_text(encoding="utf-8").replace("api discovery", "sbom"), encoding="utf-8")
+        deadline = time.monotonic() + 5
+        while not manager.match("sbom") and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert [item.metadata.name for item in manager.match("sbom")] == ["sample-skill"]
+        assert parsed == ["other", "sample-skill"]
+    finally:
+        manager.close()
+    events = (tmp_path / "telemetry/skills/events.jsonl").read_text(encoding="utf-8")
+    assert '"skills_reloaded"' in events
+
+
+def test_skill_manager_gates_and_caches_query_embeddings(tmp_path: Path) -> None:
+    _write_skill(tmp_path)
+    calls: list[str] = []
+
+    def embedder(texts):
+        calls.extend(texts)
+        return [[1.0, 0.0] for _ in texts]
+
+    cache_path = tmp_path / ".mcp/cache/skills_embeddings.json"
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    cache_path.write_text(json.dumps({"embeddings": {"skills/sample-skill/SKILL.md": [1.0, 0.0]}}), encoding="utf-8")
+    manager = SkillManager(root=tmp_path, feature_flags={"skills_v1": True}, embedder=embedder, threshold=0.75)
+
+    # No keyword hit: 0.7 x a perfect embedding score still misses 0.75, so no forward pass.
+    assert manager.match("unrelated words") == []
+    assert calls == []
+    first = manager.match("api governance")
+    second = manager.match("  api   governance ")
+    assert calls == ["api governance"]
+    assert first[0].embedding_score == second[0].embedding_score == pytest.approx(1.0)
+    stats = manager.embedding_stats()
+    assert (stats["queries"], stats["computed"], stats["cache_hits"], stats["skipped"]) == (3, 1, 1, 1)
+    assert stats["skip_rate"] == pytest.approx(1 / 3, abs=1e-4)
+
+    decisive = SkillManager(
+        root=tmp_path,
+        feature_flags={"skills_v1": True},
+        embedder=embedder,
+        threshold=0.75,
+        embedding_skip_margin=0.5,
+    )
+    matches = decisive.match("sample flows")
+    assert [item.metadata.name for item in matches] == ["sample-skill"]
+    assert matches[0].embedding_score is None
+    assert calls == ["api governance"]
+    assert decisive.flush_telemetry()
+    events = [
+        json.loads(line)
+        for line in (tmp_path / "telemetry/skills/events.jsonl").read_text(encoding="utf-8").splitlines()
+    ]
+    decisions = [event["data"]["embedding"]["decision"] for event in events if event["event"] == "skill_selected"]
+    assert decisions == ["skipped_unreachable", "computed", "cached", "skipped_decisive"]
+
+
+def test_skill_manager_match_many_batches_embedder_and_telemetry(tmp_path: Path) -> None:
+    _write_skill(tmp_path)
+    batches: list[list[str]] = []
+
+    def embedder(texts):
+        batches.append(list(texts))
+        return [[1.0, 0.0] if "governance" in text else [0.6, 0.8] for text in texts]
+
+    cache_path = tmp_path / ".mcp/cache/skills_embeddings.json"
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    cache_path.write_text(json.dumps({"embeddings": {"skills/sample-skill/SKILL.md": [1.0, 0.0]}}), encoding="utf-8")
+    queries = ["api governance", "   ", "unrelated words", "api design", " api  governance"]
+    manager = SkillManager(root=tmp_path, feature_flags={"skills_v1": True}, embedder=embedder, threshold=0.75)
+    batched = manager.match_many(queries)
+    assert batches == [["api governance", "api design"]]
+
+    reference = SkillManager(
+        root=tmp_path,
+        feature_flags={"skills_v1": True},
+        embedder=embedder,
+        threshold=0.75,
+        telemetry_dir=tmp_path / "reference",
+    )
+    expected = [reference.match(query) for query in queries]
+    assert [[(item.metadata.name, item.score, item.embedding_score) for item in matches] for matches in batched] == [
+        [(item.metadata.name, item.score, item.embedding_score) for item in matches] for matches in expected
+    ]
+    assert batched[0] and batched[1] == [] and batched[2] == []
+    assert manager.flush_telemetry()
+    events = [
+        json.loads(line)
+        for line in (tmp_path / "telemetry/skills/events.jsonl").read_text(encoding="utf-8").splitlines()
+    ]
+    decisions = [event["data"]["embedding"]["decision"] for event in events if event["event"] == "skill_selected"]
+    assert decisions == ["computed", "skipped_unreachable", "computed", "cached"]
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_quantized_matrix_tracks_float_scores(monkeypatch: pytest.MonkeyPatch, use_numpy: bool) -> None:
+    import random
+
+    from mcp_router.skills import vectors
+
+    if not use_numpy:
+        monkeypatch.setattr(vectors, "np", None)
+    elif vectors.np is None:
+        pytest.skip("numpy not installed")
+    rng = random.Random(3)
+    data = {f"s{index}": [rng.gauss(0.0, 1.0) for _ in range(32)] for index in range(40)}
+    exact = vectors.EmbeddingMatrix(data)
+    quantized = vectors.QuantizedEmbeddingMatrix.quantize(data)
+    assert quantized.nbytes == 40 * (32 + 4)
+    assert quantized.uses_numpy is use_numpy
+    query = data["s7"]
+    approximate = list(quantized.similarities(query))
+    for reference, value in zip(exact.similarities(query), approximate):
+        assert value == pytest.approx(float(reference), abs=0.02)
+    assert quantized.top_indices(quantized.similarities(query), 1) == [7]
+    for matrix in (exact, quantized):
+        batched = matrix.similarities_many([data["s2"], query])
+        single = [float(value) for value in matrix.similarities(query)]
+        assert [float(value) for value in batched[1]] == pytest.approx(single, abs=1e-5)
+    scale, codes = vectors.quantize_int8(data["s1"])
+    assert quantized.row("s1")[1] == codes
+    assert quantized.row("s1")[0] == pytest.approx(scale, rel=1e-6)
+    norm = sum(value * value for value in data["s1"]) ** 0.5
+    restored = vectors.dequantize_int8(scale, codes)
+    assert max(abs(value / norm - approx) for value, approx in zip(data["s1"], restored)) <= scale / 2 + 1e-6
+
+
+def test_skill_manager_int8_cache_with_full_precision_rerank(tmp_path: Path) -> None:
+    import base64
+
+    from mcp_router.skills.vectors import quantize_int8
+
+    _write_skill(tmp_path)
+    vector = [0.3, -0.2, 0.9, 0.1]
+    scale, codes = quantize_int8(vector)
+    entry = {"scale": scale, "codes": base64.b64encode(codes).decode("ascii")}
+    cache_path = tmp_path / ".mcp/cache/skills_embeddings.json"
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+
+    def manager_for(payload: dict, **kwargs) -> SkillManager:
+        cache_path.write_text(json.dumps(payload), encoding="utf-8")
+        return SkillManager(
+            root=tmp_path,
+            feature_flags={"skills_v1": True},
+            embedder=lambda texts: [vector for _ in texts],
+            threshold=0.1,
+            **kwargs,
+        )
+
+    int8_only = manager_for(
+        {"model": "small", "embeddings_int8": {"skills/sample-skill/SKILL.md": entry}},
+        embedding_quantization="int8",
+    )
+    approximate = int8_only.match("api governance")[0].embedding_score
+    assert approximate == pytest.approx(1.0, abs=0.01)
+
+    reranked = manager_for(
+        {
+            "model": "small",
+            "embeddings": {"skills/sample-skill/SKILL.md": vector},
+            "embeddings_int8": {"skills/sample-skill/SKILL.md": entry},
+        },
+        embedding_quantization="int8",
+    )
+    assert reranked.match("api governance")[0].embedding_score == pytest.approx(1.0, abs=1e-6)
+
+    mismatched = manager_for(
+        {"model": "large", "embeddings": {"skills/sample-skill/SKILL.md": vector}},
+        embedding_model="small",
+    )
+    assert mismatched.match("api governance")[0].embedding_score is None
+    with pytest.raises(ValueError):
+        SkillManager(root=tmp_path, embedding_quantization="int4")
+
+
+def test_ivf_index_round_trip_bind_and_search(tmp_path: Path) -> None:
+    import random
+
+    from mcp_router.skills import vectors
+    from mcp_router.skills.ann import IVFIndex
+
+    if vectors.np is None:
+        pytest.skip("numpy not installed")
+    rng = random.Random(5)
+    data = {f"s{index}": [rng.gauss(0.0, 1.0) for _ in range(16)] for index in range(200)}
+    matrix = vectors.EmbeddingMatrix(data)
+    index = IVFIndex.build(matrix, nlist=8, model="small")
+    assert sorted(index.members.tolist()) == list(range(200))
+    loaded = IVFIndex.load(index.save(tmp_path / "skills_ann.npz"))
+    assert loaded is not None and loaded.model == "small" and loaded.keys == matrix.keys
+    (tmp_path / "broken.npz").write_bytes(b"not a zip")
+    assert IVFIndex.load(tmp_path / "broken.npz") is None
+
+    query = data["s42"]
+    exact = matrix.select(matrix.similarities(query), matrix.top_indices(matrix.similarities(query), 5))
+    bound = loaded.bind(matrix)
+    assert bound.search(matrix, query, 5, nprobe=8) == pytest.approx(exact)
+    assert "s42" in bound.search(matrix, query, 1, nprobe=1)
+    assert "s7" in bound.search(matrix, query, 1, nprobe=1, include=[matrix.index["s7"]])
+
+    # Skills added after the build are always scanned; removed ones are dropped.
+    grown = vectors.EmbeddingMatrix({**{key: data[key] for key in list(data)[1:]}, "new": query})
+    rebound = loaded.bind(grown)
+    assert rebound.unindexed.tolist() == [grown.index["new"]]
+    assert len(rebound.members) == 199
+    assert set(rebound.search(grown, query, 2, nprobe=1)) == {"s42", "new"}
+
+
+def test_skill_manager_uses_ann_index_above_min_skills(tmp_path: Path) -> None:
+    from mcp_router.skills import vectors
+
+    if vectors.np is None:
+        pytest.skip("numpy not installed")
+    _write_skill(tmp_path)
+    cache_path = tmp_path / ".mcp/cache/skills_embeddings.json"
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    cache_path.write_text(
+        json.dumps({"model": "small", "embeddings": {"skills/sample-skill/SKILL.md": [1.0, 0.0]}}), encoding="utf-8"
+    )
+
+    def manager_for(**kwargs) -> SkillManager:
+        return SkillManager(
+            root=tmp_path,
+            feature_flags={"skills_v1": True},
+            embedder=lambda texts: [[1.0, 0.0] for _ in texts],
+            **kwargs,
+        )
+
+    exact = manager_for().match("api governance")
+    ann_path = manager_for().build_ann(model="small")
+    assert ann_path == tmp_path / ".mcp/cache/skills_ann.npz"
+    manager = manager_for(ann_min_skills=0)
+    assert [(item.metadata.name, item.score) for item in manager.match("api governance")] == [
+        (item.metadata.name, item.score) for item in exact
+    ]
+    assert manager._snapshot.ann_index is not None  # pylint: disable=protected-access
+
+    small_catalog = manager_for(ann_min_skills=10)
+    small_catalog.match("api governance")
+    assert small_catalog._snapshot.ann_index is None  # pylint: disable=protected-access
+
+    manager_for().build_ann(model="other")
+    mismatched = manager_for(ann_min_skills=0, embedding_model="small")
+    assert mismatched.match("api governance")[0].embedding_score == pytest.approx(1.0)
+    assert mismatched._snapshot.ann_index is None  # pylint: disable=protected-access
+    assert mismatched.flush_telemetry()
+    events = [
+        json.loads(line)
+        for line in (tmp_path / "telemetry/skills/events.jsonl").read_text(encoding="utf-8").splitlines()
+    ]
+    assert [event["data"]["reason"] for event in events if event["event"] == "skill_ann_fallback"] == [
+        "model_mismatch"
+    ]
+
+
+def _word_count(text: str) -> int:
+    return len(text.split())
+
+
+def test_truncate_sections_keeps_whole_headings_and_paragraphs() -> None:
+    from mcp_router.skills.budget import pack_bodies, split_sections, truncate_sections
+
+    body = "\n".join(
+        [
+            "# Guide",
+            "",
+            "alpha beta gamma delta",
+            "epsilon zeta",
+            "",
+            "```",
+            "code line one",
+            "",
+            "code line two",
+            "```",
+            "",
+            "## Details",
+            "",
+            "eta theta iota kappa lambda mu nu xi",
+        ]
+    )
+    assert split_sections(body) == [
+        "# Guide",
+        "alpha beta gamma delta\nepsilon zeta",
+        "```\ncode line one\n\ncode line two\n```",
+        "## Details",
+        "eta theta iota kappa lambda mu nu xi",
+    ]
+    assert truncate_sections(body, 100, _word_count) == (body, _word_count(body), False)
+    text, tokens, truncated = truncate_sections(body, 20, _word_count)
+    # The dangling "## Details" heading is dropped with the paragraph that did not fit.
+    assert text == "# Guide\n\nalpha beta gamma delta\nepsilon zeta\n\n```\ncode line one\n\ncode line two\n```"
+    assert (tokens, truncated) == (_word_count(text), True)
+    assert truncate_sections("one two three four five", 3, _word_count) == ("one two three", 3, True)
+
+    # Density order: the short body wins over the long one, which is truncated to the rest.
+    packed = pack_bodies([(0.9, body), (0.5, "short body")], 12, _word_count, min_partial_tokens=4)
+    assert packed[1].text == "short body" and not packed[1].truncated
+    assert packed[0].truncated and packed[0].tokens <= 10 and not packed[0].text.endswith("Details")
+    assert pack_bodies([(0.9, body)], 3, _word_count, min_partial_tokens=4)[0].dropped
+
+
+def test_prepare_payload_packs_bodies_into_token_budget(tmp_path: Path) -> None:
+    skill_path = _write_skill(tmp_path)
+    sections = "\n\n".join(f"## Step {index}\n\n" + " ".join(["word"] * 40) for index in range(10))
+    frontmatter = skill_path.read_text(encoding="utf-8").split("# Sample Skill")[0]
+    skill_path.write_text(frontmatter + "# Sample Skill\n\n" + sections + "\n", encoding="utf-8")
+    manager = SkillManager(
+        root=tmp_path,
+        feature_flags={"skills_v1": True},
+        token_counter=_word_count,
+        threshold=0.1,
+    )
+
+    unbounded = manager.prepare_payload("api governance")
+    assert unbounded[0]["truncated"] is False
+    payload = manager.prepare_payload("api governance", token_budget=150)
+    entry = payload[0]
+    assert entry["truncated"] is True and 64 <= entry["tokens"] <= 150
+    assert entry["body"].rstrip().endswith("word")
+    assert manager.prepare_payload("api governance", token_budget=10) == []
+
+    assert manager.flush_telemetry()
+    events = [
+        json.loads(line)
+        for line in (tmp_path / "telemetry/skills/events.jsonl").read_text(encoding="utf-8").splitlines()
+    ]
+    packed = [event["data"] for event in events if event["event"] == "skill_payload_packed"]
+    assert [item["dropped"] for item in packed] == [[], ["skills/sample-skill/SKILL.md"]]
+    assert packed[0]["tokens"] == entry["tokens"]
+    assert packed[0]["tokens_saved"] == unbounded[0]["tokens"] - entry["tokens"]
+    assert packed[0]["bytes_saved"] > 0
+    loaded = [event["data"] for event in events if event["event"] == "skill_loaded"]
+    assert loaded[-1]["tokens_saved"] == packed[0]["tokens_saved"]
+
+
+def test_load_body_caches_parsed_bodies_until_the_file_changes(tmp_path: Path) -> None:
+    import os
+
+    skill_path = _write_skill(tmp_path)
+    counted: list[str] = []
+
+    def counter(text: str) -> int:
+        counted.append(text)
+        return _word_count(text)
+
+    manager = SkillManager(
+        root=tmp_path,
+        feature_flags={"skills_v1": True},
+        token_counter=counter,
+        preload_bodies=True,
+    )
+    metadata = manager.list_enabled()[0]
+    assert manager.body_cache_stats()["entries"] == 2  # stripped body + its 5000-token form
+    calls = len(counted)
+    first = manager.load_body(metadata)
+    assert manager.load_body(metadata) == first
+    assert len(counted) == calls
+    assert manager.body_cache_stats()["hits"] >= 2
+
+    skill_path.write_text(skill_path.read_text(encoding="utf-8") + "\nMore guidance.\n", encoding="utf-8")
+    stat = skill_path.stat()
+    os.utime(skill_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert manager.load_body(metadata)[0].endswith("More guidance.")
+    assert manager.load_body(metadata, max_tokens=3) == ("# Sample Skill", 3, True)
+
+    tiny = SkillManager(root=tmp_path, feature_flags={"skills_v1": True}, body_cache_bytes=0)
+    tiny.load_body(tiny.list_enabled()[0])
+    assert tiny.body_cache_stats()["entries"] == 0
+
+
+def test_skill_manager_embedding_reload_publishes_complete_matrix(tmp_path: Path) -> None:
+    import threading
+
+    _write_skill(tmp_path)
+    cache_path = tmp_path / ".mcp/cache/skills_embeddings.json"
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    cache_path.write_text(json.dumps({"embeddings": {"skills/sample-skill/SKILL.md": [1.0, 0.0]}}), encoding="utf-8")
+    manager = SkillManager(
+        root=tmp_path, feature_flags={"skills_v1": True}, embedder=lambda texts: [[1.0, 0.0] for _ in texts]
+    )
+    assert manager.match("api governance")[0].embedding_score == pytest.approx(1.0)
+    before = manager._snapshot  # pylint: disable=protected-access
+
+    reading, release = threading.Event(), threading.Event()
+    original = manager._read_embeddings  # pylint: disable=protected-access
+
+    def slow_read():
+        reading.set()
+        release.wait(5)
+        return original()
+
+    manager._read_embeddings = slow_read  # pylint: disable=protected-access
+    cache_path.write_text(
+        json.dumps({"embeddings": {"skills/sample-skill/SKILL.md": [0.0, 1.0], "skills/other/SKILL.md": [1.0, 1.0]}}),
+        encoding="utf-8",
+    )
+    reloader = threading.Thread(target=manager._load_embeddings)  # pylint: disable=protected-access
+    reloader.start()
+    assert reading.wait(5)
+    # While the cache is being read, readers still see the previous, complete state.
+    assert manager._snapshot is before and len(before.embedding_matrix) == 1  # pylint: disable=protected-access
+    assert manager._vectors.floats  # pylint: disable=protected-access
+    release.set()
+    reloader.join(5)
+
+    after = manager._snapshot  # pylint: disable=protected-access
+    assert after is not before and list(after.embedding_matrix.keys) == ["skills/sample-skill/SKILL.md"]
+    assert set(manager._vectors.floats) == {"skills/sample-skill/SKILL.md", "skills/other/SKILL.md"}
+    manager.close()
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import json
+import threading
+from collections.abc import Mapping
+from dataclasses import replace
+from datetime import UTC, datetime
+from pathlib import Path
+
+from mcp_router import telemetry_archive
+from mcp_router.router import MCPRouter
+from mcp_router.telemetry import TelemetrySink
+
+
+def _events(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+
+class _Gate(Mapping):
+    """Event payload that holds the writer thread until released."""
+
+    def __init__(self, release: threading.Event) -> None:
+        self._release = release
+
+    def __getitem__(self, key):
+        return {"gate": True}[key]
+
+    def __iter__(self):
+        self._release.wait(5)
+        return iter(["gate"])
+
+    def __len__(self) -> int:
+        return 1
+
+
+def test_telemetry_sink_is_shared_and_masks_in_batches(tmp_path: Path) -> None:
+    path = tmp_path / "telemetry/events.jsonl"
+    first = TelemetrySink.acquire(path)
+    second = TelemetrySink.acquire(tmp_path / "telemetry/../telemetry/events.jsonl")
+    assert first is second
+    assert first.emit_many("skill_selected", [{"query": "a"}, {"query": "b", "api_key": "x"}])
+    assert second.emit("skill_exec_result", {"status": "ok"})
+    assert first.flush()
+    events = _events(path)
+    assert [event["event"] for event in events] == ["skill_selected", "skill_selected", "skill_exec_result"]
+    assert events[1]["data"] == {"query": "b", "api_key": "***"}
+    assert events[0]["ts"].endswith("Z")
+
+    first.release()
+    assert second.emit("skill_loaded", {"skill": "demo"})
+    second.release()
+    assert not second.emit("skill_loaded", {"skill": "late"})
+    assert [event["event"] for event in _events(path)][-1] == "skill_loaded"
+    assert TelemetrySink.acquire(path) is not first
+    TelemetrySink.close_all()
+
+
+def test_telemetry_sink_counts_drops_when_queue_is_full(tmp_path: Path) -> None:
+    path = tmp_path / "events.jsonl"
+    release = threading.Event()
+    sink = TelemetrySink(path, queue_size=1)
+    try:
+        assert sink.emit("blocked", _Gate(release))
+        # The writer holds the first item; the second fills the queue.
+        while sink.stats()["queued"]:
+            pass
+        assert sink.emit("queued", {"n": 1})
+        assert not sink.emit_many("overflow", [{"n": 2}, {"n": 3}])
+        assert sink.stats()["dropped"] == 2
+    finally:
+        release.set()
+    sink.close()
+    events = _events(path)
+    assert [event["event"] for event in events] == ["blocked", "telemetry_dropped", "queued"]
+    assert events[1]["data"] == {"count": 2}
+    assert sink.stats()["written"] == 3
+
+
+def test_telemetry_sink_reopens_rotated_file(tmp_path: Path) -> None:
+    path = tmp_path / "events.jsonl"
+    sink = TelemetrySink(path)
+    sink.emit("before", {})
+    assert sink.flush()
+    rotated = path.rename(tmp_path / "events.jsonl.1")
+    sink.emit("after", {})
+    sink.close()
+    assert [event["event"] for event in _events(rotated)] == ["before"]
+    assert [event["event"] for event in _events(path)] == ["after"]
+
+
+def test_telemetry_policy_samples_keeps_failures_and_aggregates(tmp_path: Path) -> None:
+    path = tmp_path / "events.jsonl"
+    policy = MCPRouter._build_telemetry_policy(  # pylint: disable=protected-access
+        {"sample_rates": {"skill_selected": "0", "skill_exec_attempt": 0.5}, "aggregate_interval_sec": "3600"}
+    )
+    assert policy is not None and policy.sample_rates == {"skill_selected": 0.0, "skill_exec_attempt": 0.5}
+    sink = TelemetrySink(path, policy=replace(policy, seed=3))
+    for _ in range(3):
+        sink.emit("skill_selected", {"selected": [{"name": "api"}, {"name": "docs"}]})
+    for latency in (4.0, 40.0):
+        sink.emit("skill_exec_attempt", {"script": "run.sh"})
+        sink.emit("skill_exec_result", {"script": "run.sh", "status": "succeeded", "duration_ms": latency})
+    sink.emit("skill_exec_result", {"script": "run.sh", "status": "blocked"})
+    sink.emit("skill_loaded", {"path": "skills/api/SKILL.md", "tokens": 120})
+    sink.close()
+
+    events = _events(path)
+    names = [event["event"] for event in events]
+    assert "skill_selected" not in names
+    assert names.count("skill_exec_result") == 3 and "skill_loaded" in names
+    assert all(event["sample_rate"] == 0.5 for event in events if event["event"] == "skill_exec_attempt")
+    assert names[-1] == "telemetry_aggregate"
+    aggregate = events[-1]["data"]
+    assert aggregate["events"]["skill_selected"] == {"seen": 3, "written": 0}
+    assert aggregate["events"]["skill_exec_attempt"]["seen"] == 2
+    assert aggregate["counters"]["selections"] == {"api": 3, "docs": 3}
+    assert aggregate["counters"]["exec_blocked"] == {"run.sh": 1}
+    latency = aggregate["histograms"]["exec_latency_ms"]["run.sh"]
+    assert latency["count"] == 2 and latency["min"] == 4.0 and latency["max"] == 40.0 and latency["p50"] == 5.0
+    assert aggregate["histograms"]["load_tokens"]["skills/api/SKILL.md"]["sum"] == 120.0
+
+
+def test_telemetry_archive_compacts_rolls_up_incrementally_and_queries(tmp_path: Path, monkeypatch) -> None:
+    events = tmp_path / "events.jsonl"
+    archive_dir = tmp_path / "archive"
+
+    def write(*records: tuple[str, str, dict], raw: str = "", **extra) -> None:
+        with events.open("a", encoding="utf-8") as handle:
+            for ts, event, data in records:
+                handle.write(json.dumps({"ts": ts, "event": event, "data": data, **extra}) + "\n")
+            handle.write(raw)
+
+    write(
+        ("2025-10-18T23:59:00Z", "skill_selected", {"selected": [{"name": "api"}]}),
+        ("2025-10-19T00:01:00Z", "skill_exec_result", {"script": "run.sh", "status": "succeeded", "duration_ms": 8}),
+        raw="not json\n",
+    )
+    created = telemetry_archive.compact(events, archive_dir, now=datetime(2025, 10, 19, 1, tzinfo=UTC))
+    assert [(entry["date"], entry["events"]) for entry in created] == [
+        ("2025-10-18", {"skill_selected": 1}),
+        ("2025-10-19", {"_invalid": 1, "skill_exec_result": 1}),
+    ]
+    assert not events.exists()
+    first = telemetry_archive.rollup(archive_dir)
+    assert len(first["processed"]) == 2 and first["totals"]["selections"] == {"api": 1}
+
+    write(("2025-10-19T02:00:00Z", "skill_selected", {"selected": [{"name": "api"}]}))
+    write(("2025-10-19T02:01:00Z", "skill_selected", {"selected": [{"name": "docs"}]}), sample_rate=0.25)
+    telemetry_archive.compact(events, archive_dir, now=datetime(2025, 10, 19, 3, tzinfo=UTC))
+    second = telemetry_archive.rollup(archive_dir)
+    assert len(second["processed"]) == 1 and len(second["segments"]) == 3
+    assert second["totals"]["selections"] == {"api": 2, "docs": 4.0}
+    assert second["totals"]["exec"]["run.sh"]["latency_ms"]["max"] == 8
+    assert telemetry_archive.rollup(archive_dir)["processed"] == []
+
+    write(("2025-10-19T04:00:00Z", "skill_exec_result", {"script": "run.sh", "status": "blocked"}))
+    opened: list[str] = []
+    original = telemetry_archive.iter_segment
+
+    def tracking(directory, entry):
+        opened.append(entry["date"])
+        return original(directory, entry)
+
+    monkeypatch.setattr(telemetry_archive, "iter_segment", tracking)
+    found = list(
+        telemetry_archive.query(
+            archive_dir,
+            since=telemetry_archive.parse_timestamp("2025-10-19T00:00Z"),
+            events=["skill_exec_result"],
+            live_path=events,
+        )
+    )
+    assert [record["data"]["status"] for record in found] == ["succeeded", "blocked"]
+    assert opened == ["2025-10-19"]
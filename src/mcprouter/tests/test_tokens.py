@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from mcp_router.providers.base import BaseProvider
+from mcp_router.tokens import TokenService, estimate_tokens
+
+
+class _Codec:
+    name = "fake"
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def encode(self, text: str, disallowed_special=()) -> list[str]:
+        self.calls += 1
+        return text.split()
+
+
+def _loop_heuristic(text: str) -> int:
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    other_chars = len(text) - ascii_chars
+    return (ascii_chars + 3) // 4 + ((other_chars * 2) + 3) // 4
+
+
+def test_estimate_tokens_matches_character_heuristic() -> None:
+    for text in ["", "a", "plain ascii prompt " * 7, "日本語のプロンプト", "mixed — ascii and ünïcode ✓"]:
+        assert estimate_tokens(text) == _loop_heuristic(text)
+    assert BaseProvider.approx_token_usage("") == {"tokens": 1}
+
+
+def test_token_service_counts_exactly_only_near_the_limit_and_memoizes() -> None:
+    codec = _Codec()
+    service = TokenService(exact_margin=0.2)
+    service._codecs["cl100k_base"] = codec  # pylint: disable=protected-access
+    text = "word " * 100  # estimate 125, exact 100
+
+    assert service.check(text, 1000).tokens == 125 and codec.calls == 0
+    assert service.check(text, 10).exact is False and codec.calls == 0
+    near = service.check(text, 110)
+    assert near.exact and near.tokens == 100 and codec.calls == 1
+    assert service.count(text) == 100 and codec.calls == 1
+    assert service.stats()["memo_hits"] == 1
+
+    offline = TokenService()
+    offline._codecs["cl100k_base"] = None  # pylint: disable=protected-access
+    assert offline.check(text, 120).tokens == 125 and offline.count(text) == 125
+
+
+def test_token_service_counts_non_ascii_text_the_estimate_undercounts() -> None:
+    class _ByteCodec(_Codec):
+        def encode(self, text: str, disallowed_special=()) -> list[int]:
+            self.calls += 1
+            return list(text.encode("utf-8"))
+
+    codec = _ByteCodec()
+    service = TokenService(exact_margin=0.2)
+    service._codecs["cl100k_base"] = codec  # pylint: disable=protected-access
+    text = "日本語のプロンプト" * 20  # estimate 90, 540 UTF-8 bytes
+
+    measured = service.check(text, 200)
+    assert measured.exact and measured.tokens == 540 and codec.calls == 1
+    assert service.check(text, 540).exact is False and codec.calls == 1